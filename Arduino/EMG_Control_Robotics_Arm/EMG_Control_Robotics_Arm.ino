@@ -11,7 +11,25 @@ int frontAngle = 130;     // Initial angle for front servo
 int grabAngle = 30;       // Initial angle for grab servo
 
 // EMG analog input pins
-const int emgPins[6] = {A0, A1, A2, A3, A4, A5};  // 6-channel EMG input
+const int NUM_CHANNELS = 6;
+const int emgPins[NUM_CHANNELS] = {A0, A1, A2, A3, A4, A5};  // 6-channel EMG input
+
+// EMG stream format (must match protocol= on the Python side, see emg/framing.py)
+//   0: ASCII "v0,v1,...,v5\r\n" -- readable in the Serial Monitor, ~25-30 bytes/sample
+//   1: binary frame [0xA5][seq][6 x 10-bit values packed LSB first][CRC-8] -- 11 bytes/sample
+// At 115200 baud (~11520 bytes/s) only the binary frame keeps up with 1000 Hz.
+#define BINARY_FRAMES 0
+
+const uint8_t FRAME_SYNC = 0xA5;
+const int PAYLOAD_BYTES = (NUM_CHANNELS * 10 + 7) / 8;
+uint8_t frameSeq = 0;  // wraps at 255; the host uses it to count lost frames
+
+// Timing (millis()/micros() state machine, no delay() in loop(); mirrored by emg/firmware.py)
+const unsigned long SAMPLE_PERIOD_US = 1000;  // 1000 Hz EMG sampling
+const unsigned long MOVE_SETTLE_MS = 500;     // Servo travel time before the next command
+unsigned long lastSampleUs = 0;
+unsigned long moveStartedMs = 0;
+bool moving = false;
 
 void setup() {
   Serial.begin(115200);  // Start serial communication
@@ -25,66 +43,111 @@ void setup() {
   sideServo.write(sideAngle);
   frontServo.write(frontAngle);
   grabServo.write(grabAngle);
+
+  lastSampleUs = micros();
 }
 
-void loop() {
-  // === 1. Read and send all 6 EMG values ===
-  for (int i = 0; i < 6; i++) {
-    int value = analogRead(emgPins[i]);  // Read analog value from A0–A5
-    Serial.print(value);                 // Send value
-    if (i < 5) Serial.print(',');        // Add comma between values
+// CRC-8, polynomial 0x07, initial value 0
+uint8_t crc8(const uint8_t *data, int len) {
+  uint8_t crc = 0;
+  for (int i = 0; i < len; i++) {
+    crc ^= data[i];
+    for (int b = 0; b < 8; b++) {
+      crc = (crc & 0x80) ? (uint8_t)((crc << 1) ^ 0x07) : (uint8_t)(crc << 1);
+    }
   }
-  Serial.println();                      // End line after 6 values
+  return crc;
+}
 
-  // === 2. Check for incoming servo control commands ===
-  if (Serial.available()) {
-    char command = Serial.read();  // Read 1 character command
+void sendBinaryFrame(const int *values) {
+  uint8_t frame[PAYLOAD_BYTES + 3] = {0};
+  frame[0] = FRAME_SYNC;
+  frame[1] = frameSeq++;
+
+  // Pack each 10-bit reading at bit offset i*10 of the payload
+  for (int i = 0; i < NUM_CHANNELS; i++) {
+    int bit = i * 10;
+    uint16_t shifted = (uint16_t)(values[i] & 0x3FF) << (bit % 8);
+    frame[2 + bit / 8] |= shifted & 0xFF;
+    frame[3 + bit / 8] |= shifted >> 8;
+  }
 
-    // -- Side servo (left-right) --
-    if (command == 'L') {
-      sideAngle = min(180, sideAngle + 30);
-      sideServo.write(sideAngle);
-      delay(500);  // Allow time to move
+  frame[PAYLOAD_BYTES + 2] = crc8(frame + 1, PAYLOAD_BYTES + 1);  // covers seq + payload
+  Serial.write(frame, sizeof(frame));
+}
 
-    } else if (command == 'R') {
-      sideAngle = max(0, sideAngle - 30);
-      sideServo.write(sideAngle);
-      delay(500);
+void sendAsciiLine(const int *values) {
+  for (int i = 0; i < NUM_CHANNELS; i++) {
+    Serial.print(values[i]);                 // Send value
+    if (i < NUM_CHANNELS - 1) Serial.print(',');  // Add comma between values
+  }
+  Serial.println();                          // End line after 6 values
+}
 
-    // -- Front servo (forward-backward) --
-    } else if (command == 'F') {
-      frontAngle = min(180, frontAngle + 25);
-      frontServo.write(frontAngle);
-      delay(500);
+// Sample one row on every SAMPLE_PERIOD_US tick
+void sampleAndSend() {
+  int values[NUM_CHANNELS];
+  for (int i = 0; i < NUM_CHANNELS; i++) {
+    values[i] = analogRead(emgPins[i]);  // Read analog value from A0–A5
+  }
+#if BINARY_FRAMES
+  sendBinaryFrame(values);
+#else
+  sendAsciiLine(values);
+#endif
+}
 
-    } else if (command == 'B') {
-      frontAngle = max(70, frontAngle - 25);  // Limit to avoid mechanical collision
-      frontServo.write(frontAngle);
-      delay(500);
+// Apply one command; returns false for bytes that are not commands
+bool handleCommand(char command) {
+  switch (command) {
+    // -- Side servo (left-right) --
+    case 'L': sideAngle = min(180, sideAngle + 30); sideServo.write(sideAngle); return true;
+    case 'R': sideAngle = max(0, sideAngle - 30); sideServo.write(sideAngle); return true;
 
-    // -- Grab servo (open-close) --
-    } else if (command == 'G') {
-      grabAngle = min(90, grabAngle + 30);  // Limit to 90° max
-      grabServo.write(grabAngle);
-      delay(500);
+    // -- Front servo (forward-backward) --
+    case 'F': frontAngle = min(180, frontAngle + 25); frontServo.write(frontAngle); return true;
+    case 'B': frontAngle = max(70, frontAngle - 25); frontServo.write(frontAngle); return true;  // Limit to avoid mechanical collision
 
-    } else if (command == 'O') {
-      grabAngle = max(0, grabAngle - 30);   // Limit to 0° min
-      grabServo.write(grabAngle);
-      delay(500);
+    // -- Grab servo (open-close) --
+    case 'G': grabAngle = min(90, grabAngle + 30); grabServo.write(grabAngle); return true;  // Limit to 90° max
+    case 'O': grabAngle = max(0, grabAngle - 30); grabServo.write(grabAngle); return true;   // Limit to 0° min
 
     // -- Reset all servos to default positions --
-    } else if (command == 'Z') {
+    case 'Z':
       sideAngle = 90;
       frontAngle = 130;
       grabAngle = 30;
-
       sideServo.write(sideAngle);
       frontServo.write(frontAngle);
       grabServo.write(grabAngle);
-      delay(500);
+      return true;
+  }
+  return false;
+}
+
+void loop() {
+  // === 1. Read and send all 6 EMG values on the 1 kHz tick ===
+  unsigned long nowUs = micros();
+  if (nowUs - lastSampleUs >= SAMPLE_PERIOD_US) {
+    lastSampleUs += SAMPLE_PERIOD_US;
+    if (nowUs - lastSampleUs >= SAMPLE_PERIOD_US) {
+      lastSampleUs = nowUs;  // Fell behind (slow serial): skip ahead instead of bursting
     }
+    sampleAndSend();
   }
 
-  delay(1);  // Maintain 1000 Hz EMG sampling rate
+  // === 2. Servo commands, one per MOVE_SETTLE_MS ===
+  // Replaces delay(500) after each write: the servo still gets its travel
+  // time before the next command is taken, but sampling never stops.
+  // Commands arriving meanwhile wait in the serial RX buffer, in order.
+  if (moving && millis() - moveStartedMs >= MOVE_SETTLE_MS) {
+    moving = false;
+  }
+  if (!moving && Serial.available()) {
+    char command = Serial.read();  // Read 1 character command
+    if (handleCommand(command)) {
+      moving = true;
+      moveStartedMs = millis();
+    }
+  }
 }
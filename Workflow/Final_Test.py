@@ -1,11 +1,19 @@
+import os
 import sys
-import numpy as np
 import serial
 import time
 from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget, QGridLayout
 import pyqtgraph as pg
 from pyqtgraph.Qt import QtCore
-from scipy.signal import iirnotch, lfilter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from emg.detection import BurstDetector, SuppressionGraph
+from emg.dispatch import CommandDispatcher
+from emg.filters import NotchFilterBank
+from emg.plotting import LivePlotRenderer
+from emg.ring_buffer import RingBuffer
+from emg.serial_io import SerialBlockReader
+from emg.timebase import SampleClock
 
 class SerialSignalViewer(QMainWindow):
     def __init__(self, port='/dev/cu.usbmodem21201', baudrate=115200,
@@ -15,7 +23,6 @@ class SerialSignalViewer(QMainWindow):
         self.sampling_rate = sampling_rate
         self.duration = duration
         self.num_points = int(sampling_rate * duration)
-        self.time_base = np.linspace(0, duration, self.num_points)
 
         # Only 5 channels now
         self.num_channels = 5
@@ -23,22 +30,35 @@ class SerialSignalViewer(QMainWindow):
             "A0 - Left Wrist", "A1 - Right Wrist", "A2 - Left Elbow", "A4 - Left Leg",
             "A5 - Right Elbow"
         ]
-        self.data = [np.zeros(self.num_points) for _ in range(self.num_channels)]
+        self.data = RingBuffer(self.num_channels, self.num_points)
 
         self.thresholds = [50, 80, 80, 40, 50]
         self.cooldown_time = 0.8
         self.priority_window = 0.8
-        self.last_spike_time = [0] * self.num_channels
-        self.spike_history = [[] for _ in range(self.num_channels)]
-
-        self.b_notch, self.a_notch = iirnotch(60.0, 10.0, fs=sampling_rate)
+        self.channel_actions = ['L', 'R', 'F', 'G', 'B']
+        # Wrist bursts are dropped while the same-side elbow is active; rules
+        # are by body site, so they follow the labels above
+        self.detector = BurstDetector(
+            self.thresholds, self.channel_actions,
+            cooldown_time=self.cooldown_time,
+            priority_window=self.priority_window,
+            priority=SuppressionGraph.from_labels(self.channel_labels),
+            same_sample_priority=False,
+        )
+
+        self.notch = NotchFilterBank(self.num_channels, sampling_rate)
+        # Host time per sample, fitted from the sample count; bursts are stamped with it
+        self.clock = SampleClock(sampling_rate)
 
         try:
-            self.ser = serial.Serial(port, baudrate, timeout=1)
+            self.ser = serial.Serial(port, baudrate, timeout=1, write_timeout=0.1)
             print(f"✅ Connected to {port} at {baudrate} baud")
         except Exception as e:
             print(f"❌ Failed to open serial port: {e}")
             sys.exit()
+        self.reader = SerialBlockReader(self.ser, self.num_channels)
+        # Writes happen on the dispatcher's thread so a full TX buffer never stalls the GUI
+        self.commands = CommandDispatcher(self.ser).start()
 
         self.init_ui()
 
@@ -64,59 +84,37 @@ class SerialSignalViewer(QMainWindow):
             row, col = i // 2, i % 2
             layout.addWidget(pw, row, col)
 
-    def has_spike_nearby(self, history, now, window):
-        return any(abs(now - t) <= window for t in history)
+        # Min/max per pixel column, at most 30 fps, only when new samples arrived
+        self.renderer = LivePlotRenderer(self.plots, self.sampling_rate, self.duration, max_fps=30)
 
     def update_plot(self):
-        try:
-            line = self.ser.readline().decode().strip()
-            if not line:
-                return
-            values = line.split(',')
-            if len(values) != self.num_channels:
-                return
-            values = [float(v) for v in values]
-        except:
+        block = self.reader.read_block(wait=False)
+        if len(block) == 0:
             return
 
-        now = time.time()
+        self.clock.update(len(block), time.time())
+        filtered_block = self.notch.process(block)
+        self.data.extend(filtered_block)
 
-        for i in range(self.num_channels):
-            self.data[i] = np.roll(self.data[i], -1)
-            filtered = lfilter(self.b_notch, self.a_notch, [self.data[i][-2], values[i]])
-            self.data[i][-1] = filtered[-1]
-            self.plots[i].setData(self.time_base, self.data[i])
-
-            if filtered[-1] > self.thresholds[i]:
-                dt = now - self.last_spike_time[i]
-                if dt > self.cooldown_time:
-
-                    # Elbow priority filter
-                    if i == 0 and self.has_spike_nearby(self.spike_history[2], now, self.priority_window):
-                        continue
-                    if i == 1 and self.has_spike_nearby(self.spike_history[4], now, self.priority_window):
-                        continue
-
-                    print(f"⚡ Burst detected on channel A{i} ({self.channel_labels[i]})")
-                    self.last_spike_time[i] = now
-                    self.spike_history[i].append(now)
-                    self.spike_history[i] = [t for t in self.spike_history[i] if now - t <= 2.0]
-
-                    # Map channel to command
-                    commands = {
-                        0: b'L',  # Left Wrist -> l
-                        1: b'R',  # Right Wrist -> r
-                        2: b'F',  # Left Elbow -> f
-                        4: b'B',  # Right Elbow -> b
-                        3: b'G',  # Left Leg -> g
-                    }
-                    if i in commands:
-                        self.ser.write(commands[i])
-                        print(f"📤 Sent command: {commands[i].decode()}")
+        for _, events in self.detector.process_block(filtered_block, self.clock.latest()):
+            self.handle_bursts(events)
+
+        self.renderer.render(self.data.view(), self.data.total_written)
+
+    def handle_bursts(self, events):
+        for event in events:
+            i = event.channel
+            print(f"⚡ Burst detected on channel A{i} ({self.channel_labels[i]})")
+            if self.commands.post(event.action):
+                print(f"📤 Sent command: {event.action}")
 
     def closeEvent(self, event):
+        self.timer.stop()
+        self.commands.stop()
         self.ser.close()
         print("🔌 Serial port closed.")
+        print(f"📊 Serial stats: {self.reader.stats()}")
+        print(f"📤 Command stats: {self.commands.stats()}")
         event.accept()
 
 if __name__ == '__main__':
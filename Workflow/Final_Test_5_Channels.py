@@ -1,5 +1,5 @@
+import os
 import sys
-import numpy as np
 import serial
 import time
 from PyQt5.QtWidgets import (
@@ -7,13 +7,26 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import QThread, pyqtSignal, QTimer
 import pyqtgraph as pg
-from scipy.signal import iirnotch, lfilter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from emg.batching import BlockBatcher
+from emg.classifier import GestureClassifier, LDAModel
+from emg.detection import BurstDetector, SuppressionGraph
+from emg.dispatch import CommandDispatcher
+from emg.filters import NotchFilterBank
+from emg.plotting import LivePlotRenderer
+from emg.recorder import SessionRecorder
+from emg.ring_buffer import RingBuffer
+from emg.serial_io import SerialBlockReader
+from emg.timebase import SampleClock
+from emg.tracing import LatencyTracer
 
 class SerialReaderThread(QThread):
-    data_received = pyqtSignal(list)
+    data_received = pyqtSignal(object)   # (samples, channels) block, every block_size samples
     burst_detected = pyqtSignal(str)
 
-    def __init__(self, port, baudrate, num_channels, thresholds, cooldown_time, priority_window, channel_actions):
+    def __init__(self, port, baudrate, num_channels, thresholds, cooldown_time, priority_window, channel_actions,
+                 protocol='ascii', tracer=None, block_size=10, recorder=None, priority=None, classifier=None):
         super().__init__()
         self.port = port
         self.baudrate = baudrate
@@ -23,11 +36,26 @@ class SerialReaderThread(QThread):
         self.priority_window = priority_window
         self.channel_actions = channel_actions
 
-        self.last_spike_time = [0] * self.num_channels
-        self.spike_history = [[] for _ in range(self.num_channels)]
+        # priority: a SuppressionGraph (or rules dict), e.g. elbows over wrists
+        self.detector = BurstDetector(
+            thresholds, channel_actions,
+            cooldown_time=cooldown_time,
+            priority_window=priority_window,
+            priority=priority,
+            same_sample_priority=False,
+        )
+        # Optional GestureClassifier: classifies feature windows of each block
+        # instead of thresholding every sample
+        self.classifier = classifier
+
         self.running = True
+        self.tracer = tracer   # LatencyTracer, or None for no instrumentation
 
-        self.b_notch, self.a_notch = iirnotch(60.0, 10.0, fs=1000)
+        self.notch = NotchFilterBank(self.num_channels, 1000)
+        # Host time per sample, fitted from the sample count; bursts are stamped with it
+        self.clock = SampleClock(1000)
+        # One signal per block_size samples (10 ms at 1 kHz), not one per sample
+        self.batcher = BlockBatcher(self.num_channels, self.data_received.emit, block_size=block_size)
 
         try:
             self.ser = serial.Serial(self.port, self.baudrate, timeout=1, write_timeout=0.1)
@@ -35,57 +63,75 @@ class SerialReaderThread(QThread):
         except Exception as e:
             print(f"❌ Serial open failed: {e}")
             self.ser = None
+        self.reader = SerialBlockReader(self.ser, self.num_channels, protocol=protocol,
+                                        tracer=tracer) if self.ser else None
+        # Writes happen on the dispatcher's thread so a full TX buffer never stalls reading
+        self.commands = CommandDispatcher(self.ser, tracer=tracer).start() if self.ser else None
+        # Optional SessionRecorder; writes happen on its own thread
+        self.recorder = recorder.start() if recorder and self.ser else None
 
     def run(self):
         while self.running and self.ser and self.ser.is_open:
             try:
-                line = self.ser.readline().decode().strip()
-                values = list(map(float, line.split(',')))
-                if len(values) != self.num_channels:
-                    continue
-
-                now = time.time()
-                filtered = []
-                for i in range(self.num_channels):
-                    x = values[i]
-                    y = lfilter(self.b_notch, self.a_notch, [x, x])[-1]
-                    filtered.append(y)
-
-                    if y > self.thresholds[i]:
-                        dt = now - self.last_spike_time[i]
-                        if dt > self.cooldown_time:
-                            # elbow priority check
-                            if i == 0 and self._has_spike_nearby(self.spike_history[2], now):
-                                continue
-                            if i == 1 and self._has_spike_nearby(self.spike_history[3], now):
-                                continue
-
-                            self.last_spike_time[i] = now
-                            self.spike_history[i].append(now)
-                            self.spike_history[i] = [t for t in self.spike_history[i] if now - t <= 2.0]
-
-                            action = self.channel_actions[i]
-                            self.burst_detected.emit(action)
-                            try:
-                                self.ser.write(action.encode())
-                            except Exception as e:
-                                print(f"⚠️ Write failed: {e}")
-
-                self.data_received.emit(filtered)
-
-            except Exception as e:
+                block = self.reader.read_block()
+            except (serial.SerialException, OSError) as e:
+                print(f"⚠️ Read failed: {e}")
+                break
+            if len(block) == 0:
+                self.batcher.flush_if_due()
                 continue
 
-    def _has_spike_nearby(self, history, now):
-        return any(abs(now - t) <= self.priority_window for t in history)
+            tracer = self.tracer
+            self.clock.update(len(block), time.time())
+            now = self.clock.latest()
+            first = self.recorder.write(block) if self.recorder else None
+            filtered_block = self.notch.process(block)
+            if tracer:
+                tracer.mark('filter')
+            detector = self.classifier if self.classifier is not None else self.detector
+            fired = detector.process_block(filtered_block, now)
+            if tracer:
+                tracer.mark('detect')
+            for k, events in fired:
+                self._dispatch(events, None if first is None else first + k)
+            self.batcher.push(filtered_block)
+            if tracer:
+                tracer.mark('emit')
+
+    def _dispatch(self, events, sample_index=None):
+        tracer = self.tracer
+        for event in events:
+            self.burst_detected.emit(event.action)
+            posted = self.commands.post(event.action, tracer.block_start if tracer else None)
+            if sample_index is not None:
+                self.recorder.add_event('burst', sample_index, event.channel, event.action)
+                if posted:
+                    self.recorder.add_event('command', sample_index, event.channel, event.action)
 
     def stop(self):
+        # Let run() return from its read (1 s timeout at most) before the port closes under it
         self.running = False
+        self.wait()
+        if self.commands:
+            self.commands.stop()
+        if self.recorder:
+            self.recorder.stop()
         if self.ser and self.ser.is_open:
             self.ser.close()
+        if self.reader:
+            print(f"📊 Serial stats: {self.reader.stats()}")
+            print(f"⏱️ Clock: {self.clock.stats()}")
+        if self.commands:
+            print(f"📤 Command stats: {self.commands.stats()}")
+        if self.recorder:
+            print(f"💾 Recording: {self.recorder.stats()}")
+        if self.tracer:
+            self.tracer.stop_reporting()
+            print(f"⏱️ Latency\n{self.tracer.format_summary()}")
 
 class SerialSignalViewer(QMainWindow):
-    def __init__(self, port='/dev/cu.usbserial-2120', baudrate=115200):
+    def __init__(self, port='/dev/cu.usbserial-2120', baudrate=115200, protocol='ascii', trace=False,
+                 block_size=10, record_path=None, classifier_path=None):
         super().__init__()
 
         self.num_channels = 5
@@ -101,16 +147,38 @@ class SerialSignalViewer(QMainWindow):
         self.duration = 3
         self.sampling_rate = 1000
         self.num_points = int(self.sampling_rate * self.duration)
-        self.time_base = np.linspace(0, self.duration, self.num_points)
 
-        self.data = [np.zeros(self.num_points) for _ in range(self.num_channels)]
+        self.data = RingBuffer(self.num_channels, self.num_points)
 
         self.init_ui()
 
+        # trace=True prints per-stage latency (read -> ... -> servo write) every 5 s
+        tracer = None
+        if trace:
+            tracer = LatencyTracer()
+            tracer.start_reporting(5.0)
+
+        # record_path='session.emgrec' keeps the raw samples and every burst/command
+        recorder = None
+        if record_path:
+            recorder = SessionRecorder(record_path, self.num_channels, self.sampling_rate,
+                                       channel_labels=self.channel_labels, thresholds=self.thresholds,
+                                       channel_actions=self.channel_actions)
+
+        # classifier_path='profiles/alice_lda.json' (from train_classifier.py)
+        # sends one action per recognized gesture instead of per channel
+        classifier = None
+        if classifier_path:
+            model = LDAModel.load(classifier_path)
+            if model.channel_labels and model.channel_labels != self.channel_labels:
+                raise ValueError(f"model is for channels {model.channel_labels}, not {self.channel_labels}")
+            classifier = GestureClassifier(model)
+
         self.reader = SerialReaderThread(
             port, baudrate, self.num_channels,
             self.thresholds, self.cooldown_time,
-            self.priority_window, self.channel_actions
+            self.priority_window, self.channel_actions, protocol, tracer, block_size, recorder,
+            priority=SuppressionGraph.from_labels(self.channel_labels), classifier=classifier
         )
         self.reader.data_received.connect(self.update_plot)
         self.reader.burst_detected.connect(self.print_action)
@@ -139,14 +207,14 @@ class SerialSignalViewer(QMainWindow):
 
         layout.addLayout(grid_layout)
 
-    def update_plot(self, values):
-        for i in range(self.num_channels):
-            self.data[i] = np.roll(self.data[i], -1)
-            self.data[i][-1] = values[i]
+        # Min/max per pixel column, at most 30 fps, only when new samples arrived
+        self.renderer = LivePlotRenderer(self.plots, self.sampling_rate, self.duration, max_fps=30)
+
+    def update_plot(self, block):
+        self.data.extend(block)
 
     def refresh_plot(self):
-        for i in range(self.num_channels):
-            self.plots[i].setData(self.time_base, self.data[i])
+        self.renderer.render(self.data.view(), self.data.total_written)
 
     def print_action(self, action):
         print(f"🎯 Sent action: '{action}'")
@@ -0,0 +1,85 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from emg.calibration import Calibrator
+from emg.detection import BurstDetector
+from emg.engine import AcquisitionEngine
+
+# Guided threshold calibration for one user and electrode placement:
+# a rest period, then a few maximal contractions on each channel. Commands are
+# never sent while calibrating. The profile is saved as JSON and loaded with
+# run_headless.py --profile.
+# Usage: python calibrate.py --user alice [--port /dev/cu.usbserial-2120] [--out profiles/alice.json]
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+CHANNEL_LABELS = [
+    "A0 - Left Wrist", "A1 - Right Wrist", "A2 - Left Elbow", "A4 - Left Leg",
+    "A5 - Right Elbow"
+]
+
+
+def countdown(message, seconds):
+    print(message)
+    end = time.time() + seconds
+    while time.time() < end:
+        print(f"   {end - time.time():4.1f} s", end='\r', flush=True)
+        time.sleep(0.1)
+    print(" " * 12, end='\r')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Calibrate per-channel burst thresholds for a user")
+    parser.add_argument('--user', required=True)
+    parser.add_argument('--port', default='/dev/cu.usbserial-2120')
+    parser.add_argument('--baudrate', type=int, default=115200)
+    parser.add_argument('--protocol', choices=['ascii', 'binary'], default='ascii')
+    parser.add_argument('--out', help="profile path (default profiles/<user>.json)")
+    parser.add_argument('--rest', type=float, default=5.0, help="seconds of rest")
+    parser.add_argument('--contract', type=float, default=4.0, help="seconds per channel for contractions")
+    parser.add_argument('--k-sigma', type=float, default=5.0, help="threshold floor in rest standard deviations")
+    parser.add_argument('--mvc-fraction', type=float, default=0.2, help="threshold as a fraction of the contraction peak")
+    parser.add_argument('--hysteresis', type=float, default=0.6, help="release level between baseline (0) and threshold (1); 0 = off")
+    parser.add_argument('--yes', action='store_true', help="do not wait for Enter between steps")
+    args = parser.parse_args()
+
+    out = args.out or os.path.join(REPO, 'profiles', f"{args.user}.json")
+    num_channels = len(CHANNEL_LABELS)
+    calibrator = Calibrator(num_channels)
+    # Thresholds are irrelevant here: every block goes to the calibrator
+    detector = BurstDetector([float('inf')] * num_channels, [None] * num_channels)
+    engine = AcquisitionEngine(args.port, args.baudrate, num_channels, detector, protocol=args.protocol,
+                               send_commands=False, calibrator=calibrator)
+    engine.start()
+
+    def step(message):
+        if not args.yes:
+            input(f"{message} Press Enter to start.")
+
+    try:
+        time.sleep(1.0)   # let the notch settle on the live signal
+        step("🧘 Relax every muscle and keep still.")
+        calibrator.begin('rest')
+        countdown(f"   Resting for {args.rest:g} s...", args.rest)
+        calibrator.end()
+
+        for channel, label in enumerate(CHANNEL_LABELS):
+            step(f"💪 Next: {label}. Contract it as hard as you can, 3 times, relaxing in between.")
+            calibrator.begin('contraction', channel)
+            countdown(f"   Recording {label} for {args.contract:g} s...", args.contract)
+            calibrator.end()
+    except KeyboardInterrupt:
+        print("\n⚠️ Calibration cancelled, nothing saved.")
+        engine.stop()
+        sys.exit(1)
+    engine.stop()
+
+    profile = calibrator.profile(args.k_sigma, args.mvc_fraction, args.hysteresis,
+                                 channel_labels=CHANNEL_LABELS, user=args.user)
+    print(profile.format_table())
+    for channel in profile.weak_channels():
+        print(f"⚠️ {CHANNEL_LABELS[channel]}: contraction barely above rest noise, check the electrode")
+    profile.save(out)
+    print(f"💾 Profile saved to {out}")
@@ -1,11 +1,13 @@
+import os
 import sys
-import numpy as np
-import serial
-import time
 from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget, QGridLayout
 import pyqtgraph as pg
 from pyqtgraph.Qt import QtCore
-from scipy.signal import iirnotch, lfilter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from emg.detection import BurstDetector, SuppressionGraph
+from emg.engine import AcquisitionEngine
+from emg.plotting import LivePlotRenderer
 
 class SerialSignalViewer(QMainWindow):
     def __init__(self, port='/dev/cu.usbserial-2120', baudrate=115200,
@@ -15,36 +17,43 @@ class SerialSignalViewer(QMainWindow):
         self.sampling_rate = sampling_rate
         self.duration = duration
         self.num_points = int(sampling_rate * duration)
-        self.time_base = np.linspace(0, duration, self.num_points)
 
         self.num_channels = 5
         self.channel_labels = [
             "A0 - Left Wrist", "A1 - Right Wrist", "A2 - Left Elbow", "A4 - Left Leg",
             "A5 - Right Elbow"
         ]
-        self.data = [np.zeros(self.num_points) for _ in range(self.num_channels)]
 
         self.thresholds = [13, 30, 18, 24, 20]
         self.cooldown_time = 0.8
         self.priority_window = 1.0
-        self.last_spike_time = [0] * self.num_channels
-        self.spike_history = [[] for _ in range(self.num_channels)]
-        self.elbow_spike_this_round = set()
-
-        self.b_notch, self.a_notch = iirnotch(60.0, 10.0, fs=sampling_rate)
-
+        # Map channel to command; elbows dominate the same-side wrist
+        self.channel_actions = ['L', 'R', 'F', 'G', 'B']
+
+        detector = BurstDetector(
+            self.thresholds, self.channel_actions,
+            cooldown_time=self.cooldown_time,
+            priority_window=self.priority_window,
+            priority=SuppressionGraph.from_labels(self.channel_labels),
+        )
+        self.engine = AcquisitionEngine(
+            port, baudrate, self.num_channels, detector,
+            sampling_rate=sampling_rate, history_seconds=duration,
+            send_commands=False
+        )
         try:
-            self.ser = serial.Serial(port, baudrate, timeout=1)
-            print(f"✅ Connected to {port} at {baudrate} baud")
+            self.engine.open()
         except Exception as e:
             print(f"❌ Failed to open serial port: {e}")
             sys.exit()
+        self.engine.start()
 
         self.init_ui()
 
+        # The engine acquires at full rate; the window only redraws at ~30 fps
         self.timer = QtCore.QTimer()
         self.timer.timeout.connect(self.update_plot)
-        self.timer.start(1)
+        self.timer.start(33)
 
     def init_ui(self):
         self.central_widget = QWidget()
@@ -64,66 +73,21 @@ class SerialSignalViewer(QMainWindow):
             row, col = i // 2, i % 2
             layout.addWidget(pw, row, col)
 
-    def has_spike_nearby(self, history, now, window):
-        return any(abs(now - t) <= window for t in history)
+        # Min/max per pixel column, at most 30 fps, only when new samples arrived
+        self.renderer = LivePlotRenderer(self.plots, self.sampling_rate, self.duration, max_fps=30)
 
     def update_plot(self):
-        try:
-            line = self.ser.readline().decode().strip()
-            if not line:
-                return
-            values = line.split(',')
-            if len(values) != self.num_channels:
-                return
-            values = [float(v) for v in values]
-        except:
-            return
-
-        now = time.time()
-        self.elbow_spike_this_round.clear()
-        spike_triggered = [False] * self.num_channels
+        for event in self.engine.drain_bursts():
+            print(f"⚡ Burst detected on channel A{event.channel} ({self.channel_labels[event.channel]})")
+            print(f"📤 [Simulated] Would send: {event.action}")
 
-        for i in range(self.num_channels):
-            self.data[i] = np.roll(self.data[i], -1)
-            filtered = lfilter(self.b_notch, self.a_notch, [self.data[i][-2], values[i]])
-            self.data[i][-1] = filtered[-1]
-            self.plots[i].setData(self.time_base, self.data[i])
-
-            if filtered[-1] > self.thresholds[i]:
-                dt = now - self.last_spike_time[i]
-                if dt > self.cooldown_time:
-                    spike_triggered[i] = True
-                    if i == 2 or i == 4:
-                        self.elbow_spike_this_round.add(i)
-
-        for i in range(self.num_channels):
-            if not spike_triggered[i]:
-                continue
-
-            # Elbow priority suppression for wrists
-            if i == 0 and (2 in self.elbow_spike_this_round or self.has_spike_nearby(self.spike_history[2], now, self.priority_window)):
-                continue
-            if i == 1 and (4 in self.elbow_spike_this_round or self.has_spike_nearby(self.spike_history[4], now, self.priority_window)):
-                continue
-
-            print(f"⚡ Burst detected on channel A{i} ({self.channel_labels[i]})")
-            self.last_spike_time[i] = now
-            self.spike_history[i].append(now)
-            self.spike_history[i] = [t for t in self.spike_history[i] if now - t <= 2.0]
-
-            commands = {
-                0: 'L',
-                1: 'R',
-                2: 'F',
-                4: 'B',
-                3: 'G',
-            }
-            if i in commands:
-                print(f"📤 [Simulated] Would send: {commands[i]}")
+        # Decimate straight from the engine's history into the renderer's arrays
+        with self.engine.history_lock:
+            self.renderer.render(self.engine.history.view(), self.engine.history.total_written)
 
     def closeEvent(self, event):
-        self.ser.close()
-        print("🔌 Serial port closed.")
+        self.timer.stop()
+        self.engine.stop()
         event.accept()
 
 if __name__ == '__main__':
@@ -0,0 +1,107 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from emg.calibration import CalibrationProfile, DriftTracker
+from emg.classifier import GestureClassifier, LDAModel
+from emg.detection import BurstDetector, SuppressionGraph
+from emg.engine import AcquisitionEngine
+from emg.pipeline import MultiprocessEngine
+from emg.recorder import SessionRecorder
+from emg.tracing import LatencyTracer
+
+# Acquisition + detection without any window, same settings as final_detection.py.
+# Usage: python run_headless.py --port /dev/cu.usbserial-2120 [--no-send] [--trace] [--record session.emgrec]
+#        [--profile profiles/alice.json [--drift 30]] [--classifier profiles/alice_lda.json]
+
+CHANNEL_LABELS = [
+    "A0 - Left Wrist", "A1 - Right Wrist", "A2 - Left Elbow", "A4 - Left Leg",
+    "A5 - Right Elbow"
+]
+THRESHOLDS = [13, 30, 18, 24, 20]
+CHANNEL_ACTIONS = ['L', 'R', 'F', 'G', 'B']
+
+
+def print_burst(event):
+    if event.channel is None:
+        print(f"⚡ Gesture {event.action} ({event.confidence:.0%})")
+        return
+    print(f"⚡ Burst on A{event.channel} ({CHANNEL_LABELS[event.channel]}) -> {event.action}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run EMG acquisition and detection without the GUI")
+    parser.add_argument('--port', default='/dev/cu.usbserial-2120')
+    parser.add_argument('--baudrate', type=int, default=115200)
+    parser.add_argument('--protocol', choices=['ascii', 'binary'], default='ascii')
+    parser.add_argument('--no-send', action='store_true', help="detect only, do not write commands")
+    parser.add_argument('--trace', action='store_true', help="print per-stage latency percentiles")
+    parser.add_argument('--record', metavar='PATH', help="record raw samples and events (e.g. session.emgrec)")
+    parser.add_argument('--profile', metavar='PATH', help="thresholds from calibrate.py instead of THRESHOLDS")
+    parser.add_argument('--drift', type=float, default=0, metavar='SECONDS',
+                        help="follow baseline drift with this time constant (needs --profile)")
+    parser.add_argument('--classifier', metavar='PATH',
+                        help="gesture model from train_classifier.py instead of per-channel thresholds")
+    parser.add_argument('--processes', action='store_true',
+                        help="acquisition, DSP and this script in separate processes")
+    args = parser.parse_args()
+    if args.processes and (args.trace or args.record or args.drift):
+        parser.error("--trace, --record and --drift need the single-process engine")
+    if args.classifier and (args.profile or args.drift):
+        parser.error("--profile and --drift set thresholds, which --classifier does not use")
+
+    tracer = LatencyTracer() if args.trace else None
+    detector = BurstDetector(THRESHOLDS, CHANNEL_ACTIONS, cooldown_time=0.8,
+                             priority_window=1.0,
+                             priority=SuppressionGraph.from_labels(CHANNEL_LABELS))
+    if args.classifier:
+        model = LDAModel.load(args.classifier)
+        if model.channel_labels and model.channel_labels != CHANNEL_LABELS:
+            parser.error(f"model is for channels {model.channel_labels}, not {CHANNEL_LABELS}")
+        detector = GestureClassifier(model)
+        print(f"✅ Loaded gesture model for {model.user} ({model.created}): {model.classes[1:]}")
+    drift = None
+    if args.profile:
+        profile = CalibrationProfile.load(args.profile)
+        profile.apply(detector, CHANNEL_LABELS)
+        print(f"✅ Loaded profile for {profile.user} ({profile.created})\n{profile.format_table()}")
+        if args.drift:
+            drift = DriftTracker(profile, time_constant=args.drift)
+
+    recorder = None
+    if args.record:
+        recorder = SessionRecorder(args.record, len(THRESHOLDS), channel_labels=CHANNEL_LABELS,
+                                   thresholds=None if args.classifier else detector.thresholds.tolist(),
+                                   channel_actions=CHANNEL_ACTIONS)
+
+    if args.processes:
+        engine = MultiprocessEngine(args.port, args.baudrate, len(THRESHOLDS), detector,
+                                    protocol=args.protocol, send_commands=not args.no_send)
+    else:
+        engine = AcquisitionEngine(args.port, args.baudrate, len(THRESHOLDS), detector,
+                                   protocol=args.protocol, send_commands=not args.no_send, tracer=tracer,
+                                   recorder=recorder, drift=drift)
+    engine.add_burst_listener(print_burst)
+    engine.start()
+
+    try:
+        last_count, last_time = 0, time.time()
+        while engine.running:
+            time.sleep(5)
+            now = time.time()
+            rate = (engine.samples_processed - last_count) / (now - last_time)
+            print(f"📈 {rate:.0f} samples/s")
+            if not args.processes and engine.clock.fits:
+                print(f"⏱️ Board clock {engine.clock.drift_ppm:+.0f} ppm vs host, reads "
+                      f"{engine.clock.stats()['lateness_ms_p99']} ms late (p99)")
+            if drift:
+                print(f"📉 Baseline drift: {drift.drift().round(1).tolist()}")
+            if tracer:
+                print(tracer.format_summary())
+            last_count, last_time = engine.samples_processed, now
+    except KeyboardInterrupt:
+        pass
+    finally:
+        engine.stop()
@@ -1,3 +1,4 @@
+import os
 import sys
 import serial
 import numpy as np
@@ -7,11 +8,17 @@ from PyQt5.QtWidgets import (
 )
 import pyqtgraph as pg
 from pyqtgraph.Qt import QtCore
-from scipy.signal import iirnotch, lfilter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from emg.filters import NotchFilterBank
+from emg.gestures import PatternRecognizer
+from emg.ring_buffer import RingBuffer
+from emg.serial_io import SerialBlockReader
+from emg.timebase import SampleClock
 
 class SerialSignalPlotter(QMainWindow):
     def __init__(self, port='/dev/cu.usbserial-120', baudrate=115200,
-                 refresh_interval=3000, sampling_rate=1000, duration=3):
+                 refresh_interval=30, sampling_rate=1000, duration=3):
         super().__init__()
 
         # 串口参数
@@ -26,17 +33,27 @@ class SerialSignalPlotter(QMainWindow):
         # Notch 滤波器
         self.notch_freq = 60.0
         self.quality_factor = 30.0
-        self.b_notch, self.a_notch = iirnotch(w0=self.notch_freq, Q=self.quality_factor, fs=self.sampling_rate)
+        self.notch = NotchFilterBank(1, self.sampling_rate, self.notch_freq, self.quality_factor)
 
-        # Spike 判定参数
+        # 手势判定参数（时间单位：秒，内部按采样点计数）
         self.spike_threshold = 100                 # 超过此值视为 spike
-        self.same_burst_threshold = 0.8            # <0.8s 属于同一 burst（忽略）
-        self.double_burst_window = 4.0             # 0.8~4.0s 属于双 burst（发送 R）
-        self.last_spike_time = None                # 上次 spike 时间戳
+        self.min_burst = 0.05                      # 短于 0.05s 的 spike 视为噪声
+        self.merge_gap = 0.15                      # 间隔 <0.15s 的 spike 属于同一 burst
+        self.double_burst_window = 1.0             # 两次 burst 起点相隔 ≤1.0s 属于双 burst（R）
+        self.recognizer = PatternRecognizer(
+            [self.spike_threshold], {'single': 'L', 'double': 'R'}, self.sampling_rate,
+            min_burst=self.min_burst, merge_gap=self.merge_gap, double_window=self.double_burst_window)
+
+        # 按采样点数拟合的主机时间，事件时间戳用它而不是 time.time()
+        self.clock = SampleClock(self.sampling_rate)
+
+        # 最近 duration 秒的波形
+        self.history = RingBuffer(1, self.num_points)
 
         # 打开串口
         try:
             self.ser = serial.Serial(self.port, self.baudrate, timeout=1)
+            self.reader = SerialBlockReader(self.ser, 1)
             print(f"✅ Connected to {self.port} at {self.baudrate} baud")
         except Exception as e:
             print(f"❌ Failed to open serial port: {e}")
@@ -75,40 +92,25 @@ class SerialSignalPlotter(QMainWindow):
         self.timer.start(self.refresh_interval)
 
     def update_plot(self):
-        values = []
-        while len(values) < self.num_points:
-            try:
-                line = self.ser.readline().decode().strip()
-                if line:
-                    value = float(line)
-                    values.append(value)
-            except:
-                continue
+        # 只读取已到达的数据，不阻塞界面
+        block = self.reader.read_block(wait=False)
+        if not len(block):
+            return
+        self.clock.update(len(block), time.time())
 
         # 滤波
-        filtered_values = lfilter(self.b_notch, self.a_notch, values)
-        self.curve.setData(self.time_base, filtered_values)
-
-        # Spike 判定 + 串口发送逻辑
-        current_time = time.time()
-        if max(filtered_values) > self.spike_threshold:
-            if self.last_spike_time is None:
-                self.ser.write(b'L')
-                print(f"⬅️ Send: L (first burst @ {current_time:.2f}s)")
-                self.last_spike_time = current_time
-            else:
-                delta = current_time - self.last_spike_time
-                if delta < self.same_burst_threshold:
-                    # 同一 burst，不重复触发
-                    pass
-                elif delta < self.double_burst_window:
-                    self.ser.write(b'R')
-                    print(f"➡️ Send: R (double burst @ {current_time:.2f}s, Δt = {delta:.2f}s)")
-                    self.last_spike_time = None
-                else:
-                    self.ser.write(b'L')
-                    print(f"⬅️ Send: L (new burst @ {current_time:.2f}s)")
-                    self.last_spike_time = current_time
+        filtered = self.notch.process(block)
+        self.history.extend(filtered)
+        self.curve.setData(self.time_base, self.history.view()[0])
+
+        # 手势判定：单次 burst → L，双 burst → R，模式一确定就立即触发
+        first = self.recognizer.samples
+        for row, events in self.recognizer.process_block(filtered, self.clock.latest()):
+            when = (first + row) / self.sampling_rate
+            for event in events:
+                self.ser.write(event.action.encode())
+                arrow = "⬅️" if event.action == 'L' else "➡️"
+                print(f"{arrow} Send: {event.action} ({event.pattern} burst @ {when:.2f}s)")
 
     def start_timer(self):
         if not self.timer.isActive():
@@ -128,7 +130,7 @@ if __name__ == '__main__':
     window = SerialSignalPlotter(
         port='/dev/cu.usbserial-120',
         baudrate=115200,
-        refresh_interval=3000,
+        refresh_interval=30,
         sampling_rate=1000,
         duration=3
     )
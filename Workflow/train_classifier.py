@@ -0,0 +1,111 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from emg.classifier import confusion, cross_validate, train
+from emg.detection import BurstDetector
+from emg.engine import AcquisitionEngine
+
+# Guided training session for the gesture classifier: rest, then each
+# gesture held a few times with rest in between, labeled as it is recorded.
+# Commands are never sent. A 30 s session (the defaults) trains in well
+# under a second; the model is saved as JSON and used with
+# run_headless.py --classifier.
+# Usage: python train_classifier.py --user alice [--port /dev/cu.usbserial-2120] [--out profiles/alice_lda.json]
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+CHANNEL_LABELS = [
+    "A0 - Left Wrist", "A1 - Right Wrist", "A2 - Left Elbow", "A4 - Left Leg",
+    "A5 - Right Elbow"
+]
+CHANNEL_ACTIONS = ['L', 'R', 'F', 'G', 'B']
+
+
+def countdown(message, seconds):
+    print(message)
+    end = time.time() + seconds
+    while time.time() < end:
+        print(f"   {end - time.time():4.1f} s", end='\r', flush=True)
+        time.sleep(0.1)
+    print(" " * 12, end='\r')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Record a labeled session and train the gesture classifier")
+    parser.add_argument('--user', required=True)
+    parser.add_argument('--port', default='/dev/cu.usbserial-2120')
+    parser.add_argument('--baudrate', type=int, default=115200)
+    parser.add_argument('--protocol', choices=['ascii', 'binary'], default='ascii')
+    parser.add_argument('--out', help="model path (default profiles/<user>_lda.json)")
+    parser.add_argument('--rest', type=float, default=4.0, help="seconds of rest at the start")
+    parser.add_argument('--hold', type=float, default=1.5, help="seconds per gesture hold")
+    parser.add_argument('--relax', type=float, default=1.5, help="seconds of rest after each hold")
+    parser.add_argument('--reps', type=int, default=2, help="holds per gesture")
+    parser.add_argument('--window', type=int, default=150, help="feature window (samples)")
+    parser.add_argument('--stride', type=int, default=25, help="samples between decisions")
+    parser.add_argument('--shrinkage', type=float, default=0.1, help="covariance shrinkage, 0-1")
+    parser.add_argument('--yes', action='store_true', help="do not wait for Enter between steps")
+    args = parser.parse_args()
+
+    out = args.out or os.path.join(REPO, 'profiles', f"{args.user}_lda.json")
+    num_channels = len(CHANNEL_LABELS)
+    classes = [None] + CHANNEL_ACTIONS
+    sites = {action: label.split(' - ')[-1] for action, label in zip(CHANNEL_ACTIONS, CHANNEL_LABELS)}
+
+    # Every filtered block is kept, as one (block, label) entry so the engine
+    # thread can't split the pair, with the label current when it arrived.
+    # label None: not recording (notch settling, waiting at a prompt)
+    recorded = []
+    current = {'label': None}
+
+    def record(block):
+        label = current['label']
+        if label is not None:
+            recorded.append((block.copy(), label))
+
+    detector = BurstDetector([float('inf')] * num_channels, [None] * num_channels)
+    engine = AcquisitionEngine(args.port, args.baudrate, num_channels, detector, protocol=args.protocol,
+                               send_commands=False)
+    engine.add_sample_listener(record)
+    engine.start()
+
+    def step(message):
+        if not args.yes:
+            input(f"{message} Press Enter to start.")
+
+    try:
+        time.sleep(1.0)   # let the notch settle on the live signal
+        step("🧘 Relax every muscle and keep still.")
+        current['label'] = 0
+        countdown(f"   Resting for {args.rest:g} s...", args.rest)
+        for rep in range(args.reps):
+            for k, action in enumerate(CHANNEL_ACTIONS, start=1):
+                current['label'] = None
+                step(f"💪 Next ({rep + 1}/{args.reps}): '{action}' - contract your {sites[action].lower()} "
+                     f"and hold it.")
+                current['label'] = k
+                countdown(f"   Hold {action} for {args.hold:g} s...", args.hold)
+                current['label'] = 0
+                countdown(f"   Relax for {args.relax:g} s...", args.relax)
+    except KeyboardInterrupt:
+        print("\n⚠️ Training cancelled, nothing saved.")
+        engine.stop()
+        sys.exit(1)
+    current['label'] = None
+    engine.stop()
+
+    samples = np.concatenate([block for block, _ in recorded])
+    sample_labels = np.concatenate([np.full(len(block), label, dtype=np.int64) for block, label in recorded])
+    start = time.perf_counter()
+    model, x, y = train(samples, sample_labels, classes, args.window, args.stride, shrinkage=args.shrinkage,
+                        channel_labels=CHANNEL_LABELS, user=args.user)
+    elapsed = time.perf_counter() - start
+    print(f"✅ Trained on {len(samples) / 1000:.1f} s ({int((y >= 0).sum())} windows) in {elapsed * 1000:.0f} ms")
+    print(f"📊 Held-out accuracy: {cross_validate(x, y, classes, shrinkage=args.shrinkage):.1%}")
+    print(f"📊 Confusion (rows true, columns predicted, {['rest'] + CHANNEL_ACTIONS}):\n{confusion(model, x, y)}")
+    model.save(out)
+    print(f"💾 Model saved to {out}")
@@ -0,0 +1,77 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PyQt5.QtCore import QCoreApplication, QThread, pyqtSignal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from emg.batching import BlockBatcher
+from emg.ring_buffer import RingBuffer
+
+# Cross-thread delivery into the GUI thread: one pyqtSignal(list) per sample
+# (old SerialReaderThread) vs one NumPy block per block_size samples. The
+# producer pushes 10 s of 1 kHz data as fast as it can; reported is the time
+# until the GUI thread has appended every sample, and the number of signals.
+# Run: python benchmarks/bench_batching.py
+
+SAMPLING_RATE = 1000
+SECONDS = 10
+
+
+class Producer(QThread):
+    per_sample = pyqtSignal(list)
+    per_block = pyqtSignal(object)
+
+    def __init__(self, samples, block_size):
+        super().__init__()
+        self.samples = samples
+        self.block_size = block_size
+
+    def run(self):
+        # Reads arrive as 5 ms chunks, like SerialBlockReader under load
+        if self.block_size is None:
+            for row in self.samples:
+                self.per_sample.emit(row.tolist())
+            return
+        batcher = BlockBatcher(self.samples.shape[1], self.per_block.emit, block_size=self.block_size)
+        for start in range(0, len(self.samples), 5):
+            batcher.push(self.samples[start:start + 5])
+        batcher.flush()
+
+
+def run(app, num_channels, block_size):
+    samples = np.random.default_rng(0).normal(0, 30, (SAMPLING_RATE * SECONDS, num_channels))
+    data = RingBuffer(num_channels, 3 * SAMPLING_RATE)
+    signals = [0]
+
+    def on_sample(values):
+        data.append(values)
+        signals[0] += 1
+
+    def on_block(block):
+        data.extend(block)
+        signals[0] += 1
+
+    producer = Producer(samples, block_size)
+    producer.per_sample.connect(on_sample)
+    producer.per_block.connect(on_block)
+    start = time.perf_counter()
+    producer.start()
+    while data.total_written < len(samples):
+        app.processEvents()
+    producer.wait()
+    return time.perf_counter() - start, signals[0]
+
+
+if __name__ == '__main__':
+    app = QCoreApplication(sys.argv)
+    print(f"{'channels':>8} {'delivery':>14} {'signals':>8} {'seconds':>8} {'samples/s':>12}")
+    for num_channels in (6, 64):
+        for block_size in (None, 10, 20):
+            elapsed, signals = run(app, num_channels, block_size)
+            name = 'per sample' if block_size is None else f'block of {block_size}'
+            print(f"{num_channels:>8} {name:>14} {signals:>8} {elapsed:>8.3f} "
+                  f"{SAMPLING_RATE * SECONDS / elapsed:>12,.0f}")
@@ -0,0 +1,84 @@
+import os
+import sys
+import time
+
+import numpy as np
+from scipy.signal import butter, filtfilt, hilbert, iirnotch, lfilter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from emg.bursts import BurstSegmenter, detect_bursts
+
+# Old per-sample detect_bursts loop vs the run-length version on
+# long_test_signal.csv, with the same envelope as real_data_read_and_detection_test.py.
+# Run: python benchmarks/bench_bursts.py
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+CSV_PATH = os.path.join(REPO, 'test', 'long_test_signal.csv')
+THRESHOLD = 0.12
+MIN_BURST = 0.05
+MIN_SILENCE = 0.05
+
+
+def loop_detect_bursts(envelope, t_window, fs):
+    # Copy of the original CSVSignalPlotter.detect_bursts
+    is_active = envelope > THRESHOLD
+    bursts = []
+    start = None
+    silence_counter = 0
+    for i, active in enumerate(is_active):
+        if active:
+            if start is None:
+                start = i
+            silence_counter = 0
+        elif start is not None:
+            silence_counter += 1
+            if silence_counter > MIN_SILENCE * fs:
+                end = i - silence_counter
+                if (end - start) / fs >= MIN_BURST:
+                    bursts.append((t_window[start], t_window[end]))
+                start = None
+                silence_counter = 0
+    if start is not None:
+        end = len(envelope)
+        if (end - start) / fs >= MIN_BURST:
+            bursts.append((t_window[start], t_window[end - 1]))
+    return bursts
+
+
+def timed(fn, repeats=5):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeats
+
+
+if __name__ == '__main__':
+    data = np.loadtxt(CSV_PATH, delimiter=',', skiprows=1)
+    t, y = data[:, 0], data[:, 1]
+    fs = 1 / (t[1] - t[0])
+    b_notch, a_notch = iirnotch(60.0, 30.0, fs)
+    b_lp, a_lp = butter(2, 5 / (0.5 * fs), btype='low')
+    envelope = filtfilt(b_lp, a_lp, np.abs(hilbert(lfilter(b_notch, a_notch, y))))
+    n = len(envelope)
+
+    old, old_time = timed(lambda: loop_detect_bursts(envelope, t, fs))
+    new, new_time = timed(lambda: detect_bursts(envelope, THRESHOLD, fs, MIN_BURST, MIN_SILENCE, t))
+    assert old == new
+    print(f"whole file ({n} samples, {len(new)} bursts)")
+    print(f"  python loop: {old_time * 1000:8.2f} ms")
+    print(f"  run-length:  {new_time * 1000:8.2f} ms  ({old_time / new_time:.0f}x)")
+
+    window = int(fs * 3)
+
+    def windowed_incremental():
+        segmenter = BurstSegmenter(1, THRESHOLD, fs, MIN_BURST, MIN_SILENCE)
+        found = [segmenter.process(envelope[s:s + window]) for s in range(0, n, window)]
+        found.append(segmenter.flush())
+        return sum(len(c) for c, _, _ in found)
+
+    _, inc_time = timed(windowed_incremental)
+    print(f"  incremental, 3 s windows: {inc_time * 1000:8.2f} ms")
+
+    stacked = np.tile(envelope[:, None], (1, 6))
+    _, multi_time = timed(lambda: detect_bursts(stacked, THRESHOLD, fs, MIN_BURST, MIN_SILENCE, t))
+    print(f"  6 channels in one call:   {multi_time * 1000:8.2f} ms")
@@ -0,0 +1,134 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from emg.classifier import GestureClassifier, confusion, cross_validate, feature_vectors, train, window_labels
+from emg.detection import BurstDetector, SuppressionGraph
+from emg.features import FeatureExtractor
+from emg.filters import NotchFilterBank
+
+# LDA gesture classifier against the threshold detector + elbow priority on
+# synthetic sessions with crosstalk: bending an elbow also lights up the
+# wrist on that side at 90% (and a wrist gesture the elbow at 40%), and
+# contraction strength varies 2:1 between repetitions. Trains on one 30 s
+# session, tests on a 60 s one with slightly different electrode gains.
+# Reports training time, held-out accuracy, the streaming cost per decision
+# window (features + LDA + vote), and per gesture whether the right command
+# (and only it) fired, and how fast.
+# Run: python benchmarks/bench_classifier.py
+
+SAMPLING_RATE = 1000
+LABELS = ["A0 - Left Wrist", "A1 - Right Wrist", "A2 - Left Elbow", "A3 - Right Elbow", "A4 - Left Leg"]
+ACTIONS = ['L', 'R', 'F', 'B', 'G']
+CLASSES = [None] + ACTIONS
+MIXING = np.array([          # gesture -> activation per channel
+    [1.0, 0.0, 0.4, 0.0, 0.1],   # L  left wrist
+    [0.0, 1.0, 0.0, 0.4, 0.0],   # R  right wrist
+    [0.9, 0.0, 1.0, 0.0, 0.1],   # F  left elbow
+    [0.0, 0.9, 0.0, 1.0, 0.0],   # B  right elbow
+    [0.1, 0.0, 0.1, 0.0, 1.0],   # G  left leg
+])
+HOLD = 1.5
+REST = 1.5
+
+
+def simulate(seconds, seed, gain_spread=0.0):
+    # ADC-like samples around 512 with 60 Hz hum, per-sample class labels and
+    # (start, end, class) per hold
+    rng = np.random.default_rng(seed)
+    n = int(seconds * SAMPLING_RATE)
+    labels = np.zeros(n, dtype=np.int64)
+    activation = np.zeros((n, len(LABELS)))
+    holds = []
+    t = int(2.0 * SAMPLING_RATE)
+    order = rng.permutation(np.tile(np.arange(len(ACTIONS)), int(seconds // ((HOLD + REST) * len(ACTIONS))) + 1))
+    ramp = np.sin(np.linspace(0, np.pi / 2, 50)) ** 2
+    for gesture in order:
+        hold = int(HOLD * SAMPLING_RATE * rng.uniform(0.8, 1.2))
+        if t + hold >= n:
+            break
+        envelope = np.ones(hold) * rng.uniform(0.7, 1.4)
+        envelope[:50] *= ramp
+        envelope[-50:] *= ramp[::-1]
+        activation[t:t + hold] += envelope[:, None] * MIXING[gesture]
+        labels[t:t + hold] = gesture + 1
+        holds.append((t, t + hold, gesture + 1))
+        t += hold + int(REST * SAMPLING_RATE * rng.uniform(0.8, 1.2))
+    activation *= rng.uniform(1 - gain_spread, 1 + gain_spread, len(LABELS))
+    time_axis = np.arange(n) / SAMPLING_RATE
+    signal = 512 + 4 * rng.standard_normal((n, len(LABELS))) \
+        + 60 * activation * rng.standard_normal((n, len(LABELS))) \
+        + 20 * np.sin(2 * np.pi * 60 * time_axis)[:, None]
+    return np.clip(np.rint(signal), 0, 1023), labels, holds
+
+
+def stream(detector, filtered, block_size=20):
+    # Feeds blocks with a sample clock; returns [(sample, action)] and seconds spent
+    fired = []
+    elapsed = 0.0
+    detect = filtered if not isinstance(detector, BurstDetector) else np.abs(filtered - 512)
+    for start in range(0, len(filtered), block_size):
+        block = detect[start:start + block_size]
+        t0 = time.perf_counter()
+        result = detector.process_block(block, start / SAMPLING_RATE)
+        elapsed += time.perf_counter() - t0
+        for row, events in result:
+            fired.extend((start + row, event.action) for event in events)
+    return fired, elapsed
+
+
+def score(fired, holds, n):
+    # Per hold: right command first and nothing wrong; latency from onset.
+    # Fires outside any hold (plus 300 ms after) count as false.
+    correct = wrong = 0
+    latencies = []
+    inside = np.zeros(n + 1, dtype=bool)
+    for start, end, gesture in holds:
+        inside[start:min(n, end + 300)] = True
+        actions = [(s, a) for s, a in fired if start <= s < end + 300]
+        if actions and actions[0][1] == CLASSES[gesture] and all(a == CLASSES[gesture] for _, a in actions):
+            correct += 1
+            latencies.append((actions[0][0] - start) / SAMPLING_RATE * 1000)
+        elif actions:
+            wrong += 1
+    false = sum(1 for s, _ in fired if not inside[s])
+    return correct, wrong, false, (np.median(latencies) if latencies else float('nan'))
+
+
+if __name__ == '__main__':
+    raw_train, labels_train, _ = simulate(30, seed=1)
+    raw_test, labels_test, holds_test = simulate(60, seed=2, gain_spread=0.15)
+    filtered_train = NotchFilterBank(len(LABELS), SAMPLING_RATE).process(raw_train)
+    filtered_test = NotchFilterBank(len(LABELS), SAMPLING_RATE).process(raw_test)
+
+    print(f"{'window':>6} {'stride':>6} {'train s':>8} {'cv acc':>7} {'test acc':>9} {'us/window':>10} "
+          f"{'gestures ok':>12} {'wrong':>6} {'false':>6} {'latency ms':>11}")
+    for window, stride in ((200, 50), (150, 25), (100, 25)):
+        start = time.perf_counter()
+        model, x, y = train(filtered_train, labels_train, CLASSES, window, stride, SAMPLING_RATE)
+        train_seconds = time.perf_counter() - start
+        accuracy_cv = cross_validate(x, y, CLASSES)
+
+        extractor = FeatureExtractor(len(LABELS), window, stride, SAMPLING_RATE)
+        x_test = feature_vectors(extractor.process(filtered_test))
+        y_test = window_labels(labels_test, len(x_test), window, stride, len(CLASSES))
+        matrix = confusion(model, x_test, y_test)
+        accuracy_test = np.trace(matrix) / matrix.sum()
+
+        classifier = GestureClassifier(model, vote=3, min_confidence=0.6)
+        fired, elapsed = stream(classifier, filtered_test)
+        correct, wrong, false, latency = score(fired, holds_test, len(filtered_test))
+        print(f"{window:>6} {stride:>6} {train_seconds:>8.2f} {accuracy_cv:>7.1%} {accuracy_test:>9.1%} "
+              f"{elapsed / classifier.decisions * 1e6:>10.1f} {correct:>6}/{len(holds_test):<5} {wrong:>6} "
+              f"{false:>6} {latency:>11.0f}")
+
+    detector = BurstDetector([45] * len(LABELS), ACTIONS, cooldown_time=0.8, priority_window=1.0,
+                             priority=SuppressionGraph.from_labels(LABELS), same_sample_priority=False)
+    fired, _ = stream(detector, filtered_test)
+    correct, wrong, false, latency = score(fired, holds_test, len(filtered_test))
+    print(f"\nthreshold + elbow priority: {correct}/{len(holds_test)} gestures ok, {wrong} wrong, "
+          f"{false} false, median latency {latency:.0f} ms")
+    print(f"confusion (rows true, columns predicted, {CLASSES}):\n{matrix}")
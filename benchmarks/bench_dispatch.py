@@ -0,0 +1,58 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from emg.dispatch import CommandDispatcher
+
+# A reader loop that fires a command every 50 ms against a port whose write()
+# takes up to write_timeout (TX buffer full). Inline writes stall the loop;
+# CommandDispatcher keeps it on schedule and coalesces the backlog.
+# Run: python benchmarks/bench_dispatch.py
+
+BLOCK_SECONDS = 0.01     # reader wakes up every 10 ms
+WRITE_SECONDS = 0.1      # write_timeout=0.1 on a stuck port
+RUN_SECONDS = 3.0
+
+
+class SlowSerial:
+    def __init__(self):
+        self.written = []
+
+    def write(self, data):
+        time.sleep(WRITE_SECONDS)
+        self.written.append(data)
+        return len(data)
+
+
+def reader_loop(send):
+    # Returns the worst lateness of a block, in ms
+    start = time.perf_counter()
+    worst = 0.0
+    block = 0
+    while time.perf_counter() - start < RUN_SECONDS:
+        due = start + block * BLOCK_SECONDS
+        worst = max(worst, time.perf_counter() - due)
+        if block % 5 == 0:
+            send('LR'[block // 5 % 2])
+        block += 1
+        delay = start + block * BLOCK_SECONDS - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    return worst * 1000
+
+
+if __name__ == '__main__':
+    ser = SlowSerial()
+    inline = reader_loop(lambda action: ser.write(action.encode()))
+    print(f"inline write:       worst block lateness {inline:7.1f} ms, {len(ser.written)} writes")
+
+    ser = SlowSerial()
+    commands = CommandDispatcher(ser).start()
+    queued = reader_loop(commands.post)
+    commands.stop()
+    stats = commands.stats()
+    print(f"CommandDispatcher:  worst block lateness {queued:7.1f} ms, {stats['written']} writes, "
+          f"{stats['coalesced']} coalesced, {stats['dropped']} dropped, max depth {stats['max_depth']}")
+    print(f"  queued p95 {stats['latency_us']['queued']['p95_us'] / 1000:.1f} ms, "
+          f"write p95 {stats['latency_us']['write']['p95_us'] / 1000:.1f} ms")
@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from emg.features import FeatureExtractor
+
+# Streaming FeatureExtractor (running sums, O(block)) against recomputing
+# every window from a buffer of the last `window` samples (O(window) per
+# window), fed the same blocks, at 6 and 64 channels. The streaming cost
+# depends on the block only, the recompute cost grows with window / stride.
+# Also checks that both give the same features.
+# Run: python benchmarks/bench_features.py
+
+SAMPLING_RATE = 1000
+NUM_SAMPLES = 30000
+BLOCK_SIZE = 20
+REPEATS = 3
+
+
+class RecomputeExtractor:
+    # Keeps the last `window` samples and computes each finished window from scratch
+    def __init__(self, num_channels, window, stride):
+        self.window = window
+        self.stride = stride
+        self.buffer = np.zeros((0, num_channels))
+        self.samples = 0
+
+    def process(self, block):
+        start = self.samples
+        self.samples += len(block)
+        buffer = np.concatenate((self.buffer, block))
+        first = max(0, -(-(start + 1 - self.window) // self.stride))
+        ends = self.window + first * self.stride + np.arange(0, len(block) + 1, self.stride)
+        ends = ends[ends <= self.samples]
+        out = []
+        if len(ends):
+            windows = sliding_window_view(buffer, self.window, axis=0)[ends - 1 - (self.samples - len(buffer))
+                                                                        - self.window + 1]
+            x = windows.transpose(0, 2, 1)                      # (windows, samples, channels)
+            step = np.diff(x, axis=1)
+            out = np.stack([
+                np.abs(x).mean(axis=1),
+                np.sqrt((x * x).mean(axis=1)),
+                np.abs(step).sum(axis=1),
+                (x[:, :-1] * x[:, 1:] < 0).sum(axis=1),
+                (step[:, :-1] * -step[:, 1:] > 0).sum(axis=1),
+            ], axis=-1).astype(np.float32)
+        self.buffer = buffer[-self.window:]
+        return out
+
+
+def run(extractor, x):
+    start = time.perf_counter()
+    parts = [extractor.process(x[s:s + BLOCK_SIZE]) for s in range(0, len(x), BLOCK_SIZE)]
+    elapsed = time.perf_counter() - start
+    return elapsed, np.concatenate([p for p in parts if len(p)])
+
+
+if __name__ == '__main__':
+    print(f"block {BLOCK_SIZE} samples, {NUM_SAMPLES} samples per run, best of {REPEATS}")
+    print(f"{'channels':>8} {'window':>7} {'stride':>7} {'streaming':>14} {'recompute':>14} {'speedup':>8} "
+          f"{'us/block':>9} {'max diff':>9}   (samples/sec)")
+    for num_channels in (6, 64):
+        x = np.random.default_rng(0).normal(0, 50, (NUM_SAMPLES, num_channels))
+        for window, stride in ((200, 50), (200, 10), (1000, 50)):
+            streaming = recompute = None
+            for _ in range(REPEATS):
+                t_stream, f_stream = run(FeatureExtractor(num_channels, window, stride, highpass=None), x)
+                t_recompute, f_recompute = run(RecomputeExtractor(num_channels, window, stride), x)
+                streaming = t_stream if streaming is None else min(streaming, t_stream)
+                recompute = t_recompute if recompute is None else min(recompute, t_recompute)
+            diff = np.abs(f_stream - f_recompute).max()
+            print(f"{num_channels:>8} {window:>7} {stride:>7} {NUM_SAMPLES / streaming:>14,.0f} "
+                  f"{NUM_SAMPLES / recompute:>14,.0f} {recompute / streaming:>7.1f}x "
+                  f"{streaming / (NUM_SAMPLES / BLOCK_SIZE) * 1e6:>9.1f} {diff:>9.2g}")
@@ -0,0 +1,52 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from emg.detection import BurstDetector
+from emg.engine import AcquisitionEngine
+from emg.firmware import FirmwareEmulator
+from emg.virtual_board import VirtualBoard
+
+# Closed loop on a pty: the engine detects bursts and sends commands, the
+# emulated sketch moves its servos and (old sketch) stops sampling for 500 ms.
+# Compares samples reaching the host for delay(500) vs the millis() loop.
+# Run: python benchmarks/bench_firmware.py
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+CSV_PATH = os.path.join(REPO, 'test', 'simulated_30s_6channel_emg.csv')
+THRESHOLDS = [650] * 6
+ACTIONS = ['L', 'R', 'F', 'B', 'G', 'O']
+SPEED = 10
+
+
+def run(blocking, timeout=60):
+    firmware = FirmwareEmulator(blocking=blocking)
+    with VirtualBoard(CSV_PATH, speed=SPEED, protocol='binary', firmware=firmware) as board:
+        detector = BurstDetector(THRESHOLDS, ACTIONS, priority={0: 2, 1: 3})
+        engine = AcquisitionEngine(board.port, 115200, board.num_channels, detector, protocol='binary')
+        engine.open()
+        engine.start()
+        start = time.perf_counter()
+        while not board.finished or engine.samples_processed < board.samples_sent:
+            if time.perf_counter() - start > timeout:
+                break
+            time.sleep(0.005)
+        elapsed = time.perf_counter() - start
+        engine.running = False
+        engine.thread.join()
+        engine.commands.stop()
+        engine.ser.close()
+        return engine, firmware, elapsed
+
+
+if __name__ == '__main__':
+    for blocking in (True, False):
+        engine, firmware, elapsed = run(blocking)
+        stats = firmware.stats()
+        total = stats['samples_sent'] + stats['samples_missed']
+        name = 'delay(500)' if blocking else 'millis()'
+        print(f"{name:>10}: host got {engine.samples_processed}/{total} samples "
+              f"({engine.samples_processed / elapsed:,.0f}/s at {SPEED}x), "
+              f"{stats['servo_writes']} servo writes, frames lost seen by host: "
+              f"{engine.reader.stats()['frames_lost']}")
@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from emg.framing import BinaryFrameDecoder, encode_frames
+from emg.serial_io import LineBlockParser
+
+# ASCII lines vs binary frames on a simulated 6-channel byte stream:
+# wire bytes per sample, the sample rate 115200 baud can carry, host decode
+# speed, and how the binary decoder recovers from corrupted bytes.
+# Run: python benchmarks/bench_framing.py
+
+NUM_CHANNELS = 6
+NUM_SAMPLES = 30000
+BAUD = 115200
+CHUNK_BYTES = 512
+BYTES_PER_SEC = BAUD / 10    # 8N1: start + 8 data + stop bits per byte
+
+
+def ascii_stream(samples):
+    return b''.join((','.join(map(str, row)) + '\r\n').encode() for row in samples)
+
+
+def decode(parser, data):
+    start = time.perf_counter()
+    blocks = [parser.feed(data[k:k + CHUNK_BYTES]) for k in range(0, len(data), CHUNK_BYTES)]
+    elapsed = time.perf_counter() - start
+    return np.vstack(blocks), elapsed
+
+
+if __name__ == '__main__':
+    samples = np.random.default_rng(0).integers(0, 1024, (NUM_SAMPLES, NUM_CHANNELS))
+    streams = {
+        'ascii': (ascii_stream(samples), LineBlockParser(NUM_CHANNELS)),
+        'binary': (encode_frames(samples), BinaryFrameDecoder(NUM_CHANNELS)),
+    }
+
+    print(f"{'mode':>8} {'bytes/sample':>13} {'max Hz @115200':>15} {'decode samples/s':>17}")
+    for mode, (data, parser) in streams.items():
+        decoded, elapsed = decode(parser, data)
+        assert (decoded == samples).all()
+        per_sample = len(data) / NUM_SAMPLES
+        print(f"{mode:>8} {per_sample:>13.1f} {BYTES_PER_SEC / per_sample:>15,.0f} "
+              f"{NUM_SAMPLES / elapsed:>17,.0f}")
+
+    # Flip random bits and drop a run of bytes, then check the decoder recovers
+    data = bytearray(streams['binary'][0])
+    rng = np.random.default_rng(1)
+    for pos in rng.integers(0, len(data), 50):
+        data[pos] ^= 1 << int(rng.integers(0, 8))
+    del data[len(data) // 2:len(data) // 2 + 7]
+    decoder = BinaryFrameDecoder(NUM_CHANNELS)
+    decoded, _ = decode(decoder, bytes(data))
+    print(f"\ncorrupted stream: {len(decoded)} of {NUM_SAMPLES} frames decoded, {decoder.stats()}")
@@ -0,0 +1,144 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from emg.filters import NotchFilterBank
+from emg.gestures import PatternRecognizer
+
+# Decision latency of the streaming PatternRecognizer against the 3 s window
+# logic that Workflow/test_one_one.py and test/read_detection_test.py used
+# before: read 3000 samples, spike if the window's max is over threshold,
+# first spike L, another 0.8-4 s later R. Synthetic single-channel session of
+# singles, doubles (0.2-0.5 s pause between the bursts) and 1.5 s holds
+# with 2.5-4 s of rest in between. Per pattern: how many got exactly their
+# command (single L, double R, hold H; the window logic has no hold, and
+# sends L then R for a double, which counts) and the median delay from the
+# gesture's first onset to the last command. Also checks that the
+# recognizer decides the same samples whatever the block size, and that it
+# only reports rows inside the block it was given (also with no hold action,
+# where a hold is a burst longer than the double window).
+# Run: python benchmarks/bench_gestures.py
+
+SAMPLING_RATE = 1000
+THRESHOLD = 100
+EXPECTED = {'single': 'L', 'double': 'R', 'hold': 'H'}
+
+
+def simulate(seconds, seed):
+    # Raw samples around 512 plus (onset, pattern) per gesture
+    rng = np.random.default_rng(seed)
+    n = int(seconds * SAMPLING_RATE)
+    activation = np.zeros(n)
+    gestures = []
+    t = 2 * SAMPLING_RATE
+    while True:
+        pattern = rng.choice(list(EXPECTED))
+        if pattern == 'hold':
+            bursts = [(0, int(1.5 * SAMPLING_RATE))]
+        else:
+            bursts = [(0, int(rng.uniform(0.15, 0.3) * SAMPLING_RATE))]
+            if pattern == 'double':
+                gap = bursts[0][1] + int(rng.uniform(0.2, 0.5) * SAMPLING_RATE)
+                bursts.append((gap, int(rng.uniform(0.15, 0.3) * SAMPLING_RATE)))
+        end = t + bursts[-1][0] + bursts[-1][1]
+        if end >= n - 5 * SAMPLING_RATE:
+            break
+        for offset, length in bursts:
+            activation[t + offset:t + offset + length] = rng.uniform(0.8, 1.2)
+        gestures.append((t, pattern))
+        t = end + int(rng.uniform(2.5, 4.0) * SAMPLING_RATE)
+    time_axis = np.arange(n) / SAMPLING_RATE
+    signal = 512 + 5 * rng.standard_normal(n) + 250 * activation * rng.standard_normal(n) \
+        + 30 * np.sin(2 * np.pi * 60 * time_axis)
+    return np.clip(np.rint(signal), 0, 1023)[:, None], gestures
+
+
+def window_logic(filtered, window=3000, same_burst=0.8, double_window=4.0):
+    # The old update_plot, with the clock at the end of each blocking read
+    fired = []
+    last_spike = None
+    for end in range(window, len(filtered) + 1, window):
+        now = end / SAMPLING_RATE
+        if filtered[end - window:end].max() > THRESHOLD:
+            if last_spike is None:
+                fired.append((end - 1, 'L'))
+                last_spike = now
+            elif now - last_spike < same_burst:
+                pass
+            elif now - last_spike < double_window:
+                fired.append((end - 1, 'R'))
+                last_spike = None
+            else:
+                fired.append((end - 1, 'L'))
+                last_spike = now
+    return fired
+
+
+def streaming(filtered, block_size, actions=EXPECTED):
+    recognizer = PatternRecognizer([THRESHOLD], actions, SAMPLING_RATE,
+                                   min_burst=0.05, merge_gap=0.15, double_window=1.0, hold_time=1.0)
+    fired = []
+    elapsed = 0.0
+    for start in range(0, len(filtered), block_size):
+        block = filtered[start:start + block_size]
+        t0 = time.perf_counter()
+        result = recognizer.process_block(block, start / SAMPLING_RATE)
+        elapsed += time.perf_counter() - t0
+        for row, events in result:
+            assert 0 <= row < len(block), f"row {row} outside a block of {len(block)} at sample {start}"
+            fired.extend((start + row, event.action) for event in events)
+    return fired, elapsed
+
+
+def score(fired, gestures, n, accepted=None):
+    # Commands between a gesture's onset and the next one are its answer;
+    # accepted: extra {pattern: [command, ...]} sequences that count as right
+    accepted = accepted or {}
+    rows = {pattern: [0, 0, []] for pattern in EXPECTED}
+    bounds = [onset for onset, _ in gestures] + [n]
+    for (onset, pattern), stop in zip(gestures, bounds[1:]):
+        actions = [(s, a) for s, a in fired if onset <= s < stop]
+        rows[pattern][0] += 1
+        sequence = [a for _, a in actions]
+        if sequence == [EXPECTED[pattern]] or sequence == accepted.get(pattern):
+            rows[pattern][1] += 1
+            rows[pattern][2].append((actions[-1][0] - onset) / SAMPLING_RATE * 1000)
+    return rows
+
+
+def report(name, rows):
+    cells = []
+    for pattern in EXPECTED:
+        total, ok, latencies = rows[pattern]
+        latency = f"{np.median(latencies):.0f}" if latencies else '-'
+        cells.append(f"{ok:>4}/{total:<4} {latency:>7}")
+    print(f"{name:<22} " + "  ".join(cells))
+
+
+if __name__ == '__main__':
+    raw, gestures = simulate(300, seed=0)
+    filtered = NotchFilterBank(1, SAMPLING_RATE).process(raw)
+    filtered = np.abs(filtered - np.median(filtered))
+
+    print(f"{len(gestures)} gestures over {len(raw) / SAMPLING_RATE:.0f} s; cells: exact command / gestures, "
+          f"median ms from first onset")
+    print(f"{'':<22} " + "  ".join(f"{p:^16}" for p in EXPECTED))
+    report("3 s window (old)", score(window_logic(filtered), gestures, len(raw), {'double': ['L', 'R']}))
+    reference = None
+    for block_size in (1, 30, 250):
+        fired, elapsed = streaming(filtered, block_size)
+        report(f"streaming, {block_size:>3}-sample", score(fired, gestures, len(raw)))
+        if reference is None:
+            reference = fired
+        same = 'same decisions' if fired == reference else 'DIFFERENT decisions'
+        print(f"{'':<22} {elapsed / len(raw) * 1e6:.2f} us/sample, {same} as 1-sample blocks")
+    # Without a hold action a hold is just a long single
+    no_hold = {'single': 'L', 'double': 'R'}
+    runs = [streaming(filtered, block_size, no_hold)[0] for block_size in (1, 30, 250)]
+    rows = score(runs[0], gestures, len(raw), {'hold': ['L']})
+    report("no hold action", rows)
+    print(f"{'':<22} {'same' if runs[1] == runs[0] == runs[2] else 'DIFFERENT'} decisions at 1/30/250-sample blocks")
+    print("\nold window logic blocks the GUI thread 3000 ms per read; the streaming path returns at once")
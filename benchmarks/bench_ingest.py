@@ -0,0 +1,76 @@
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from emg.serial_io import SerialBlockReader
+
+# Compare readline()+split parsing against SerialBlockReader on the same bytes.
+# Run: python benchmarks/bench_ingest.py
+
+NUM_SAMPLES = 30000
+CHUNK_BYTES = 1200   # roughly what piles up in the USB buffer between reads
+
+
+class FakeSerial(io.RawIOBase):
+    # Like pyserial, readline() comes from io.RawIOBase and pulls one byte at a time
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+
+    def readable(self):
+        return True
+
+    @property
+    def in_waiting(self):
+        return min(CHUNK_BYTES, len(self.data) - self.pos)
+
+    def readinto(self, b):
+        n = min(len(b), len(self.data) - self.pos)
+        b[:n] = self.data[self.pos:self.pos + n]
+        self.pos += n
+        return n
+
+
+def make_stream(num_channels):
+    values = np.random.default_rng(0).integers(0, 1024, (NUM_SAMPLES, num_channels))
+    return b''.join((','.join(map(str, row)) + '\r\n').encode() for row in values)
+
+
+def readline_path(data, num_channels):
+    ser = FakeSerial(data)
+    count = 0
+    while True:
+        line = ser.readline().decode().strip()
+        if not line:
+            break
+        values = list(map(float, line.split(',')))
+        if len(values) == num_channels:
+            count += 1
+    return count
+
+
+def block_path(data, num_channels):
+    reader = SerialBlockReader(FakeSerial(data), num_channels)
+    count = 0
+    while True:
+        block = reader.read_block(wait=False)
+        if reader.ser.in_waiting == 0 and len(block) == 0:
+            break
+        count += len(block)
+    return count
+
+
+if __name__ == '__main__':
+    print(f"{'channels':>8} {'readline':>14} {'block':>14}   (samples/sec)")
+    for num_channels in (5, 6, 32):
+        data = make_stream(num_channels)
+        results = []
+        for fn in (readline_path, block_path):
+            start = time.perf_counter()
+            assert fn(data, num_channels) == NUM_SAMPLES
+            results.append(NUM_SAMPLES / (time.perf_counter() - start))
+        print(f"{num_channels:>8} {results[0]:>14,.0f} {results[1]:>14,.0f}")
@@ -0,0 +1,98 @@
+import argparse
+import multiprocessing as mp
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from emg.detection import BurstDetector, SuppressionGraph
+from emg.multiboard import Board, MultiBoardEngine
+from emg.virtual_board import VirtualBoard
+
+# N pty boards at 1 kHz each, all read by one MultiBoardEngine thread.
+# The boards run in a separate process so their streaming threads are not
+# counted against the host. Reports per-board throughput, samples lost, the
+# loop thread's CPU share (time.thread_time) and command latency from
+# bytes read to command written (worst board). "commands" is written by the
+# host / received by the boards while they were still streaming.
+# Run: python benchmarks/bench_multiboard.py [--seconds 10] [--boards 1 4 8 12]
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+CSV_PATH = os.path.join(REPO, 'test', 'simulated_30s_6channel_emg.csv')
+LABELS = ["A0 - Left Wrist", "A1 - Right Wrist", "A2 - Left Elbow", "A3 - Right Elbow",
+          "A4 - Left Leg", "A5 - Right Leg"]
+ACTIONS = ['L', 'R', 'F', 'B', 'G', 'O']
+
+
+def serve_boards(count, ports, stop, done, results):
+    boards = [VirtualBoard(CSV_PATH, loop=True).start() for _ in range(count)]
+    ports.put([board.port for board in boards])
+    stop.wait()
+    # Stop streaming (and listening) but keep the ptys open until the host
+    # has read everything
+    for board in boards:
+        board.running = False
+    for board in boards:
+        board.threads[0].join(timeout=1.0)
+    results.put([board.samples_sent for board in boards])
+    done.wait()
+    for board in boards:
+        board.stop()
+    results.put([len(board.commands) for board in boards])
+
+
+def run(count, seconds):
+    context = mp.get_context('spawn')
+    ports, results, stop, done = context.Queue(), context.Queue(), context.Event(), context.Event()
+    server = context.Process(target=serve_boards, args=(count, ports, stop, done, results), daemon=True)
+    server.start()
+    engine = MultiBoardEngine([
+        Board(f"board{i}", port, BurstDetector([560] * 6, ACTIONS, priority=SuppressionGraph.from_labels(LABELS)),
+              LABELS)
+        for i, port in enumerate(ports.get(timeout=30))])
+    engine.start()
+    time.sleep(seconds)
+    stop.set()
+    sent = results.get(timeout=30)
+    time.sleep(0.3)           # let the last bytes in the ptys drain
+    engine.running = False
+    engine.thread.join(timeout=1.0)
+    done.set()
+    received = results.get(timeout=30)
+    server.join(timeout=5)
+
+    boards = list(engine.boards.values())
+    processed = [board.samples for board in boards]
+    p50 = [board.latency.percentile('total', 50) or 0 for board in boards]
+    p99 = [board.latency.percentile('total', 99) or 0 for board in boards]
+    for board in boards:
+        board.close()
+    return {
+        'boards': count,
+        'total_rate': sum(processed) / engine.wall_seconds,
+        'min_rate': min(processed) / engine.wall_seconds,
+        'lost': sum(sent) - sum(processed),
+        'commands': sum(board.commands_written for board in boards),
+        'received': sum(received),
+        'cpu': engine.cpu_seconds / engine.wall_seconds,
+        'cpu_per_board': engine.cpu_seconds / engine.wall_seconds / count,
+        'wakeups_per_sec': engine.wakeups / engine.wall_seconds,
+        'p50_ms': max(p50) / 1e6,
+        'p99_ms': max(p99) / 1e6,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--boards', type=int, nargs='+', default=[1, 4, 8, 12])
+    args = parser.parse_args()
+    print(f"💻 {os.cpu_count()} CPU(s)")
+
+    rows = [run(count, args.seconds) for count in args.boards]
+    print(f"\n{'boards':>6} {'samples/s':>10} {'min/board':>10} {'lost':>6} {'commands':>9} {'loop CPU':>9} "
+          f"{'per board':>10} {'wakeups/s':>10} {'cmd p50 ms':>11} {'cmd p99 ms':>11}")
+    for r in rows:
+        print(f"{r['boards']:>6} {r['total_rate']:>10,.0f} {r['min_rate']:>10,.0f} {r['lost']:>6} "
+              f"{r['commands']:>4}/{r['received']:<4} {r['cpu']:>9.1%} {r['cpu_per_board']:>10.1%} "
+              f"{r['wakeups_per_sec']:>10,.0f} {r['p50_ms']:>11.2f} {r['p99_ms']:>11.2f}")
@@ -0,0 +1,53 @@
+import os
+import sys
+import time
+
+import numpy as np
+from scipy.signal import iirnotch, lfilter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from emg.filters import NotchFilterBank
+
+# Compare the old per-sample, per-channel lfilter call against NotchFilterBank.
+# Run: python benchmarks/bench_notch.py
+
+SAMPLING_RATE = 1000
+NUM_SAMPLES = 5000
+BLOCK_SIZE = 20
+
+
+def legacy_path(x, b, a):
+    # What SerialReaderThread.run did: one scipy call per channel per sample
+    out = np.empty_like(x)
+    for n in range(len(x)):
+        for i in range(x.shape[1]):
+            out[n, i] = lfilter(b, a, [x[n, i], x[n, i]])[-1]
+    return out
+
+
+def per_sample_path(x, bank):
+    out = np.empty_like(x)
+    for n in range(len(x)):
+        out[n] = bank.process_sample(x[n])
+    return out
+
+
+def block_path(x, bank):
+    return np.vstack([bank.process(x[s:s + BLOCK_SIZE]) for s in range(0, len(x), BLOCK_SIZE)])
+
+
+def rate(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return NUM_SAMPLES / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    b, a = iirnotch(60.0, 10.0, fs=SAMPLING_RATE)
+    print(f"{'channels':>8} {'legacy':>14} {'per-sample':>14} {'block':>14}   (samples/sec)")
+    for num_channels in (5, 6, 32):
+        x = np.random.default_rng(0).normal(512, 30, (NUM_SAMPLES, num_channels))
+        legacy = rate(legacy_path, x, b, a)
+        single = rate(per_sample_path, x, NotchFilterBank(num_channels, SAMPLING_RATE))
+        block = rate(block_path, x, NotchFilterBank(num_channels, SAMPLING_RATE))
+        print(f"{num_channels:>8} {legacy:>14,.0f} {single:>14,.0f} {block:>14,.0f}")
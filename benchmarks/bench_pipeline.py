@@ -0,0 +1,84 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from emg.detection import BurstDetector
+from emg.engine import AcquisitionEngine
+from emg.pipeline import MultiprocessEngine
+from emg.tracing import LatencyTracer
+from emg.virtual_board import VirtualBoard
+
+# Detection latency (bytes arriving -> servo command written) with a window
+# that is deliberately slow: every 33 ms frame the "GUI" thread takes a plot
+# snapshot and then burns gui_ms of pure-Python CPU, holding the GIL the way
+# heavy rendering does. Threaded AcquisitionEngine against MultiprocessEngine,
+# both reading a virtual board at real time (Linux/macOS).
+# The processes only run in parallel given free cores (3 or more); on fewer
+# they time-share and the extra hand-offs cost more than they save.
+# Run: python benchmarks/bench_pipeline.py [--seconds 20] [--gui-ms 25]
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+CSV_PATH = os.path.join(REPO, 'test', 'simulated_30s_6channel_emg.csv')
+THRESHOLDS = [560] * 6
+ACTIONS = ['L', 'R', 'F', 'B', 'G', 'O']
+FRAME = 0.033
+
+
+def slow_gui(engine, seconds, gui_ms):
+    end = time.perf_counter() + seconds
+    frames = 0
+    while time.perf_counter() < end:
+        frame_start = time.perf_counter()
+        engine.snapshot()
+        engine.drain_bursts()
+        busy_until = frame_start + gui_ms / 1000
+        x = 0
+        while time.perf_counter() < busy_until:
+            x += 1          # Python bytecode: holds the GIL between switch intervals
+        frames += 1
+        time.sleep(max(0.0, frame_start + FRAME - time.perf_counter()))
+    return frames
+
+
+def run(mode, seconds, gui_ms):
+    with VirtualBoard(CSV_PATH, speed=1.0, loop=True) as board:
+        detector = BurstDetector(THRESHOLDS, ACTIONS, cooldown_time=0.3, priority={0: 2, 1: 3})
+        if mode == 'threads':
+            tracer = LatencyTracer()
+            engine = AcquisitionEngine(board.port, 115200, 6, detector, tracer=tracer)
+        else:
+            engine = MultiprocessEngine(board.port, 115200, 6, detector)
+        engine.start()
+        time.sleep(0.5)
+        slow_gui(engine, seconds, gui_ms)
+        sent = board.samples_sent
+        processed = engine.samples_processed
+        engine.stop()
+        if mode == 'threads':
+            latency = engine.commands.stats()['latency_us'].get('total', {})
+        else:
+            latency = engine.stats()['acquisition']['commands']['latency_us'].get('total', {})
+        return latency, processed, sent
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seconds', type=float, default=20)
+    parser.add_argument('--gui-ms', type=float, default=25, help="CPU burned per 33 ms frame")
+    args = parser.parse_args()
+    print(f"💻 {os.cpu_count()} CPU(s)")
+
+    rows = []
+    for gui_ms in (0, args.gui_ms):
+        for mode in ('threads', 'processes'):
+            latency, processed, sent = run(mode, args.seconds, gui_ms)
+            rows.append((mode, gui_ms, latency, processed, sent))
+
+    print(f"\n{'engine':>10} {'gui ms/frame':>12} {'commands':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'max ms':>8} {'processed':>10}")
+    for mode, gui_ms, latency, processed, sent in rows:
+        print(f"{mode:>10} {gui_ms:>12g} {latency.get('count', 0):>9} {latency.get('p50_us', 0) / 1000:>8.2f} "
+              f"{latency.get('p95_us', 0) / 1000:>8.2f} {latency.get('p99_us', 0) / 1000:>8.2f} "
+              f"{latency.get('max_us', 0) / 1000:>8.2f} {processed:>6}/{sent}")
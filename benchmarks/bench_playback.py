@@ -0,0 +1,92 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from emg.playback import PlaybackSource, convert_csv
+
+# Offline viewer start-up and seeking: pd.read_csv of the whole file (the old
+# CSVSignalViewer; np.loadtxt when pandas is not installed) against the one-time .npy conversion + memory-mapped
+# PlaybackSource, on a synthetic 6-channel 1 kHz CSV. Memory is what
+# tracemalloc sees allocated by the call (NumPy/pandas buffers included).
+# Run: python benchmarks/bench_playback.py [--minutes 20]
+
+NUM_CHANNELS = 6
+WINDOW = 3000
+
+
+def write_csv(path, num_samples):
+    rng = np.random.default_rng(0)
+    with open(path, 'w') as f:
+        f.write(','.join(f"A{i}" for i in range(NUM_CHANNELS)) + '\n')
+        for start in range(0, num_samples, 100_000):
+            block = rng.integers(300, 700, (min(100_000, num_samples - start), NUM_CHANNELS))
+            np.savetxt(f, block, fmt='%d', delimiter=',')
+
+
+def measure(fn):
+    # Timed on its own: tracemalloc slows down the per-line Python work
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 1e6
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--minutes', type=float, default=20)
+    args = parser.parse_args()
+
+    num_samples = int(args.minutes * 60 * 1000)
+    path = os.path.join(tempfile.mkdtemp(), 'bench.csv')
+    write_csv(path, num_samples)
+    print(f"{args.minutes:g} min, {NUM_CHANNELS} channels: CSV {os.path.getsize(path) / 1e6:.0f} MB")
+
+    if pd is not None:
+        name, load = 'pd.read_csv (every open)', lambda: pd.read_csv(path).values.T
+    else:
+        name, load = 'np.loadtxt (every open)', lambda: np.loadtxt(path, delimiter=',', skiprows=1).T
+    _, elapsed, peak = measure(load)
+    print(f"{name:<28} {elapsed * 1000:8.0f} ms  peak {peak:7.1f} MB")
+    _, elapsed, peak = measure(lambda: convert_csv(path))
+    print(f"{'convert_csv (once)':<28} {elapsed * 1000:8.0f} ms  peak {peak:7.1f} MB")
+    source, elapsed, peak = measure(lambda: PlaybackSource(path))
+    print(f"{'PlaybackSource open':<28} {elapsed * 1000:8.2f} ms  peak {peak:7.3f} MB")
+
+    # Cold seeks: the chunk's filter state is rebuilt from the warm-up samples
+    rng = np.random.default_rng(1)
+    times = []
+    for index in rng.integers(WINDOW, num_samples, 200):
+        source.cache.clear()
+        source.end_state.clear()
+        source.seek(index)
+        start = time.perf_counter_ns()
+        source.window(WINDOW)
+        times.append(time.perf_counter_ns() - start)
+    p50, p99 = np.percentile(times, [50, 99]) / 1e6
+    print(f"{'seek + 3 s window (cold)':<28} p50 {p50:6.2f} ms  p99 {p99:6.2f} ms  (warm-up {source.warmup} samples)")
+
+    # Playback at 50x: 30 ms ticks, each advancing 1500 samples
+    source.seek(0)
+    source.set_speed(50)
+    ticks = 2000
+    start = time.perf_counter()
+    for _ in range(ticks):
+        source.tick(0.03)
+        source.window(WINDOW)
+    per_tick = (time.perf_counter() - start) / ticks * 1000
+    print(f"{'50x playback, per 30 ms tick':<28} {per_tick:8.3f} ms  (cache {len(source.cache)} chunks)")
@@ -0,0 +1,98 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PyQt5.QtWidgets import QApplication, QGridLayout, QWidget
+import pyqtgraph as pg
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from emg.plotting import LivePlotRenderer
+from emg.ring_buffer import RingBuffer
+
+# Scrolling plots, old viewers vs LivePlotRenderer, painted offscreen:
+#  frame ms - one update of every curve plus a full repaint
+#  CPU/s    - CPU time per second of live data when a block arrives every
+#             5 ms and the plot is updated on each one, as the 1 ms QTimer
+#             viewers do (the renderer caps this at 30 fps)
+# Run: python benchmarks/bench_plotting.py
+
+SAMPLING_RATE = 1000
+DURATION = 3
+FRAMES = 60
+PLOT_WIDTH = 800
+
+
+def make_window(num_channels):
+    window = QWidget()
+    layout = QGridLayout(window)
+    curves = []
+    for i in range(num_channels):
+        pw = pg.PlotWidget()
+        pw.setYRange(-100, 100)
+        pw.setXRange(0, DURATION)
+        curves.append(pw.plot(pen='g'))
+        layout.addWidget(pw, i // 2, i % 2)
+    window.resize(2 * PLOT_WIDTH, 150 * ((num_channels + 1) // 2))
+    window.show()
+    QApplication.processEvents()
+    return window, curves
+
+
+def run(num_channels, decimate):
+    window, curves = make_window(num_channels)
+    data = RingBuffer(num_channels, SAMPLING_RATE * DURATION)
+    time_base = np.linspace(0, DURATION, SAMPLING_RATE * DURATION)
+    renderer = LivePlotRenderer(curves, SAMPLING_RATE, DURATION, max_fps=None)
+    rng = np.random.default_rng(0)
+    block = SAMPLING_RATE * 33 // 1000
+
+    times = []
+    for _ in range(FRAMES):
+        data.extend(rng.normal(0, 30, (block, num_channels)))
+        start = time.perf_counter()
+        if decimate:
+            renderer.render(data.view(), data.total_written)
+        else:
+            view = data.view()
+            for i in range(num_channels):
+                curves[i].setData(time_base, view[i])
+        window.grab()    # paint everything, as the screen would
+        times.append(time.perf_counter() - start)
+
+    # Live: 2 s of 5 ms blocks in real time, repaint through the event loop
+    read_interval = 0.005
+    block = int(SAMPLING_RATE * read_interval)
+    live = LivePlotRenderer(curves, SAMPLING_RATE, DURATION, max_fps=30)
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    reads = int(2.0 / read_interval)
+    for k in range(reads):
+        data.extend(rng.normal(0, 30, (block, num_channels)))
+        if decimate:
+            live.render(data.view(), data.total_written)
+        else:
+            view = data.view()
+            for i in range(num_channels):
+                curves[i].setData(time_base, view[i])
+        QApplication.processEvents()
+        delay = start + (k + 1) * read_interval - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    cpu_per_second = (time.process_time() - cpu_start) / (time.perf_counter() - start)
+
+    window.close()
+    points = 2 * renderer.buckets if decimate else SAMPLING_RATE * DURATION
+    return np.median(times) * 1000, points, cpu_per_second
+
+
+if __name__ == '__main__':
+    app = QApplication(sys.argv)
+    print(f"{'channels':>8} {'path':>10} {'points/curve':>13} {'frame ms':>9} {'CPU/s':>7}")
+    for num_channels in (6, 32):
+        for decimate in (False, True):
+            frame_ms, points, cpu = run(num_channels, decimate)
+            print(f"{num_channels:>8} {'minmax' if decimate else 'full':>10} {points:>13} "
+                  f"{frame_ms:>9.2f} {cpu:>7.0%}")
@@ -0,0 +1,62 @@
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from emg.detection import BurstDetector
+from emg.engine import AcquisitionEngine
+from emg.recorder import SessionRecorder, open_session
+
+# Cost of recording on the acquisition thread: AcquisitionEngine.process_block
+# with and without a SessionRecorder, with 5-sample blocks arriving in real
+# time as from the board. Also the file size against CSV for 6 channels.
+# Run: python benchmarks/bench_recorder.py
+
+NUM_CHANNELS = 6
+BLOCK = 5            # samples per serial read at 1 kHz
+SECONDS = 10
+
+
+def engine(recorder):
+    detector = BurstDetector([650] * NUM_CHANNELS, list('LRFBGO'), priority={0: 2, 1: 3})
+    return AcquisitionEngine(None, 115200, NUM_CHANNELS, detector, send_commands=False,
+                             ser=object(), recorder=recorder)
+
+
+def time_blocks(eng, samples):
+    times = []
+    begin = time.perf_counter()
+    for start in range(0, len(samples), BLOCK):
+        delay = begin + start / 1000 - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        t0 = time.perf_counter_ns()
+        eng.process_block(samples[start:start + BLOCK], start / 1000)
+        times.append(time.perf_counter_ns() - t0)
+    return np.percentile(times, [50, 99]) / 1000
+
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+    samples = rng.integers(300, 700, (SECONDS * 1000, NUM_CHANNELS)).astype(np.float32)
+    path = os.path.join(tempfile.mkdtemp(), 'bench.emgrec')
+
+    p50, p99 = time_blocks(engine(None), samples)
+    print(f"process_block, no recorder:   p50 {p50:6.1f} us  p99 {p99:6.1f} us")
+
+    recorder = SessionRecorder(path, NUM_CHANNELS).start()
+    p50, p99 = time_blocks(engine(recorder), samples)
+    start = time.perf_counter()
+    recorder.stop()
+    print(f"process_block, with recorder: p50 {p50:6.1f} us  p99 {p99:6.1f} us "
+          f"(writer backlog peak {recorder.max_backlog} blocks, drained in "
+          f"{(time.perf_counter() - start) * 1000:.0f} ms after the last block)")
+
+    header, recorded, _ = open_session(path)
+    assert np.array_equal(recorded, samples)
+    per_hour = os.path.getsize(path) / SECONDS * 3600 / 1e6
+    csv_line = len(','.join(['512'] * NUM_CHANNELS)) + 2
+    print(f"file size: {per_hour:.0f} MB/hour as int16 vs ~{csv_line * 3600 * 1000 / 1e6:.0f} MB/hour as CSV")
@@ -0,0 +1,50 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from emg.ring_buffer import RingBuffer
+
+# np.roll per sample per channel (old update_plot) vs RingBuffer append/extend.
+# Run: python benchmarks/bench_ring_buffer.py
+
+NUM_POINTS = 3000     # 3 s window at 1 kHz
+NUM_SAMPLES = 5000
+BLOCK_SIZE = 20
+
+
+def roll_path(x):
+    data = [np.zeros(NUM_POINTS) for _ in range(x.shape[1])]
+    for sample in x:
+        for i in range(x.shape[1]):
+            data[i] = np.roll(data[i], -1)
+            data[i][-1] = sample[i]
+    return data
+
+
+def append_path(x):
+    ring = RingBuffer(x.shape[1], NUM_POINTS)
+    for sample in x:
+        ring.append(sample)
+    return ring.view()
+
+
+def extend_path(x):
+    ring = RingBuffer(x.shape[1], NUM_POINTS)
+    for start in range(0, len(x), BLOCK_SIZE):
+        ring.extend(x[start:start + BLOCK_SIZE])
+    return ring.view()
+
+
+if __name__ == '__main__':
+    print(f"{'channels':>8} {'np.roll':>14} {'append':>14} {'extend':>14}   (samples/sec)")
+    for num_channels in (5, 6, 32):
+        x = np.random.default_rng(0).normal(size=(NUM_SAMPLES, num_channels))
+        rates = []
+        for fn in (roll_path, append_path, extend_path):
+            start = time.perf_counter()
+            fn(x)
+            rates.append(NUM_SAMPLES / (time.perf_counter() - start))
+        print(f"{num_channels:>8} " + " ".join(f"{r:>14,.0f}" for r in rates))
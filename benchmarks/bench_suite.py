@@ -0,0 +1,299 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+import scipy
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from emg.detection import BurstDetector, SuppressionGraph
+from emg.dispatch import CommandDispatcher
+from emg.envelope import EnvelopeFilter
+from emg.filters import NotchFilterBank
+from emg.serial_io import LineBlockParser
+from emg.virtual_board import load_recording
+
+# Headless throughput / latency suite for the signal chain, one stage at a
+# time on the bundled recordings:
+#
+#   parse     LineBlockParser.feed on the board's ASCII lines
+#   notch     NotchFilterBank.process
+#   envelope  EnvelopeFilter.process (on the notch output)
+#   detect    BurstDetector.process_block, no priority rules
+#   suppress  SuppressionGraph.accept on every sample where detect fired, with
+#             the channels that burst within the priority window before it
+#   emit      CommandDispatcher.post for every burst (to a port that discards)
+#
+# For every channel count x block size: samples/sec (best of --repeat runs),
+# the mean cost per sample, and p50/p99/max of the time one block spends in
+# the stage. For emit also the post -> written latency on the dispatcher thread.
+#
+# Channel counts above the 13 recorded columns reuse them with a time
+# offset. Results go to --json for comparison between revisions; the run
+# fails (exit 1) when a stage is slower than --min-realtime x real time, or
+# more than --tolerance slower than the --baseline file.
+#
+# Run: python benchmarks/bench_suite.py --json results.json
+#      python benchmarks/bench_suite.py --baseline results.json
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+RECORDINGS = [
+    ('simulated_30s_6channel_emg.csv', 1.0, 0.0),
+    ('simulated_30s_6channel_emg_v2.csv', 1.0, 0.0),
+    ('long_test_signal.csv', 300.0, 512.0),     # unit-scale signal -> ADC counts
+]
+STAGES = ('parse', 'notch', 'envelope', 'detect', 'suppress', 'emit')
+SAMPLING_RATE = 1000
+ACTIONS = 'LRFBGO'
+
+
+class NullPort:
+    # Stands in for the serial port: writes succeed at once
+    def write(self, data):
+        return len(data)
+
+    def flush(self):
+        pass
+
+
+def load_columns():
+    columns = []
+    for name, scale, offset in RECORDINGS:
+        data = load_recording(os.path.join(REPO, 'test', name))
+        columns.append(np.clip(np.rint(data * scale + offset), 0, 1023))
+    length = min(len(c) for c in columns)
+    return np.hstack([c[:length] for c in columns])
+
+
+def make_signal(columns, num_channels, num_samples):
+    # Column i is recorded column i % 13, shifted by a second per repeat
+    pool = columns.shape[1]
+    signal = np.empty((num_samples, num_channels))
+    for i in range(num_channels):
+        signal[:, i] = np.roll(columns[:, i % pool], (i // pool) * SAMPLING_RATE)[:num_samples]
+    return signal
+
+
+def make_priority(num_channels):
+    # Elbow-style rules: in every group of four, channels 0 and 1 yield to 2 and 3
+    rules = {}
+    for base in range(0, num_channels - 3, 4):
+        rules[base] = base + 2
+        rules[base + 1] = base + 3
+    return SuppressionGraph(num_channels, rules)
+
+
+def blocks_of(array, block_size):
+    return [array[s:s + block_size] for s in range(0, len(array), block_size)]
+
+
+def timed(fn, items):
+    # Calls fn(item) for each item; returns (outputs, ns per call)
+    outputs = []
+    elapsed = np.empty(len(items), dtype=np.int64)
+    clock = time.perf_counter_ns
+    for k, item in enumerate(items):
+        start = clock()
+        outputs.append(fn(item))
+        elapsed[k] = clock() - start
+    return outputs, elapsed
+
+
+def run_chain(signal, block_size, thresholds, graph):
+    # One pass through every stage; returns ({stage: ns per block}, extras)
+    num_channels = signal.shape[1]
+    raw = blocks_of(signal.astype(np.int64), block_size)
+    lines = [b''.join((','.join(map(str, row)) + '\r\n').encode() for row in block.tolist()) for block in raw]
+    times = {}
+
+    parser = LineBlockParser(num_channels)
+    parsed, times['parse'] = timed(parser.feed, lines)
+
+    notch = NotchFilterBank(num_channels, SAMPLING_RATE)
+    filtered, times['notch'] = timed(notch.process, parsed)
+
+    envelope = EnvelopeFilter(num_channels, SAMPLING_RATE)
+    _, times['envelope'] = timed(envelope.process, filtered)
+
+    actions = [ACTIONS[i % len(ACTIONS)] for i in range(num_channels)]
+    detector = BurstDetector(thresholds, actions, cooldown_time=0.2, priority_window=0.3)
+    starts = iter(range(0, len(signal), block_size))
+    fired, times['detect'] = timed(lambda block: detector.process_block(block, next(starts) / SAMPLING_RATE),
+                                   filtered)
+
+    # The detect stage's own bursts, per block: for every row that fired,
+    # the channels that fired and those active from a burst in the window
+    # before it, as BurstDetector hands them to the graph with rules set
+    last = np.full(num_channels, -np.inf)
+    masks = []
+    for start, block_fired in zip(range(0, len(signal), block_size), fired):
+        rows = []
+        for k, events in block_fired:
+            triggered = np.zeros(num_channels, dtype=bool)
+            triggered[[event.channel for event in events]] = True
+            rows.append((triggered, start + k - last <= detector.priority_samples))
+            last[triggered] = start + k
+        masks.append(rows)
+
+    def suppress(rows):
+        accepted = 0
+        for triggered, active in rows:
+            accepted += int(graph.accept(triggered, active, same_sample=False).sum())
+        return accepted
+    _, times['suppress'] = timed(suppress, masks)
+
+    dispatcher = CommandDispatcher(NullPort(), max_pending=64).start()
+
+    def emit(block_fired):
+        for _, events in block_fired:
+            for event in events:
+                dispatcher.post(event.action, time.perf_counter_ns())
+    _, times['emit'] = timed(emit, fired)
+    dispatcher.stop()
+    extras = {'emit': {'events': dispatcher.posted,
+                       'written': dispatcher.written,
+                       'post_to_write_us': dispatcher.stats()['latency_us'].get('total', {})}}
+    return times, extras
+
+
+def measure(signal, block_size, repeats):
+    thresholds = np.percentile(NotchFilterBank(signal.shape[1], SAMPLING_RATE).process(signal), 99.5, axis=0)
+    graph = make_priority(signal.shape[1])
+    best = {}
+    extras = {}
+    for _ in range(repeats):
+        times, run_extras = run_chain(signal, block_size, thresholds, graph)
+        for stage, elapsed in times.items():
+            if stage not in best or elapsed.sum() < best[stage].sum():
+                best[stage] = elapsed
+                if stage in run_extras:
+                    extras[stage] = run_extras[stage]
+
+    results = []
+    for stage in STAGES:
+        elapsed = best[stage]
+        seconds = elapsed.sum() / 1e9
+        rate = len(signal) / seconds
+        result = {
+            'stage': stage, 'channels': signal.shape[1], 'block_size': block_size, 'samples': len(signal),
+            'seconds': round(seconds, 6),
+            'samples_per_sec': round(rate, 1),
+            'realtime': round(rate / SAMPLING_RATE, 1),
+            'per_sample_us': round(1e6 / rate, 4),
+            'block_p50_us': round(float(np.percentile(elapsed, 50)) / 1000, 2),
+            'block_p99_us': round(float(np.percentile(elapsed, 99)) / 1000, 2),
+            'block_max_us': round(float(elapsed.max()) / 1000, 2),
+        }
+        result.update(extras.get(stage, {}))
+        results.append(result)
+    return results
+
+
+def environment():
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO, capture_output=True,
+                                  text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        revision = None
+    return {
+        'revision': revision,
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'scipy': scipy.__version__,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def check(results, min_realtime, baseline=None, tolerance=0.2):
+    # Returns a list of failure messages
+    failures = []
+    for r in results:
+        name = f"{r['stage']} ({r['channels']} ch, block {r['block_size']})"
+        if min_realtime and r['realtime'] < min_realtime:
+            failures.append(f"{name}: {r['realtime']:g}x real time, needs {min_realtime:g}x")
+    if baseline is not None:
+        previous = {(r['stage'], r['channels'], r['block_size']): r for r in baseline['results']}
+        for r in results:
+            old = previous.get((r['stage'], r['channels'], r['block_size']))
+            if old is None:
+                continue
+            floor = old['samples_per_sec'] * (1 - tolerance)
+            if r['samples_per_sec'] < floor:
+                failures.append(f"{r['stage']} ({r['channels']} ch, block {r['block_size']}): "
+                                f"{r['samples_per_sec']:,.0f} samples/s, was {old['samples_per_sec']:,.0f} "
+                                f"({r['samples_per_sec'] / old['samples_per_sec'] - 1:+.0%})")
+    return failures
+
+
+def format_table(results, baseline=None):
+    previous = {}
+    if baseline is not None:
+        previous = {(r['stage'], r['channels'], r['block_size']): r for r in baseline['results']}
+    lines = [f"{'stage':<9} {'ch':>4} {'block':>6} {'samples/s':>12} {'x real':>8} {'us/sample':>10} "
+             f"{'p50 us':>9} {'p99 us':>9} {'vs base':>8}"]
+    for r in results:
+        old = previous.get((r['stage'], r['channels'], r['block_size']))
+        change = f"{r['samples_per_sec'] / old['samples_per_sec'] - 1:+.0%}" if old else '-'
+        lines.append(f"{r['stage']:<9} {r['channels']:>4} {r['block_size']:>6} {r['samples_per_sec']:>12,.0f} "
+                     f"{r['realtime']:>8,.0f} {r['per_sample_us']:>10.3f} {r['block_p50_us']:>9.1f} "
+                     f"{r['block_p99_us']:>9.1f} {change:>8}")
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Per-stage throughput and latency of the signal chain")
+    parser.add_argument('--channels', type=int, nargs='+', default=[6, 64])
+    parser.add_argument('--block-sizes', type=int, nargs='+', default=[1, 20, 100])
+    parser.add_argument('--samples', type=int, default=30000, help="samples per run (30000 = the whole recordings)")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per configuration, the fastest counts")
+    parser.add_argument('--json', metavar='PATH', help="write results here")
+    parser.add_argument('--baseline', metavar='PATH', help="results of an earlier revision to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="fail if a stage's samples/s drops by more than this fraction vs --baseline")
+    parser.add_argument('--min-realtime', type=float, default=10.0,
+                        help="fail if a stage runs under this many times real time (0 = off)")
+    args = parser.parse_args()
+
+    columns = load_columns()
+    if args.samples > len(columns):
+        parser.error(f"--samples is at most {len(columns)}")
+    results = []
+    for num_channels in args.channels:
+        signal = make_signal(columns, num_channels, args.samples)
+        for block_size in args.block_sizes:
+            print(f"⏱️ {num_channels} channels, block {block_size}...", flush=True)
+            results.extend(measure(signal, block_size, args.repeat))
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print(format_table(results, baseline))
+
+    failures = check(results, args.min_realtime, baseline, args.tolerance)
+    report = {
+        'environment': environment(),
+        'settings': {'sampling_rate': SAMPLING_RATE, 'samples': args.samples, 'repeat': args.repeat,
+                     'min_realtime': args.min_realtime, 'tolerance': args.tolerance,
+                     'baseline': args.baseline,
+                     'baseline_revision': baseline['environment'].get('revision') if baseline else None},
+        'results': results,
+        'failures': failures,
+    }
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Results saved to {args.json}")
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ No regressions")
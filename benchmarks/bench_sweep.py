@@ -0,0 +1,37 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from emg.sweep import detect_events, load_recording, notch_recording, parameter_grid, sweep
+
+# Offline detector speed on a 30 s 6-channel recording: time per parameter set,
+# then a small grid through the process pool.
+# Run: python benchmarks/bench_sweep.py
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+CSV_PATH = os.path.join(REPO, 'test', 'simulated_30s_6channel_emg.csv')
+PRIORITY = {0: 2, 1: 3}
+
+if __name__ == '__main__':
+    start = time.perf_counter()
+    filtered = notch_recording(load_recording(CSV_PATH))
+    print(f"load + notch: {(time.perf_counter() - start) * 1000:.1f} ms for {filtered.shape}")
+
+    repeats = 200
+    start = time.perf_counter()
+    for _ in range(repeats):
+        detect_events(filtered, [650] * 6, 0.8, 1.0, PRIORITY)
+    per_set = (time.perf_counter() - start) / repeats
+    duration = len(filtered) / 1000
+    print(f"one parameter set: {per_set * 1000:.2f} ms ({duration / per_set:,.0f}x real time)")
+
+    options = [[600, 650, 700]] * 6
+    grid = list(parameter_grid(options, [0.5, 0.8], [0.5, 1.0]))
+    for workers in (1, None):
+        start = time.perf_counter()
+        rows = sweep(filtered, grid, priority=PRIORITY, workers=workers)
+        elapsed = time.perf_counter() - start
+        label = workers or f"pool ({os.cpu_count()} cpus)"
+        print(f"grid of {len(grid)} sets, workers={label}: {elapsed:.2f} s "
+              f"({elapsed / len(grid) * 1000:.2f} ms per set, {len(rows)} rows)")
@@ -0,0 +1,100 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from emg.detection import BurstDetector, SpikeWindow
+from emg.engine import AcquisitionEngine
+from emg.filters import NotchFilterBank
+from emg.virtual_board import VirtualBoard, load_recording
+
+# Detection on the sample clock against the old wall clock (time.time() per
+# read), replaying a 6-channel recording through a pty into AcquisitionEngine
+# at several speeds. Every run's bursts (sample, channel) are compared with
+# the same detector run offline over the whole file. The sample clock has to
+# match it at any speed. On the wall clock, cooldown and priority window
+# shrink by the replay speed and stretch with read batching. Also prints what
+# the engine's SampleClock fitted: samples per host second (speed x 1000)
+# and how late reads arrived against the fitted line.
+# Run: python benchmarks/bench_timebase.py [--speeds 1 10 100]
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+CSV_PATH = os.path.join(REPO, 'test', 'simulated_30s_6channel_emg.csv')
+THRESHOLDS = [650] * 6
+ACTIONS = ['L', 'R', 'F', 'B', 'G', 'O']
+PRIORITY = {0: 2, 1: 3}
+
+
+class WallClockDetector(BurstDetector):
+    # BurstDetector as it was: cooldown, priority window and history in
+    # seconds of the `now` passed with each read
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cooldown = self.cooldown_time
+        self.priority_samples = self.priority_window
+        self.history = SpikeWindow(self.num_channels, self.history.window / self.sampling_rate)
+
+    def _process(self, filtered, sample, now):
+        return super()._process(filtered, now, now)
+
+
+class LoggedDetector:
+    # Keeps (sample, channel) per burst; wall=True hands the detector
+    # time.time() at each read instead of the engine's fitted time
+    def __init__(self, detector, wall=False):
+        self.detector = detector
+        self.num_channels = detector.num_channels
+        self.wall = wall
+        self.samples = 0
+        self.fired = []
+
+    def process_block(self, block, now):
+        result = self.detector.process_block(block, time.time() if self.wall else now)
+        self.fired.extend((self.samples + k, event.channel) for k, events in result for event in events)
+        self.samples += len(block)
+        return result
+
+
+def offline():
+    data = load_recording(CSV_PATH)
+    filtered = NotchFilterBank(data.shape[1], 1000).process(data)
+    detector = LoggedDetector(BurstDetector(THRESHOLDS, ACTIONS, priority=PRIORITY))
+    for start in range(0, len(filtered), 20):
+        detector.process_block(filtered[start:start + 20], start / 1000)
+    return detector.fired
+
+
+def replay(speed, wall, timeout=120):
+    make = WallClockDetector if wall else BurstDetector
+    detector = LoggedDetector(make(THRESHOLDS, ACTIONS, priority=PRIORITY), wall=wall)
+    with VirtualBoard(CSV_PATH, speed=speed) as board:
+        engine = AcquisitionEngine(board.port, 115200, board.num_channels, detector, send_commands=False)
+        engine.start()
+        start = time.perf_counter()
+        while not board.finished or engine.samples_processed < board.samples_sent:
+            if time.perf_counter() - start > timeout:
+                break
+            time.sleep(0.005)
+        engine.running = False
+        engine.thread.join(timeout=1.0)
+        engine.ser.close()
+    return detector.fired, engine.clock.stats()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Sample clock vs wall clock detection under replay")
+    parser.add_argument('--speeds', type=float, nargs='+', default=[1, 10, 100])
+    args = parser.parse_args()
+
+    reference = set(offline())
+    print(f"offline reference: {len(reference)} bursts")
+    print(f"{'clock':>6} {'speed':>6} {'bursts':>7} {'missing':>8} {'extra':>6} {'fitted rate':>12} "
+          f"{'late p50 ms':>12} {'late p99 ms':>12}")
+    for speed in args.speeds:
+        for wall in (True, False):
+            fired, clock = replay(speed, wall)
+            fired = set(fired)
+            print(f"{'wall' if wall else 'sample':>6} {speed:>6g} {len(fired):>7} {len(reference - fired):>8} "
+                  f"{len(fired - reference):>6} {clock['rate']:>12,.0f} {clock['lateness_ms_p50']:>12} "
+                  f"{clock['lateness_ms_p99']:>12}")
@@ -0,0 +1,47 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from emg.detection import BurstDetector
+from emg.engine import AcquisitionEngine
+from emg.tracing import LatencyTracer
+from emg.virtual_board import VirtualBoard
+
+# Replay a recording through AcquisitionEngine at max speed with tracing off
+# and on, and print the per-stage percentiles (Linux/macOS, pty board).
+# Run: python benchmarks/bench_tracing.py
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+CSV_PATH = os.path.join(REPO, 'test', 'simulated_30s_6channel_emg.csv')
+THRESHOLDS = [650] * 6
+ACTIONS = ['L', 'R', 'F', 'B', 'G', 'O']
+
+
+def run(tracer, timeout=60):
+    with VirtualBoard(CSV_PATH, speed=None, protocol='binary') as board:
+        detector = BurstDetector(THRESHOLDS, ACTIONS, priority={0: 2, 1: 3})
+        engine = AcquisitionEngine(board.port, 115200, board.num_channels, detector,
+                                   protocol='binary', tracer=tracer)
+        engine.open()
+        engine.start()
+        start = time.perf_counter()
+        while not board.finished or engine.samples_processed < board.samples_sent:
+            if time.perf_counter() - start > timeout:
+                break
+            time.sleep(0.005)
+        elapsed = time.perf_counter() - start
+        engine.running = False
+        engine.thread.join()
+        engine.commands.stop()
+        engine.ser.close()
+        return engine.samples_processed / elapsed
+
+
+if __name__ == '__main__':
+    off = run(None)
+    tracer = LatencyTracer()
+    on = run(tracer)
+    print(f"tracing off: {off:,.0f} samples/s")
+    print(f"tracing on:  {on:,.0f} samples/s")
+    print(tracer.format_summary())
@@ -0,0 +1,45 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from emg.detection import BurstDetector
+from emg.engine import AcquisitionEngine
+from emg.virtual_board import VirtualBoard
+
+# Load test: replay a 6-channel recording through a pty into AcquisitionEngine
+# at 10x and as fast as possible, with no hardware attached (Linux/macOS).
+# Run: python benchmarks/bench_virtual_board.py
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+CSV_PATH = os.path.join(REPO, 'test', 'simulated_30s_6channel_emg.csv')
+THRESHOLDS = [650] * 6
+ACTIONS = ['L', 'R', 'F', 'B', 'G', 'O']
+
+
+def run(speed, protocol, timeout=60):
+    with VirtualBoard(CSV_PATH, speed=speed, protocol=protocol) as board:
+        detector = BurstDetector(THRESHOLDS, ACTIONS, priority={0: 2, 1: 3})
+        engine = AcquisitionEngine(board.port, 115200, board.num_channels, detector, protocol=protocol)
+        engine.start()
+        start = time.perf_counter()
+        while not board.finished or engine.samples_processed < board.samples_sent:
+            if time.perf_counter() - start > timeout:
+                break
+            time.sleep(0.005)
+        elapsed = time.perf_counter() - start
+        time.sleep(0.1)   # let the last command bytes reach the board
+        engine.stop()
+        return engine.samples_processed, elapsed, board.command_string()
+
+
+if __name__ == '__main__':
+    results = []
+    for protocol in ('ascii', 'binary'):
+        for speed in (10, None):
+            processed, elapsed, commands = run(speed, protocol)
+            results.append((protocol, speed or 'max', processed, processed / elapsed, commands))
+
+    print(f"\n{'protocol':>8} {'speed':>6} {'samples':>8} {'samples/s':>12}  commands")
+    for protocol, speed, processed, rate, commands in results:
+        print(f"{protocol:>8} {speed!s:>6} {processed:>8} {rate:>12,.0f}  {commands}")
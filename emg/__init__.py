@@ -0,0 +1,3 @@
+# Shared signal-chain code for the EMG viewers in Workflow/ and test/.
+# The scripts are run from their own folder, so they add the repo root to
+# sys.path before importing from this package.
@@ -0,0 +1,52 @@
+import time
+
+import numpy as np
+
+# Groups filtered samples into fixed-size blocks for cross-thread delivery:
+# one Qt signal per block_size samples (10 ms at 1 kHz by default) instead of
+# one per sample, so the GUI event queue load does not grow with the sample
+# rate or the channel count. Rows are copied into a preallocated staging
+# array; each delivered block is a single (n, channels) array.
+
+
+class BlockBatcher:
+    def __init__(self, num_channels, deliver, block_size=10, max_delay=0.02, dtype=np.float64):
+        # deliver(block) is called with each full block, or with a partial one
+        # when the oldest staged sample has waited max_delay seconds
+        self.num_channels = num_channels
+        self.deliver = deliver
+        self.block_size = block_size
+        self.max_delay = max_delay
+        self.staging = np.empty((block_size, num_channels), dtype=dtype)
+        self.staged = 0
+        self.staged_since = 0.0
+        self.blocks_delivered = 0
+
+    def push(self, block, now=None):
+        # block: (samples, channels)
+        now = time.perf_counter() if now is None else now
+        pos = 0
+        while pos < len(block):
+            if self.staged == 0:
+                self.staged_since = now
+            take = min(self.block_size - self.staged, len(block) - pos)
+            self.staging[self.staged:self.staged + take] = block[pos:pos + take]
+            self.staged += take
+            pos += take
+            if self.staged == self.block_size:
+                self.flush()
+        self.flush_if_due(now)
+
+    def flush_if_due(self, now=None):
+        now = time.perf_counter() if now is None else now
+        if self.staged and now - self.staged_since >= self.max_delay:
+            self.flush()
+
+    def flush(self):
+        if self.staged == 0:
+            return
+        # The receiver gets its own array; the staging buffer is reused at once
+        block = self.staging[:self.staged].copy()
+        self.staged = 0
+        self.blocks_delivered += 1
+        self.deliver(block)
@@ -0,0 +1,122 @@
+import numpy as np
+
+# Burst segmentation on an envelope: samples above threshold form runs, runs
+# separated by no more than min_silence_duration of silence are merged, and
+# bursts shorter than min_burst_duration are dropped. Same rules as the old
+# per-sample loop in CSVSignalPlotter.detect_bursts, done with run-length
+# arithmetic on all channels at once.
+
+
+def active_runs(active, offset=0):
+    # active: (samples, channels) bool -> (channel, first, last) arrays of every
+    # run of True, sorted by channel then position. Indices are inclusive and
+    # shifted by offset.
+    n, num_channels = active.shape
+    padded = np.zeros((num_channels, n + 2), dtype=np.int8)
+    padded[:, 1:-1] = active.T
+    edges = np.diff(padded, axis=1).ravel()
+    rise = np.flatnonzero(edges == 1)
+    fall = np.flatnonzero(edges == -1)
+    channel = rise // (n + 1)
+    return channel, rise % (n + 1) + offset, fall % (n + 1) - 1 + offset
+
+
+def group_runs(channel, first, last, end_index, max_gap):
+    # Merge runs whose silent gap is <= max_gap samples. Returns per burst:
+    # channel, first active sample, last active sample, and whether enough
+    # silence followed it (before end_index) to close it.
+    if len(channel) == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty, np.empty(0, dtype=bool)
+    same = channel[1:] == channel[:-1]
+    gap = first[1:] - last[:-1] - 1
+    split = ~same | (gap > max_gap)
+    starts_group = np.concatenate(([True], split))
+    ends_group = np.concatenate((split, [True]))
+    g_last = last[ends_group]
+    # Closed by a long gap before the next run, or by the silence up to end_index
+    followed = np.concatenate((same, [False]))[ends_group]
+    closed = followed | (end_index - 1 - g_last > max_gap)
+    return channel[starts_group], first[starts_group], g_last, closed
+
+
+def segment_bursts(active, sampling_rate, min_burst_duration, min_silence_duration):
+    # One-shot segmentation of a whole window. Returns (channel, start, end)
+    # sample indices. A burst still open at the end of the window runs to the
+    # last sample, as in the original loop.
+    n = len(active)
+    channel, first, last, closed = group_runs(*active_runs(active), n, min_silence_duration * sampling_rate)
+    end = np.where(closed, last, n - 1)
+    duration = np.where(closed, last - first, n - first) / sampling_rate
+    keep = duration >= min_burst_duration
+    return channel[keep], first[keep], end[keep]
+
+
+def detect_bursts(envelope, threshold, sampling_rate, min_burst_duration, min_silence_duration, t=None):
+    # envelope: (samples,) or (samples, channels). Returns [(t_start, t_end), ...]
+    # per channel (a single list for 1-D input), times from t or sample / fs.
+    envelope = np.asarray(envelope)
+    single = envelope.ndim == 1
+    if single:
+        envelope = envelope[:, None]
+    if t is None:
+        t = np.arange(len(envelope)) / sampling_rate
+    channel, start, end = segment_bursts(envelope > threshold, sampling_rate,
+                                         min_burst_duration, min_silence_duration)
+    bursts = [[] for _ in range(envelope.shape[1])]
+    for ch, s, e in zip(channel.tolist(), start.tolist(), end.tolist()):
+        bursts[ch].append((t[s], t[e]))
+    return bursts[0] if single else bursts
+
+
+class BurstSegmenter:
+    # Incremental version for consecutive windows: a burst that is still open
+    # (or still inside its allowed silence) at the end of a window is carried
+    # into the next one instead of being cut at the boundary.
+
+    def __init__(self, num_channels, threshold, sampling_rate, min_burst_duration, min_silence_duration):
+        self.num_channels = num_channels
+        self.threshold = threshold     # scalar or one value per channel
+        self.sampling_rate = sampling_rate
+        self.min_burst_duration = min_burst_duration
+        self.max_gap = min_silence_duration * sampling_rate
+        self.open_first = np.full(num_channels, -1, dtype=np.int64)
+        self.open_last = np.full(num_channels, -1, dtype=np.int64)
+        self.position = 0   # absolute index of the next sample
+
+    def process(self, envelope):
+        # envelope: (samples, channels). Returns finished bursts as
+        # (channel, start, end) arrays of absolute sample indices.
+        envelope = np.asarray(envelope)
+        if envelope.ndim == 1:
+            envelope = envelope[:, None]
+        channel, first, last = active_runs(envelope > self.threshold, self.position)
+
+        carried = np.flatnonzero(self.open_first >= 0)
+        if len(carried):
+            channel = np.concatenate((carried, channel))
+            first = np.concatenate((self.open_first[carried], first))
+            last = np.concatenate((self.open_last[carried], last))
+            order = np.lexsort((first, channel))
+            channel, first, last = channel[order], first[order], last[order]
+
+        self.position += len(envelope)
+        channel, first, last, closed = group_runs(channel, first, last, self.position, self.max_gap)
+
+        self.open_first[:] = -1
+        self.open_last[:] = -1
+        self.open_first[channel[~closed]] = first[~closed]
+        self.open_last[channel[~closed]] = last[~closed]
+
+        keep = closed & ((last - first) / self.sampling_rate >= self.min_burst_duration)
+        return channel[keep], first[keep], last[keep]
+
+    def flush(self):
+        # End of the recording: close open bursts the way the one-shot loop does
+        open_channels = np.flatnonzero(self.open_first >= 0)
+        first = self.open_first[open_channels]
+        keep = (self.position - first) / self.sampling_rate >= self.min_burst_duration
+        end = np.full(len(first), self.position - 1, dtype=np.int64)
+        self.open_first[:] = -1
+        self.open_last[:] = -1
+        return open_channels[keep], first[keep], end[keep]
@@ -0,0 +1,262 @@
+import json
+import os
+import time
+
+import numpy as np
+
+# Per-user threshold calibration, streamed through the live engine.
+#
+#   rest         a few seconds relaxed: baseline (median) and noise (std)
+#   contraction  a few maximal contractions per channel: its peak level (p99)
+#
+# Everything is accumulated in fixed memory while samples stream past: a
+# running mean/variance per channel and a fixed-bin histogram per channel
+# and phase, whose quantiles are exact to one bin (0.5 ADC units by
+# default). Nothing is kept per sample, so a long calibration costs the
+# same as a short one.
+#
+# From those, per channel:
+#   on      = baseline + max(k_sigma * noise, mvc_fraction * (mvc - baseline))
+#   release = baseline + hysteresis * (on - baseline)
+# (the MVC term only when that channel was contracted). The result is a
+# CalibrationProfile, saved as JSON and applied to a BurstDetector.
+#
+# DriftTracker then follows the resting baseline during operation with an
+# exponential average over samples below threshold and moves the
+# thresholds with it, again without storing any history.
+
+PHASES = ('rest', 'contraction')
+
+
+class RunningStats:
+    # Per-channel mean and variance over blocks (Chan et al. pairwise update)
+    def __init__(self, num_channels):
+        self.count = 0
+        self.mean = np.zeros(num_channels)
+        self.m2 = np.zeros(num_channels)
+
+    def update(self, block):
+        n = len(block)
+        if n == 0:
+            return
+        block_mean = block.mean(axis=0)
+        block_m2 = ((block - block_mean) ** 2).sum(axis=0)
+        total = self.count + n
+        delta = block_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += block_m2 + delta ** 2 * self.count * n / total
+        self.count = total
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / self.count) if self.count else np.zeros_like(self.mean)
+
+
+class StreamingHistogram:
+    # Fixed linear bins per channel over [low, high); values outside land in
+    # the end bins. quantile() is accurate to one bin width.
+    def __init__(self, num_channels, low=-256.0, high=1280.0, bins=3072):
+        self.num_channels = num_channels
+        self.low = low
+        self.width = (high - low) / bins
+        self.bins = bins
+        self.counts = np.zeros((num_channels, bins), dtype=np.int64)
+        self.offsets = np.arange(num_channels) * bins
+
+    def update(self, block, channels=None):
+        # channels: restrict to these columns (e.g. the one being contracted)
+        if channels is not None:
+            block = block[:, channels]
+            offsets = self.offsets[channels]
+        else:
+            offsets = self.offsets
+        index = np.clip(((block - self.low) / self.width).astype(np.int64), 0, self.bins - 1)
+        flat = np.bincount((index + offsets).ravel(), minlength=self.counts.size)
+        self.counts += flat.reshape(self.counts.shape)
+
+    def total(self):
+        return self.counts.sum(axis=1)
+
+    def quantile(self, q):
+        # Per channel; NaN for channels with no samples
+        out = np.full(self.num_channels, np.nan)
+        cumulative = np.cumsum(self.counts, axis=1)
+        for ch in range(self.num_channels):
+            total = cumulative[ch, -1]
+            if total:
+                k = np.searchsorted(cumulative[ch], q * total)
+                out[ch] = self.low + (k + 0.5) * self.width
+        return out
+
+
+class Calibrator:
+    # Fed by AcquisitionEngine.process_block while a phase is open (detection
+    # is paused meanwhile). begin()/end() are called from the driving script.
+    def __init__(self, num_channels, sampling_rate=1000, low=-256.0, high=1280.0, bins=3072):
+        self.num_channels = num_channels
+        self.sampling_rate = sampling_rate
+        self.rest_stats = RunningStats(num_channels)
+        self.rest = StreamingHistogram(num_channels, low, high, bins)
+        self.contraction = StreamingHistogram(num_channels, low, high, bins)
+        self.phase = None
+        self.channel = None
+
+    def begin(self, phase, channel=None):
+        # channel: only that channel's contraction counts (others see crosstalk)
+        if phase not in PHASES:
+            raise ValueError(f"unknown calibration phase {phase!r}, expected one of {PHASES}")
+        self.channel = channel
+        self.phase = phase
+
+    def end(self):
+        self.phase = None
+        self.channel = None
+
+    def feed(self, block):
+        phase = self.phase
+        if phase == 'rest':
+            self.rest_stats.update(block)
+            self.rest.update(block)
+        elif phase == 'contraction':
+            self.contraction.update(block, None if self.channel is None else [self.channel])
+
+    def profile(self, k_sigma=5.0, mvc_fraction=0.2, hysteresis=0.6, channel_labels=None, user=None):
+        if self.rest_stats.count == 0:
+            raise ValueError("no rest samples: run the 'rest' phase before building a profile")
+        baseline = self.rest.quantile(0.5)
+        noise = self.rest_stats.std
+        mvc = self.contraction.quantile(0.99)
+
+        on = baseline + k_sigma * noise
+        contracted = ~np.isnan(mvc)
+        on[contracted] = np.maximum(on[contracted], baseline[contracted]
+                                    + mvc_fraction * (mvc[contracted] - baseline[contracted]))
+        release = baseline + hysteresis * (on - baseline) if hysteresis else None
+        return CalibrationProfile(
+            user=user, channel_labels=channel_labels, sampling_rate=self.sampling_rate,
+            baseline=baseline, noise=noise, mvc=mvc, thresholds=on, release_thresholds=release,
+            rest_seconds=self.rest_stats.count / self.sampling_rate,
+            settings={'k_sigma': k_sigma, 'mvc_fraction': mvc_fraction, 'hysteresis': hysteresis},
+        )
+
+
+class CalibrationProfile:
+    def __init__(self, thresholds, baseline, noise, mvc=None, release_thresholds=None, user=None,
+                 channel_labels=None, sampling_rate=1000, rest_seconds=None, settings=None, created=None):
+        self.thresholds = np.asarray(thresholds, dtype=float)
+        self.baseline = np.asarray(baseline, dtype=float)
+        self.noise = np.asarray(noise, dtype=float)
+        self.mvc = np.full(len(self.thresholds), np.nan) if mvc is None else np.asarray(mvc, dtype=float)
+        self.release_thresholds = None if release_thresholds is None else np.asarray(release_thresholds, dtype=float)
+        self.user = user
+        self.channel_labels = list(channel_labels) if channel_labels else None
+        self.sampling_rate = sampling_rate
+        self.rest_seconds = rest_seconds
+        self.settings = settings or {}
+        self.created = created or time.strftime('%Y-%m-%dT%H:%M:%S')
+
+    def weak_channels(self):
+        # Channels whose contraction peak did not clear the noise-based threshold
+        k_sigma = self.settings.get('k_sigma', 5.0)
+        return [i for i in range(len(self.thresholds))
+                if not np.isnan(self.mvc[i]) and self.mvc[i] < self.baseline[i] + k_sigma * self.noise[i]]
+
+    def apply(self, detector, channel_labels=None):
+        # Set detector thresholds (and hysteresis). channel_labels: the
+        # layout in use, checked against the one the profile was made on.
+        if channel_labels is not None and self.channel_labels is not None \
+                and list(channel_labels) != self.channel_labels:
+            raise ValueError(f"profile is for channels {self.channel_labels}, not {list(channel_labels)}")
+        if len(self.thresholds) != detector.num_channels:
+            raise ValueError(f"profile has {len(self.thresholds)} channels, detector {detector.num_channels}")
+        detector.thresholds = self.thresholds.copy()
+        detector.release_thresholds = None if self.release_thresholds is None else self.release_thresholds.copy()
+
+    def to_dict(self):
+        def values(array):
+            return None if array is None else [None if np.isnan(v) else round(float(v), 3) for v in array]
+        return {
+            'version': 1,
+            'user': self.user,
+            'created': self.created,
+            'channel_labels': self.channel_labels,
+            'sampling_rate': self.sampling_rate,
+            'rest_seconds': self.rest_seconds,
+            'settings': self.settings,
+            'baseline': values(self.baseline),
+            'noise': values(self.noise),
+            'mvc': values(self.mvc),
+            'thresholds': values(self.thresholds),
+            'release_thresholds': values(self.release_thresholds),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        def values(items):
+            return None if items is None else [np.nan if v is None else v for v in items]
+        return cls(
+            thresholds=values(data['thresholds']), baseline=values(data['baseline']),
+            noise=values(data['noise']), mvc=values(data.get('mvc')),
+            release_thresholds=values(data.get('release_thresholds')), user=data.get('user'),
+            channel_labels=data.get('channel_labels'), sampling_rate=data.get('sampling_rate', 1000),
+            rest_seconds=data.get('rest_seconds'), settings=data.get('settings'), created=data.get('created'),
+        )
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    def format_table(self):
+        labels = self.channel_labels or [f"A{i}" for i in range(len(self.thresholds))]
+        lines = [f"{'channel':<18} {'baseline':>9} {'noise':>7} {'mvc':>8} {'on':>8} {'release':>8}"]
+        for i, label in enumerate(labels):
+            release = '-' if self.release_thresholds is None else f"{self.release_thresholds[i]:8.1f}"
+            mvc = '-' if np.isnan(self.mvc[i]) else f"{self.mvc[i]:8.1f}"
+            lines.append(f"{label:<18} {self.baseline[i]:9.1f} {self.noise[i]:7.2f} {mvc:>8} "
+                         f"{self.thresholds[i]:8.1f} {release:>8}")
+        return '\n'.join(lines)
+
+
+class DriftTracker:
+    # Follows each channel's resting baseline with an exponential average
+    # (time_constant seconds) over the samples below its threshold, and
+    # shifts the detector's thresholds by the same amount. max_shift caps
+    # how far the baseline may wander from the calibrated one (ADC units).
+    def __init__(self, profile, time_constant=60.0, sampling_rate=None, max_shift=None):
+        self.sampling_rate = sampling_rate or profile.sampling_rate
+        self.time_constant = time_constant
+        self.calibrated = profile.baseline.copy()
+        self.baseline = profile.baseline.copy()
+        self.on_offset = profile.thresholds - profile.baseline
+        self.release_offset = (None if profile.release_thresholds is None
+                               else profile.release_thresholds - profile.baseline)
+        self.max_shift = max_shift
+
+    def update(self, block, detector=None):
+        # block: what the detector sees. Returns the current baseline.
+        rest = block < self.baseline + self.on_offset
+        n = rest.sum(axis=0)
+        moving = n > 0
+        if moving.any():
+            mean = np.where(rest, block, 0.0).sum(axis=0)[moving] / n[moving]
+            alpha = 1.0 - np.exp(-n[moving] / (self.time_constant * self.sampling_rate))
+            self.baseline[moving] += alpha * (mean - self.baseline[moving])
+            if self.max_shift is not None:
+                np.clip(self.baseline, self.calibrated - self.max_shift, self.calibrated + self.max_shift,
+                        out=self.baseline)
+            if detector is not None:
+                detector.thresholds = self.baseline + self.on_offset
+                if self.release_offset is not None:
+                    detector.release_thresholds = self.baseline + self.release_offset
+        return self.baseline
+
+    def drift(self):
+        return self.baseline - self.calibrated
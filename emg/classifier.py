@@ -0,0 +1,256 @@
+import json
+import os
+import time
+from collections import deque, namedtuple
+
+import numpy as np
+
+from .features import FEATURES, FeatureExtractor, extract
+
+# Pattern-recognition alternative to BurstDetector: one action per gesture
+# instead of one action per muscle, so crosstalk (a wrist channel lighting
+# up when the elbow bends) is learned instead of patched with priority rules.
+#
+#   features    FeatureExtractor windows, (channels x features) per window;
+#               amplitude features are log-scaled, then standardized
+#   LDAModel    linear discriminant analysis with a shrunk pooled covariance,
+#               trained in closed form; posteriors by softmax
+#   GestureClassifier
+#               streaming wrapper with BurstDetector's process_block(block, now)
+#               interface: classifies every finished window, majority-votes
+#               the last `vote` decisions and fires a GestureEvent when a new
+#               gesture wins (rest in between re-arms it)
+#
+# Class 0 is always rest (action None, no command). The model is saved as
+# JSON and trained with Workflow/train_classifier.py.
+
+GestureEvent = namedtuple('GestureEvent', ['channel', 'action', 'time', 'confidence'])
+LOG_FEATURES = [FEATURES.index(name) for name in ('mav', 'rms', 'wl')]
+
+
+def feature_vectors(windows):
+    # (windows, channels, features) -> (windows, channels * features) float64
+    x = np.array(windows, dtype=float)
+    x[..., LOG_FEATURES] = np.log1p(x[..., LOG_FEATURES])
+    return x.reshape(len(x), -1)
+
+
+def window_labels(labels, num_windows, window, stride, num_classes, purity=0.8):
+    # Per-sample class indices -> one per window: its majority class, or -1
+    # when less than `purity` of the window agrees (a transition)
+    counts = np.zeros((len(labels) + 1, num_classes), dtype=np.int64)
+    counts[1:][np.arange(len(labels)), labels] = 1
+    np.cumsum(counts, axis=0, out=counts)
+    ends = window + np.arange(num_windows) * stride
+    per_window = counts[ends] - counts[ends - window]
+    majority = per_window.argmax(axis=1)
+    pure = per_window.max(axis=1) >= purity * window
+    return np.where(pure, majority, -1)
+
+
+class LDAModel:
+    def __init__(self, classes, mean, scale, weights, bias, window=200, stride=50, sampling_rate=1000,
+                 channel_labels=None, user=None, settings=None, created=None):
+        self.classes = list(classes)          # actions, classes[0] is None (rest)
+        self.mean = np.asarray(mean, dtype=float)
+        self.scale = np.asarray(scale, dtype=float)
+        self.weights = np.asarray(weights, dtype=float)    # (inputs, classes)
+        self.bias = np.asarray(bias, dtype=float)
+        self.window = window
+        self.stride = stride
+        self.sampling_rate = sampling_rate
+        self.channel_labels = list(channel_labels) if channel_labels else None
+        self.user = user
+        self.settings = settings or {}
+        self.created = created or time.strftime('%Y-%m-%dT%H:%M:%S')
+
+    @property
+    def num_channels(self):
+        return len(self.mean) // len(FEATURES)
+
+    @classmethod
+    def fit(cls, x, y, classes, shrinkage=0.1, **info):
+        # x: (samples, inputs) feature vectors, y: class index per row (rows
+        # with -1 are ignored). Every class needs at least one row.
+        keep = y >= 0
+        x, y = x[keep], y[keep]
+        num_classes = len(classes)
+        present = np.bincount(y, minlength=num_classes)
+        if (present == 0).any():
+            missing = [classes[i] if classes[i] is not None else 'rest' for i in np.flatnonzero(present == 0)]
+            raise ValueError(f"no training windows for {missing}")
+
+        mean = x.mean(axis=0)
+        scale = x.std(axis=0)
+        scale[scale == 0] = 1.0
+        z = (x - mean) / scale
+        centroids = np.array([z[y == k].mean(axis=0) for k in range(num_classes)])
+        within = z - centroids[y]
+        covariance = within.T @ within / max(1, len(z) - num_classes)
+        # Shrink toward a scaled identity so correlated or flat features stay invertible
+        target = np.trace(covariance) / len(covariance)
+        covariance = (1 - shrinkage) * covariance + shrinkage * target * np.eye(len(covariance))
+        weights = np.linalg.solve(covariance, centroids.T)
+        priors = present / present.sum()
+        bias = -0.5 * np.einsum('ki,ik->k', centroids, weights) + np.log(priors)
+        info.setdefault('settings', {})['shrinkage'] = shrinkage
+        return cls(classes, mean, scale, weights, bias, **info)
+
+    def scores(self, x):
+        return ((x - self.mean) / self.scale) @ self.weights + self.bias
+
+    def predict_proba(self, x):
+        scores = self.scores(x)
+        scores -= scores.max(axis=1, keepdims=True)
+        np.exp(scores, out=scores)
+        scores /= scores.sum(axis=1, keepdims=True)
+        return scores
+
+    def predict(self, x):
+        # (class index, posterior) per row
+        proba = self.predict_proba(x)
+        index = proba.argmax(axis=1)
+        return index, proba[np.arange(len(index)), index]
+
+    def to_dict(self):
+        return {
+            'version': 1,
+            'kind': 'lda',
+            'user': self.user,
+            'created': self.created,
+            'classes': self.classes,
+            'features': list(FEATURES),
+            'channel_labels': self.channel_labels,
+            'window': self.window,
+            'stride': self.stride,
+            'sampling_rate': self.sampling_rate,
+            'settings': self.settings,
+            'mean': self.mean.tolist(),
+            'scale': self.scale.tolist(),
+            'weights': self.weights.tolist(),
+            'bias': self.bias.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get('features', list(FEATURES)) != list(FEATURES):
+            raise ValueError(f"model was trained on features {data['features']}, this version computes {FEATURES}")
+        return cls(data['classes'], data['mean'], data['scale'], data['weights'], data['bias'],
+                   window=data['window'], stride=data['stride'], sampling_rate=data.get('sampling_rate', 1000),
+                   channel_labels=data.get('channel_labels'), user=data.get('user'),
+                   settings=data.get('settings'), created=data.get('created'))
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def train(samples, labels, classes, window=200, stride=50, sampling_rate=1000, shrinkage=0.1, purity=0.8,
+          **info):
+    # samples: notch-filtered (samples, channels); labels: class index per
+    # sample (0 = rest). Returns (model, feature vectors, window labels).
+    windows = extract(samples, window, stride, sampling_rate)
+    y = window_labels(np.asarray(labels), len(windows), window, stride, len(classes), purity)
+    x = feature_vectors(windows)
+    model = LDAModel.fit(x, y, classes, shrinkage, window=window, stride=stride, sampling_rate=sampling_rate,
+                         **info)
+    return model, x, y
+
+
+def confusion(model, x, y):
+    # Rows: true class, columns: predicted; rows with y == -1 are skipped
+    keep = y >= 0
+    predicted, _ = model.predict(x[keep])
+    matrix = np.zeros((len(model.classes), len(model.classes)), dtype=np.int64)
+    np.add.at(matrix, (y[keep], predicted), 1)
+    return matrix
+
+
+def cross_validate(x, y, classes, folds=5, group=10, shrinkage=0.1):
+    # Accuracy on held-out windows. Windows overlap, so they are held out in
+    # runs of `group` consecutive windows, every folds-th run per fold.
+    fold_of = (np.arange(len(x)) // group) % folds
+    correct = total = 0
+    for fold in range(folds):
+        test = fold_of == fold
+        try:
+            model = LDAModel.fit(x[~test], y[~test], classes, shrinkage)
+        except ValueError:
+            continue
+        keep = test & (y >= 0)
+        predicted, _ = model.predict(x[keep])
+        correct += int((predicted == y[keep]).sum())
+        total += int(keep.sum())
+    return correct / total if total else float('nan')
+
+
+class GestureClassifier:
+    # Drop-in for BurstDetector where process_block(block, now) is used
+    # (AcquisitionEngine, MultiprocessEngine, SerialReaderThread). block:
+    # notch-filtered samples. A gesture fires once when it wins the vote with
+    # mean confidence >= min_confidence, and again only after the vote has
+    # gone back to rest (or another gesture) and cooldown_time has passed,
+    # counted in samples like BurstDetector's cooldown.
+
+    def __init__(self, model, vote=5, min_confidence=0.6, cooldown_time=0.3, highpass=20.0):
+        self.model = model
+        self.num_channels = model.num_channels
+        self.channel_actions = [None] * self.num_channels
+        self.features = FeatureExtractor(self.num_channels, model.window, model.stride, model.sampling_rate,
+                                         highpass)
+        self.vote = vote
+        self.min_confidence = min_confidence
+        self.cooldown_time = cooldown_time
+        self.cooldown = cooldown_time * model.sampling_rate
+        self.votes = deque(maxlen=vote)
+        self.confidences = deque(maxlen=vote)
+        self.current = 0
+        self.last_fire = -np.inf         # sample of the last fired gesture
+        self.last = (None, 0.0)          # latest single-window decision (action, confidence)
+        self.decisions = 0
+
+    def reset(self):
+        self.features.reset()
+        self.votes.clear()
+        self.confidences.clear()
+        self.current = 0
+        self.last_fire = -np.inf
+
+    def process_block(self, block, now):
+        windows = self.features.process(block)
+        if not len(windows):
+            return []
+        index, confidence = self.model.predict(feature_vectors(windows))
+        # Row of this block where each window ended
+        first = self.features.windows - len(windows)
+        start = self.features.samples - len(block)
+        rows = self.features.window_ends(first, len(windows)) - 1 - start
+
+        fired = []
+        for row, k, p in zip(rows.tolist(), index.tolist(), confidence.tolist()):
+            self.decisions += 1
+            self.last = (self.model.classes[k], p)
+            self.votes.append(k)
+            self.confidences.append(p)
+            counts = np.bincount(self.votes, minlength=len(self.model.classes))
+            winner = int(counts.argmax())
+            if counts[winner] <= len(self.votes) // 2:
+                continue                     # no majority yet
+            if winner == 0:
+                self.current = 0
+                continue
+            mean_confidence = float(np.mean([c for v, c in zip(self.votes, self.confidences) if v == winner]))
+            if winner != self.current and mean_confidence >= self.min_confidence \
+                    and start + row - self.last_fire > self.cooldown:
+                self.current = winner
+                self.last_fire = start + row
+                fired.append((row, [GestureEvent(None, self.model.classes[winner], now, mean_confidence)]))
+        return fired
@@ -0,0 +1,203 @@
+from collections import deque, namedtuple
+
+import numpy as np
+
+BurstEvent = namedtuple('BurstEvent', ['channel', 'action', 'time'])
+
+# The usual wiring rule, by body site: a wrist burst is ignored while the elbow
+# on the same side is active (bending the elbow also lights up the wrist).
+ELBOW_PRIORITY = {'Left Wrist': 'Left Elbow', 'Right Wrist': 'Right Elbow'}
+
+
+class SpikeWindow:
+    # Accepted spike times per channel over the last `window` time units
+    # (BurstDetector keeps sample indices here, any other clock works too).
+    #
+    # Times only move forward, so each channel's deque is evicted from the
+    # left as new spikes arrive and the newest spike is always the nearest:
+    # "any spike within W of now" is one comparison per channel on `last`,
+    # for all channels at once.
+
+    def __init__(self, num_channels, window=2.0):
+        self.window = window
+        self.times = [deque() for _ in range(num_channels)]
+        self.last = np.full(num_channels, -np.inf)
+
+    def add(self, channel, t):
+        times = self.times[channel]
+        times.append(t)
+        while t - times[0] > self.window:
+            times.popleft()
+        self.last[channel] = t
+
+    def within(self, now, window):
+        # Bool per channel: a spike in the last `window` units
+        return now - self.last <= window
+
+    def count(self, channel, now, window=None):
+        # Spikes on channel in the last `window` units (default: all kept)
+        window = self.window if window is None else window
+        count = 0
+        for t in reversed(self.times[channel]):
+            if now - t > window:
+                break
+            count += 1
+        return count
+
+    def clear(self):
+        for times in self.times:
+            times.clear()
+        self.last[:] = -np.inf
+
+
+class SuppressionGraph:
+    # Which channels silence which. rules maps a channel to the channel (or
+    # list of channels) that dominate it: {0: 2, 1: 3} drops a burst on A0
+    # while A2 is active and on A1 while A3 is. Held as a (suppressed x
+    # dominant) bool matrix, so one pass answers every channel.
+    #
+    # from_labels() builds the same thing from body-site names, so one rule
+    # set serves every wiring layout (the right elbow is A3 on one board
+    # and A5 on another).
+
+    def __init__(self, num_channels, rules=None):
+        self.num_channels = num_channels
+        self.matrix = np.zeros((num_channels, num_channels), dtype=bool)
+        for channel, dominants in (rules or {}).items():
+            self.matrix[channel, np.atleast_1d(dominants)] = True
+
+        # Edges whose dominant has the lower index. The detector has always
+        # handled channels in index order, so a dominant accepted on the same
+        # sample counts only along these; depth is their longest chain.
+        self.earlier = np.tril(self.matrix, -1)
+        depth = np.zeros(num_channels, dtype=int)
+        for channel in range(num_channels):
+            dominants = np.flatnonzero(self.earlier[channel])
+            if len(dominants):
+                depth[channel] = depth[dominants].max() + 1
+        self.depth = int(depth.max()) if num_channels else 0
+
+    @classmethod
+    def from_labels(cls, channel_labels, rules=ELBOW_PRIORITY):
+        # channel_labels like "A2 - Left Elbow"; rules by site name. Rules
+        # naming a site this layout does not have are skipped.
+        sites = {label.split(' - ')[-1].strip(): i for i, label in enumerate(channel_labels)}
+        resolved = {}
+        for suppressed, dominants in rules.items():
+            dominants = [dominants] if isinstance(dominants, str) else dominants
+            wired = [sites[d] for d in dominants if d in sites]
+            if suppressed in sites and wired:
+                resolved[sites[suppressed]] = wired
+        return cls(len(channel_labels), resolved)
+
+    @property
+    def rules(self):
+        return {i: tuple(np.flatnonzero(row).tolist()) for i, row in enumerate(self.matrix) if row.any()}
+
+    def suppressed(self, active):
+        # Bool per channel: at least one of its dominants is active
+        return self.matrix.dot(active)
+
+    def accept(self, triggered, active, same_sample=True):
+        # Which triggered channels survive suppression. active: dominants
+        # active from earlier samples. With same_sample, a dominant merely
+        # triggered on this sample also suppresses; without, only one
+        # accepted earlier on this sample (lower index) does.
+        if same_sample:
+            return triggered & ~self.suppressed(active | triggered)
+        blocked = self.suppressed(active)
+        accepted = triggered & ~blocked
+        for _ in range(self.depth):
+            accepted = triggered & ~(blocked | self.earlier.dot(accepted))
+        return accepted
+
+
+class BurstDetector:
+    # Threshold -> cooldown -> priority suppression, as used by the viewers.
+    #
+    # priority is a SuppressionGraph, or its rules dict, e.g. {0: 2, 1: 4}
+    # means a wrist burst is dropped if its elbow fired within priority_window.
+    # With same_sample_priority=True a dominant channel crossing threshold on
+    # the same sample also suppresses (final_detection.py); with False only its
+    # recorded history counts (SerialReaderThread in Final_Test_5_Channels.py).
+    #
+    # release_thresholds adds hysteresis: after firing, a channel must drop
+    # below its release level before it can fire again (on top of cooldown).
+    #
+    # Cooldown, priority window and history run on the sample clock: times
+    # are given in seconds and counted in samples at sampling_rate, so USB
+    # read batching does not move them and a replay at any speed makes the
+    # same decisions. `now` is only stamped on the events (a SampleClock
+    # gives one per block with the read jitter smoothed out).
+
+    def __init__(self, thresholds, channel_actions, cooldown_time=0.8, priority_window=1.0,
+                 priority=None, same_sample_priority=True, history_window=2.0, release_thresholds=None,
+                 sampling_rate=1000):
+        self.num_channels = len(thresholds)
+        self.thresholds = np.asarray(thresholds, dtype=float)
+        self.channel_actions = list(channel_actions)
+        self.cooldown_time = cooldown_time
+        self.priority_window = priority_window
+        if not isinstance(priority, SuppressionGraph):
+            priority = SuppressionGraph(self.num_channels, priority)
+        self.priority = priority
+        self.same_sample_priority = same_sample_priority
+
+        self.release_thresholds = None if release_thresholds is None else np.asarray(release_thresholds, dtype=float)
+        self.armed = np.ones(self.num_channels, dtype=bool)
+
+        self.sampling_rate = sampling_rate
+        self.cooldown = cooldown_time * sampling_rate
+        self.priority_samples = priority_window * sampling_rate
+        self.samples = 0                                    # index of the next sample
+        self.last_spike_sample = np.full(self.num_channels, -np.inf)
+        self.history = SpikeWindow(self.num_channels, history_window * sampling_rate)
+
+    def rearm(self, block):
+        # Channels that dropped below their release level in block may fire again
+        if self.release_thresholds is not None and len(block):
+            self.armed |= (block < self.release_thresholds).any(axis=0)
+
+    def process(self, filtered, now):
+        # filtered: one notch-filtered value per channel, the next sample.
+        # Returns fired BurstEvents.
+        sample = self.samples
+        self.samples += 1
+        return self._process(filtered, sample, now)
+
+    def _process(self, filtered, sample, now):
+        if self.release_thresholds is not None:
+            self.armed |= filtered < self.release_thresholds
+        above = filtered > self.thresholds
+        if not above.any():
+            return []
+        triggered = above & self.armed & (sample - self.last_spike_sample > self.cooldown)
+        if not triggered.any():
+            return []
+        active = self.history.within(sample, self.priority_samples)
+        accepted = self.priority.accept(triggered, active, self.same_sample_priority)
+
+        events = []
+        for i in accepted.nonzero()[0].tolist():
+            self.last_spike_sample[i] = sample
+            if self.release_thresholds is not None:
+                self.armed[i] = False
+            self.history.add(i, sample)
+            events.append(BurstEvent(i, self.channel_actions[i], now))
+        return events
+
+    def process_block(self, block, now):
+        # block: (samples, channels). Returns [(row, events)] for the rows that
+        # fired; rows with nothing over threshold are skipped in one comparison.
+        first = self.samples
+        self.samples += len(block)
+        fired = []
+        start = 0
+        for k in (block > self.thresholds).any(axis=1).nonzero()[0].tolist():
+            self.rearm(block[start:k])
+            events = self._process(block[k], first + k, now)
+            if events:
+                fired.append((k, events))
+            start = k + 1
+        self.rearm(block[start:])
+        return fired
@@ -0,0 +1,130 @@
+import threading
+import time
+from collections import deque
+
+import serial
+
+from .tracing import LatencyTracer
+
+# Servo commands leave through their own thread so the reader never blocks on
+# the TX buffer (write_timeout=0.1 used to stall ingestion for up to 100 ms).
+# post() only appends to a bounded queue and returns.
+#
+# Policy, in order:
+#   rate limit - a repeat of an action within min_interval of its last
+#                accepted post is dropped (min_interval: seconds, or a dict
+#                of seconds per action)
+#   coalesce   - an action already waiting in the queue is not queued twice
+#   overflow   - with max_pending commands waiting, the oldest is dropped so
+#                the newest decision always reaches the arm (latest wins)
+
+
+class CommandDispatcher:
+    def __init__(self, ser, max_pending=8, min_interval=0.0, coalesce=True, tracer=None):
+        self.ser = ser
+        self.max_pending = max_pending
+        self.min_interval = min_interval
+        self.coalesce = coalesce
+
+        self.pending = deque()    # (action, posted_ns, arrived_ns)
+        self.condition = threading.Condition()
+        self.last_accepted = {}
+
+        # queued: post -> write start; write: the ser.write call;
+        # total: sample bytes arriving (when the caller passes it) -> written.
+        # Pass the reader's tracer to get one table for the whole path.
+        self.tracer = tracer or LatencyTracer(stages=('queued', 'write', 'total'))
+        self.posted = 0
+        self.written = 0
+        self.coalesced = 0
+        self.rate_limited = 0
+        self.dropped = 0
+        self.write_errors = 0
+        self.max_depth = 0
+
+        self.running = False
+        self.thread = None
+
+    def _interval(self, action):
+        if isinstance(self.min_interval, dict):
+            return self.min_interval.get(action, 0.0)
+        return self.min_interval
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name='emg-commands', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self, drain_timeout=0.5):
+        # Give already queued commands a moment to go out, then stop
+        deadline = time.monotonic() + drain_timeout
+        with self.condition:
+            while self.pending and time.monotonic() < deadline and self.thread is not None:
+                self.condition.wait(0.01)
+            self.running = False
+            self.condition.notify_all()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=1.0)
+
+    def post(self, action, arrived_ns=None):
+        # Never blocks. arrived_ns: perf_counter_ns when the triggering bytes
+        # were read, for the end-to-end 'total' latency. Returns True if queued.
+        now = time.perf_counter_ns()
+        with self.condition:
+            self.posted += 1
+            interval = self._interval(action)
+            last = self.last_accepted.get(action)
+            if interval and last is not None and now - last < interval * 1e9:
+                self.rate_limited += 1
+                return False
+            if self.coalesce and any(pending[0] == action for pending in self.pending):
+                self.coalesced += 1
+                return False
+            if len(self.pending) >= self.max_pending:
+                self.pending.popleft()
+                self.dropped += 1
+            self.pending.append((action, now, arrived_ns))
+            self.last_accepted[action] = now
+            self.max_depth = max(self.max_depth, len(self.pending))
+            self.condition.notify()
+        return True
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.running and not self.pending:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                action, posted_ns, arrived_ns = self.pending.popleft()
+                self.condition.notify_all()
+
+            start = time.perf_counter_ns()
+            try:
+                self.ser.write(action.encode())
+                self.written += 1
+            except (serial.SerialException, OSError) as e:
+                self.write_errors += 1
+                print(f"⚠️ Write failed: {e}")
+            done = time.perf_counter_ns()
+            self.tracer.record('queued', start - posted_ns)
+            self.tracer.record('write', done - start)
+            if arrived_ns is not None:
+                self.tracer.record('total', done - arrived_ns)
+
+    def depth(self):
+        return len(self.pending)
+
+    def stats(self):
+        return {
+            'posted': self.posted,
+            'written': self.written,
+            'coalesced': self.coalesced,
+            'rate_limited': self.rate_limited,
+            'dropped': self.dropped,
+            'write_errors': self.write_errors,
+            'depth': len(self.pending),
+            'max_depth': self.max_depth,
+            'latency_us': self.tracer.summary(),
+        }
@@ -0,0 +1,199 @@
+import queue
+import threading
+import time
+
+import numpy as np
+import serial
+
+from .dispatch import CommandDispatcher
+from .filters import NotchFilterBank
+from .ring_buffer import RingBuffer
+from .serial_io import SerialBlockReader
+from .timebase import SampleClock
+
+# Acquisition + detection loop that owns the serial port and runs on its own
+# thread. It never imports Qt: windows subscribe to it and pull snapshots at
+# their own frame rate, and it keeps running at full rate with no window open.
+# Detection timing is counted in samples; events are stamped with the
+# SampleClock's fitted host time of their block instead of time.time().
+
+
+class AcquisitionEngine:
+    def __init__(self, port, baudrate, num_channels, detector, sampling_rate=1000,
+                 history_seconds=3, protocol='ascii', send_commands=True, ser=None, envelope=None,
+                 tracer=None, command_interval=0.0, recorder=None, calibrator=None, drift=None,
+                 features=None):
+        self.port = port
+        self.baudrate = baudrate
+        self.num_channels = num_channels
+        self.detector = detector
+        self.sampling_rate = sampling_rate
+        self.protocol = protocol
+        self.send_commands = send_commands
+        self.ser = ser   # an already-open port (or stand-in) skips serial.Serial()
+        # Optional EnvelopeFilter: the detector then thresholds the envelope
+        # (delayed by envelope.group_delay()) instead of the notch output
+        self.envelope = envelope
+        # Optional LatencyTracer (emg/tracing.py); None costs one check per stage
+        self.tracer = tracer
+
+        self.notch = NotchFilterBank(num_channels, sampling_rate)
+        self.history = RingBuffer(num_channels, int(sampling_rate * history_seconds))
+        self.history_lock = threading.Lock()
+
+        # Queue API for pollers (GUI timers); callbacks run on the engine thread
+        self.bursts = queue.Queue(maxsize=1000)
+        self.sample_listeners = []
+        self.burst_listeners = []
+
+        self.samples_processed = 0
+        self.clock = SampleClock(sampling_rate)
+        self.bursts_dropped = 0
+        self.running = False
+        self.thread = None
+        self.reader = None
+        # Commands go out on their own thread; min seconds between repeats of an action
+        self.command_interval = command_interval
+        self.commands = None
+        # Optional SessionRecorder: raw samples plus burst/command index, started and stopped with the engine
+        self.recorder = recorder
+        # Optional Calibrator: while one of its phases is open, blocks feed it
+        # and detection is paused. Optional DriftTracker: follows the resting
+        # baseline and moves the detector thresholds with it.
+        self.calibrator = calibrator
+        self.drift = drift
+        # Optional FeatureExtractor on the notch output; feature listeners get
+        # each batch of finished windows, (windows, channels, features)
+        self.features = features
+        self.feature_listeners = []
+
+    def add_sample_listener(self, callback):
+        # callback(filtered_block): (samples, channels) array, called per read
+        self.sample_listeners.append(callback)
+
+    def add_burst_listener(self, callback):
+        # callback(BurstEvent)
+        self.burst_listeners.append(callback)
+
+    def add_feature_listener(self, callback):
+        # callback(windows): float32 (windows, channels, features), needs features=
+        self.feature_listeners.append(callback)
+
+    def open(self):
+        if self.ser is None:
+            # Short timeout so stop() is noticed quickly when the board goes quiet
+            self.ser = serial.Serial(self.port, self.baudrate, timeout=0.05, write_timeout=0.1)
+            print(f"✅ Connected to {self.port} at {self.baudrate} baud")
+        self.reader = SerialBlockReader(self.ser, self.num_channels, protocol=self.protocol,
+                                        tracer=self.tracer)
+        self.commands = CommandDispatcher(self.ser, min_interval=self.command_interval,
+                                          tracer=self.tracer)
+
+    def start(self):
+        if self.reader is None:
+            self.open()
+        self.running = True
+        self.commands.start()
+        if self.recorder is not None:
+            self.recorder.start()
+        self.thread = threading.Thread(target=self.run, name='emg-acquisition', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=1.0)
+        if self.commands is not None:
+            self.commands.stop()
+        if self.recorder is not None:
+            self.recorder.stop()
+        if self.ser is not None and self.ser.is_open:
+            self.ser.close()
+            print("🔌 Serial port closed.")
+        if self.reader is not None:
+            print(f"📊 Serial stats: {self.reader.stats()}")
+            print(f"⏱️ Clock: {self.clock.stats()}")
+        if self.commands is not None:
+            print(f"📤 Command stats: {self.commands.stats()}")
+        if self.recorder is not None:
+            print(f"💾 Recording: {self.recorder.stats()}")
+        if self.tracer:
+            print(f"⏱️ Latency\n{self.tracer.format_summary()}")
+
+    def run(self):
+        while self.running and self.ser.is_open:
+            try:
+                block = self.reader.read_block()
+            except (serial.SerialException, OSError) as e:
+                print(f"⚠️ Read failed: {e}")
+                break
+            if len(block):
+                self.clock.update(len(block), time.time())
+                self.process_block(block, self.clock.latest())
+        self.running = False
+
+    def process_block(self, block, now):
+        tracer = self.tracer
+        first = self.recorder.write(block) if self.recorder is not None else None
+        filtered_block = self.notch.process(block)
+        with self.history_lock:
+            self.history.extend(filtered_block)
+        self.samples_processed += len(filtered_block)
+        if tracer:
+            tracer.mark('filter')
+
+        # The envelope only feeds the detector, so it is timed with it
+        fired = ()
+        detect_block = filtered_block if self.envelope is None else self.envelope.process(filtered_block)
+        if self.calibrator is not None and self.calibrator.phase is not None:
+            self.calibrator.feed(detect_block)
+        else:
+            if self.drift is not None:
+                self.drift.update(detect_block, self.detector)
+            fired = self.detector.process_block(detect_block, now)
+        if tracer:
+            tracer.mark('detect')
+
+        # Commands first, then the listeners (plots, features)
+        for k, events in fired:
+            for event in events:
+                self.dispatch(event, None if first is None else first + k)
+        for callback in self.sample_listeners:
+            callback(filtered_block)
+        if self.features is not None:
+            windows = self.features.process(filtered_block)
+            if len(windows):
+                for callback in self.feature_listeners:
+                    callback(windows)
+        if tracer:
+            tracer.mark('emit')
+
+    def dispatch(self, event, sample_index=None):
+        # sample_index: offset of the triggering sample in the recording, if any
+        tracer = self.tracer
+        recorder = self.recorder if sample_index is not None else None
+        if recorder is not None:
+            recorder.add_event('burst', sample_index, event.channel, event.action)
+        if self.send_commands and event.action:
+            # Queued for the command thread; the reader never waits on TX
+            if self.commands.post(event.action, tracer.block_start if tracer else None) and recorder is not None:
+                recorder.add_event('command', sample_index, event.channel, event.action)
+        try:
+            self.bursts.put_nowait(event)
+        except queue.Full:
+            self.bursts_dropped += 1
+        for callback in self.burst_listeners:
+            callback(event)
+
+    def snapshot(self):
+        # Copy of the plot history, (channels, samples) oldest -> newest
+        with self.history_lock:
+            return np.array(self.history.view())
+
+    def drain_bursts(self):
+        events = []
+        while True:
+            try:
+                events.append(self.bursts.get_nowait())
+            except queue.Empty:
+                return events
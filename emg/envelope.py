@@ -0,0 +1,70 @@
+import numpy as np
+from scipy.signal import butter, group_delay, lfilter, lfilter_zi
+
+# Causal amplitude envelope for live use. hilbert() + filtfilt() in
+# real_data_read_and_detection_test.py need the whole window (and the future),
+# so they cannot run in the reader; these stages only look at past samples,
+# carry their state between blocks of any size, and cost O(1) per sample.
+#
+#   'lowpass': DC-blocking high-pass -> |x| -> Butterworth low-pass
+#   'rms':     DC-blocking high-pass -> sqrt(moving mean of x^2)
+#
+# The output lags the true envelope by group_delay() seconds (about 45 ms for
+# the default 5 Hz low-pass, window / 2 for the moving RMS). For a sine burst
+# of amplitude A the 'lowpass' envelope settles at 2A/pi and the 'rms' one at
+# A/sqrt(2), not A as with Hilbert, so thresholds need scaling accordingly.
+
+
+class EnvelopeFilter:
+    def __init__(self, num_channels, sampling_rate=1000, method='lowpass', cutoff=5.0,
+                 window_seconds=0.1, highpass=20.0):
+        # highpass: corner (Hz) of the DC blocker, None when the input is already zero-mean
+        if method not in ('lowpass', 'rms'):
+            raise ValueError(f"unknown envelope method {method!r}")
+        self.num_channels = num_channels
+        self.sampling_rate = sampling_rate
+        self.method = method
+
+        self.hp = butter(2, highpass, btype='high', fs=sampling_rate) if highpass else None
+        self.lp = butter(2, cutoff, btype='low', fs=sampling_rate)
+        self.window = max(1, int(round(window_seconds * sampling_rate)))
+        self.reset()
+
+    def reset(self):
+        self.hp_zi = None      # primed on the first block so the ADC offset does not ring
+        self.lp_zi = np.zeros((2, self.num_channels))
+        # Last window - 1 squared samples, for the moving RMS across block boundaries
+        self.tail = np.zeros((self.window - 1, self.num_channels))
+
+    def group_delay(self):
+        # Delay of the envelope in seconds (at DC, where the envelope lives)
+        if self.method == 'rms':
+            return (self.window - 1) / 2 / self.sampling_rate
+        _, gd = group_delay(self.lp, w=[0.0], fs=self.sampling_rate)
+        return float(gd[0]) / self.sampling_rate
+
+    def process(self, block):
+        # block: (samples, channels) -> envelope of the same shape
+        x = np.asarray(block, dtype=float)
+        if x.ndim != 2 or x.shape[1] != self.num_channels:
+            raise ValueError(f"expected (samples, {self.num_channels}) block, got {x.shape}")
+        if len(x) == 0:
+            return x.copy()
+
+        if self.hp is not None:
+            if self.hp_zi is None:
+                self.hp_zi = np.outer(lfilter_zi(*self.hp), x[0])
+            x, self.hp_zi = lfilter(*self.hp, x, axis=0, zi=self.hp_zi)
+
+        if self.method == 'lowpass':
+            y, self.lp_zi = lfilter(*self.lp, np.abs(x), axis=0, zi=self.lp_zi)
+            return y
+
+        # Running sums over [previous tail, this block]; restarting the cumsum
+        # every block keeps rounding error from accumulating over a session
+        squared = np.concatenate((self.tail, x * x))
+        csum = np.cumsum(squared, axis=0)
+        csum = np.concatenate((np.zeros((1, self.num_channels)), csum))
+        mean = (csum[self.window:] - csum[:-self.window]) / self.window
+        self.tail = squared[len(squared) - (self.window - 1):]
+        return np.sqrt(np.maximum(mean, 0.0))
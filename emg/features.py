@@ -0,0 +1,170 @@
+import argparse
+import time
+
+import numpy as np
+from scipy.signal import butter, lfilter, lfilter_zi
+
+# Time-domain EMG features over a sliding window on every channel at once:
+#
+#   mav  mean absolute value          sum |x| / window
+#   rms  root mean square             sqrt(sum x^2 / window)
+#   wl   waveform length              sum |x[n] - x[n-1]|
+#   zc   zero crossings               sign changes with |x[n] - x[n-1]| >= zc_threshold
+#   ssc  slope sign changes           (x[n] - x[n-1]) * (x[n] - x[n+1]) > ssc_threshold
+#
+# A window of `window` samples ends every `stride` samples. Each feature is a
+# running sum of one per-sample term: a new sample adds its term and the one
+# that just left the window is subtracted again. The last `window` terms are
+# kept in a ring, and the last two samples are carried for the differences,
+# so a block costs O(block) whatever the window length. The float sums are
+# recomputed from the ring once per `window` samples so rounding cannot
+# accumulate over long sessions.
+#
+# Output: (windows, channels, features) float32, in FEATURES order. wl, zc and
+# ssc only count pairs / triples inside the window, as in the usual
+# definitions. The input goes through a DC blocker first (highpass Hz;
+# None when it is already zero-mean), because the ADC signal sits around 512
+# and would never cross zero.
+
+FEATURES = ('mav', 'rms', 'wl', 'zc', 'ssc')
+
+
+class FeatureExtractor:
+    def __init__(self, num_channels, window=200, stride=50, sampling_rate=1000, highpass=20.0,
+                 zc_threshold=0.0, ssc_threshold=0.0):
+        if window < 3:
+            raise ValueError(f"window must be at least 3 samples, got {window}")
+        if stride < 1:
+            raise ValueError(f"stride must be at least 1 sample, got {stride}")
+        self.num_channels = num_channels
+        self.window = window
+        self.stride = stride
+        self.sampling_rate = sampling_rate
+        self.zc_threshold = zc_threshold
+        self.ssc_threshold = ssc_threshold
+        self.hp = butter(2, highpass, btype='high', fs=sampling_rate) if highpass else None
+        # Terms per window: mav/rms see every sample, wl/zc every adjacent
+        # pair, ssc every sample with a neighbour on both sides
+        self.lengths = np.array([window, window, window - 1, window - 1, window - 2])
+        self.scale = np.array([1.0 / window, 1.0 / window, 1.0, 1.0, 1.0])[:, None]
+        self.feature_index = np.arange(len(FEATURES))
+        self.reset()
+
+    def reset(self):
+        self.hp_zi = None
+        # Terms are held as (samples, features, channels) so one fancy index
+        # picks every feature's leaving term at once
+        self.ring = np.zeros((self.window, len(FEATURES), self.num_channels))
+        self.sums = np.zeros((len(FEATURES), self.num_channels))
+        self.previous = None       # last two input samples, (2, channels)
+        self.samples = 0
+        self.windows = 0
+
+    def window_ends(self, first, count):
+        # Sample index (exclusive) where windows first .. first + count - 1 end
+        return self.window + (first + np.arange(count)) * self.stride
+
+    def terms(self, x):
+        # Per-sample terms (samples, features, channels); term n of wl/zc pairs
+        # sample n with n-1, term n of ssc is the slope change at n-1
+        fresh = self.previous is None
+        if fresh:
+            self.previous = np.repeat(x[:1], 2, axis=0)
+        padded = np.concatenate((self.previous, x))
+        diff = padded[1:] - padded[:-1]              # diff[k] = padded[k+1] - padded[k]
+        step = diff[1:]                              # x[n] - x[n-1]
+        terms = np.empty((len(x), len(FEATURES), self.num_channels))
+        np.abs(x, out=terms[:, 0])
+        np.multiply(x, x, out=terms[:, 1])
+        np.abs(step, out=terms[:, 2])
+        terms[:, 3] = (padded[1:-1] * x < 0) & (terms[:, 2] >= self.zc_threshold)
+        terms[:, 4] = (diff[:-1] * step) < -self.ssc_threshold
+        if fresh:
+            # The very first sample has no predecessor, the second no slope before it
+            terms[0, 2:] = 0
+            if len(x) > 1:
+                terms[1, 4] = 0
+        self.previous = padded[-2:]
+        return terms
+
+    def process(self, block):
+        # block: (samples, channels) -> (new windows, channels, features) float32
+        x = np.asarray(block, dtype=float)
+        if x.ndim != 2 or x.shape[1] != self.num_channels:
+            raise ValueError(f"expected (samples, {self.num_channels}) block, got {x.shape}")
+        n = len(x)
+        if n == 0:
+            return np.empty((0, self.num_channels, len(FEATURES)), dtype=np.float32)
+        if self.hp is not None:
+            if self.hp_zi is None:
+                self.hp_zi = np.outer(lfilter_zi(*self.hp), x[0])
+            x, self.hp_zi = lfilter(*self.hp, x, axis=0, zi=self.hp_zi)
+
+        terms = self.terms(x)
+        start = self.samples
+        window = self.window
+
+        # The term leaving each feature's window as each sample comes in. Up to
+        # window - 2 samples per block they all arrived before this block and
+        # sit in the ring; longer blocks also reach back into themselves.
+        back = np.arange(n)[:, None] - self.lengths          # (samples, features), relative to start
+        if n <= window - 2:
+            leaving = self.ring[(start + back) % window, self.feature_index]
+        else:
+            history = np.concatenate((self.ring[(start + np.arange(window)) % window], terms))
+            leaving = history[window + back, self.feature_index]
+
+        # Rows of this block where a window ends (sample index + 1 = its end)
+        first = max(0, -(-(start + 1 - window) // self.stride))
+        rows = np.arange(window + first * self.stride - 1 - start, n, self.stride)
+        sums = np.cumsum(terms - leaving, axis=0)
+        sums += self.sums
+        out = sums[rows] * self.scale
+        np.sqrt(np.maximum(out[:, 1], 0.0), out=out[:, 1])
+        self.sums = sums[-1]
+
+        # Keep the last `window` terms
+        keep = min(n, window)
+        self.ring[(start + np.arange(n - keep, n)) % window] = terms[n - keep:]
+        self.samples = start + n
+        if self.samples // window != start // window:
+            self._resync()
+        self.windows += len(rows)
+        return out.transpose(0, 2, 1).astype(np.float32)
+
+    def _resync(self):
+        # Exact sums from the ring, oldest to newest
+        ordered = self.ring[(self.samples + np.arange(self.window)) % self.window]
+        available = min(self.samples, self.window)
+        for f, length in enumerate(self.lengths):
+            self.sums[f] = ordered[self.window - min(length, available):, f].sum(axis=0)
+
+
+def extract(samples, window=200, stride=50, sampling_rate=1000, chunk=10_000, **options):
+    # Features for a whole recording (samples, channels), same as streaming it
+    extractor = FeatureExtractor(samples.shape[1], window, stride, sampling_rate, **options)
+    parts = [extractor.process(samples[s:s + chunk]) for s in range(0, len(samples), chunk)]
+    return np.concatenate(parts) if parts else extractor.process(samples[:0])
+
+
+if __name__ == '__main__':
+    from .sweep import notch_recording
+    from .virtual_board import load_recording
+
+    parser = argparse.ArgumentParser(description="Sliding-window EMG features for a recording")
+    parser.add_argument('recording', help="CSV or .emgrec")
+    parser.add_argument('--window', type=int, default=200, help="samples")
+    parser.add_argument('--stride', type=int, default=50, help="samples")
+    parser.add_argument('--sampling-rate', type=int, default=1000)
+    parser.add_argument('--out', help="output .npy (default: next to the recording)")
+    args = parser.parse_args()
+
+    samples = notch_recording(load_recording(args.recording), args.sampling_rate)
+    start = time.perf_counter()
+    features = extract(samples, args.window, args.stride, args.sampling_rate)
+    elapsed = time.perf_counter() - start
+    out = args.out or args.recording.rsplit('.', 1)[0] + '.features.npy'
+    np.save(out, features)
+    print(f"✅ {features.shape[0]} windows x {features.shape[1]} channels x {len(FEATURES)} features "
+          f"{FEATURES} in {elapsed * 1000:.0f} ms")
+    print(f"💾 Features saved to {out}")
@@ -0,0 +1,54 @@
+import numpy as np
+from scipy.signal import iirnotch, lfilter, lfilter_zi
+
+
+class NotchFilterBank:
+    # 60 Hz notch applied to all channels at once with carried state.
+    # Blocks are (samples x channels); consecutive calls behave exactly like
+    # one continuous lfilter pass over the whole recording.
+
+    def __init__(self, num_channels, sampling_rate=1000, notch_freq=60.0, quality_factor=10.0):
+        self.num_channels = num_channels
+        self.sampling_rate = sampling_rate
+        self.b, self.a = iirnotch(notch_freq, quality_factor, fs=sampling_rate)
+        self.order = len(self.a) - 1
+        self._zi_step = lfilter_zi(self.b, self.a)
+        self.zi = np.zeros((self.order, num_channels))
+        self.primed = False
+
+    def reset(self, initial=None):
+        # Start from the steady state for `initial` (one value per channel) so the
+        # ADC offset does not ring through the notch on the first samples.
+        self.zi = np.zeros((self.order, self.num_channels))
+        self.primed = False
+        if initial is not None:
+            self._prime(np.asarray(initial, dtype=float))
+
+    def _prime(self, x0):
+        self.zi = np.outer(self._zi_step, x0)
+        self.primed = True
+
+    def process(self, block):
+        # block: (samples, channels) -> filtered block of the same shape
+        x = np.asarray(block, dtype=float)
+        if x.ndim != 2 or x.shape[1] != self.num_channels:
+            raise ValueError(f"expected (samples, {self.num_channels}) block, got {x.shape}")
+        if len(x) == 0:
+            return x.copy()
+        if not self.primed:
+            self._prime(x[0])
+        y, self.zi = lfilter(self.b, self.a, x, axis=0, zi=self.zi)
+        return y
+
+    def process_sample(self, values):
+        # Single sample across all channels. A scipy call costs more than the
+        # arithmetic here, so run the transposed direct form II step in NumPy.
+        x = np.asarray(values, dtype=float)
+        if not self.primed:
+            self._prime(x)
+        z = self.zi
+        y = self.b[0] * x + z[0]
+        for k in range(self.order - 1):
+            z[k] = self.b[k + 1] * x - self.a[k + 1] * y + z[k + 1]
+        z[self.order - 1] = self.b[self.order] * x - self.a[self.order] * y
+        return y
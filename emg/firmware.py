@@ -0,0 +1,127 @@
+import argparse
+from collections import deque
+
+import numpy as np
+
+# Python model of EMG_Control_Robotics_Arm.ino's command handling and timing,
+# stepped once per sample period (1 ms at 1000 Hz). blocking=True is the old
+# sketch (delay(500) after every servo write, so no samples for half a second);
+# blocking=False is the millis() state machine, which keeps sampling and only
+# holds further commands in the RX buffer until the servo has settled.
+#
+# VirtualBoard(firmware=FirmwareEmulator(...)) feeds it the host's command
+# bytes and leaves out the rows the board would not have sent.
+
+HOME_ANGLES = {'side': 90, 'front': 130, 'grab': 30}
+
+# command: (servo, step, lowest, highest), same clamps as the sketch
+COMMANDS = {
+    'L': ('side', 30, 0, 180),
+    'R': ('side', -30, 0, 180),
+    'F': ('front', 25, 70, 180),
+    'B': ('front', -25, 70, 180),   # 70 avoids a mechanical collision
+    'G': ('grab', 30, 0, 90),
+    'O': ('grab', -30, 0, 90),
+}
+
+
+class FirmwareEmulator:
+    def __init__(self, blocking=False, settle_ms=500, sample_period_ms=1, rx_buffer=64):
+        self.blocking = blocking
+        self.settle_ms = settle_ms
+        self.sample_period_ms = sample_period_ms
+        self.rx_buffer = rx_buffer     # Uno hardware serial RX buffer; extra bytes are lost
+        self.reset()
+
+    def reset(self):
+        self.angles = dict(HOME_ANGLES)
+        self.rx = deque()
+        self.servo_writes = []    # (time ms, servo, angle)
+        self.now_ms = 0
+        self.busy_until = 0       # blocking: inside delay(); otherwise: servo settling
+        self.samples_sent = 0
+        self.samples_missed = 0
+        self.rx_dropped = 0
+
+    def receive(self, data):
+        # Bytes from the host land in the RX buffer (any time, like the UART ISR)
+        for byte in bytes(data):
+            if len(self.rx) >= self.rx_buffer:
+                self.rx_dropped += 1
+            else:
+                self.rx.append(chr(byte))
+
+    def apply(self, command):
+        # Returns True if the byte moved a servo (or reset them)
+        if command == 'Z':
+            self.angles = dict(HOME_ANGLES)
+            for servo, angle in self.angles.items():
+                self.servo_writes.append((self.now_ms, servo, angle))
+            return True
+        if command not in COMMANDS:
+            return False
+        servo, step, lowest, highest = COMMANDS[command]
+        self.angles[servo] = min(highest, max(lowest, self.angles[servo] + step))
+        self.servo_writes.append((self.now_ms, servo, self.angles[servo]))
+        return True
+
+    def step(self):
+        # One sample period. Returns True if a sample went out at this tick.
+        now = self.now_ms
+        if self.blocking and now < self.busy_until:
+            sent = False       # still inside delay(500)
+            self.samples_missed += 1
+        else:
+            sent = True
+            self.samples_sent += 1
+            # loop(): send, then at most one command byte
+            if (self.blocking or now >= self.busy_until) and self.rx and self.apply(self.rx.popleft()):
+                # Old sketch: delay(500) then delay(1); new one: only commands wait
+                self.busy_until = now + self.settle_ms + (self.sample_period_ms if self.blocking else 0)
+        self.now_ms += self.sample_period_ms
+        return sent
+
+    def run(self, num_samples, commands=None):
+        # commands: {sample index: bytes received just before that tick}.
+        # Returns a bool mask of the samples the board actually sent.
+        commands = commands or {}
+        sent = np.zeros(num_samples, dtype=bool)
+        for index in range(num_samples):
+            if index in commands:
+                self.receive(commands[index])
+            sent[index] = self.step()
+        return sent
+
+    def stats(self):
+        return {
+            'samples_sent': self.samples_sent,
+            'samples_missed': self.samples_missed,
+            'servo_writes': len(self.servo_writes),
+            'rx_pending': len(self.rx),
+            'rx_dropped': self.rx_dropped,
+            'angles': dict(self.angles),
+        }
+
+
+def longest_gap(sent):
+    # Longest run of missing samples in a mask from run(), in samples
+    missing = np.flatnonzero(np.diff(np.concatenate(([0], (~sent).astype(np.int8), [0]))))
+    return int((missing[1::2] - missing[::2]).max()) if len(missing) else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare the old delay(500) sketch with the millis() one")
+    parser.add_argument('--seconds', type=float, default=30)
+    parser.add_argument('--every', type=float, default=1.2, help="seconds between commands")
+    parser.add_argument('--commands', default='LFGRBO')
+    args = parser.parse_args()
+
+    n = int(args.seconds * 1000)
+    step = int(args.every * 1000)
+    schedule = {i: args.commands[k % len(args.commands)].encode() for k, i in enumerate(range(step, n, step))}
+    for blocking in (True, False):
+        emulator = FirmwareEmulator(blocking=blocking)
+        sent = emulator.run(n, schedule)
+        name = 'delay(500)' if blocking else 'millis()'
+        print(f"{name:>10}: {emulator.samples_sent} / {n} samples sent, longest gap {longest_gap(sent)} ms, "
+              f"{len(emulator.servo_writes)} servo writes, final angles {emulator.angles}")
@@ -0,0 +1,138 @@
+import numpy as np
+
+# Binary frame sent by EMG_Control_Robotics_Arm.ino when BINARY_FRAMES is 1:
+#
+#   [0xA5] [seq] [packed 10-bit ADC values, LSB first] [crc8]
+#
+# seq counts 0..255 and wraps, crc8 (poly 0x07) covers seq + payload.
+# Six channels pack into 8 bytes, so a frame is 11 bytes instead of the
+# ~25-30 bytes of "v0,v1,...\r\n", which fits 1 kHz inside 115200 baud.
+
+SYNC = 0xA5
+ADC_BITS = 10
+
+
+def _crc8_table():
+    table = np.zeros(256, dtype=np.uint8)
+    for n in range(256):
+        crc = n
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x07) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+        table[n] = crc
+    return table
+
+
+CRC8_TABLE = _crc8_table()
+
+
+def payload_size(num_channels):
+    return (num_channels * ADC_BITS + 7) // 8
+
+
+def frame_size(num_channels):
+    return payload_size(num_channels) + 3
+
+
+def crc8(rows):
+    # rows: (frames, bytes) uint8 -> one CRC per frame, vectorized across frames
+    crc = np.zeros(len(rows), dtype=np.uint8)
+    for k in range(rows.shape[1]):
+        crc = CRC8_TABLE[crc ^ rows[:, k]]
+    return crc
+
+
+def encode_frames(samples, first_seq=0):
+    # Host-side twin of the firmware encoder, used by simulators and benchmarks
+    samples = np.asarray(samples, dtype=np.uint16) & 0x3FF
+    n, num_channels = samples.shape
+    frames = np.zeros((n, frame_size(num_channels)), dtype=np.uint8)
+    frames[:, 0] = SYNC
+    frames[:, 1] = (first_seq + np.arange(n)) & 0xFF
+    payload = np.zeros((n, payload_size(num_channels) + 1), dtype=np.uint16)
+    for i in range(num_channels):
+        byte, shift = divmod(i * ADC_BITS, 8)
+        shifted = samples[:, i] << shift
+        payload[:, byte] |= shifted & 0xFF
+        payload[:, byte + 1] |= shifted >> 8
+    frames[:, 2:-1] = payload[:, :-1]
+    frames[:, -1] = crc8(frames[:, 1:-1])
+    return frames.tobytes()
+
+
+class BinaryFrameDecoder:
+    # Streaming decoder with the same feed() -> (samples x channels) interface
+    # as LineBlockParser. On a bad sync byte or CRC it slides forward one byte
+    # at a time until frames validate again; lost frames show up as jumps in seq.
+
+    def __init__(self, num_channels, dtype=np.float32):
+        self.num_channels = num_channels
+        self.dtype = dtype
+        self.frame_size = frame_size(num_channels)
+        self.pending = b''
+        self.last_seq = None
+        self.frames_ok = 0
+        self.frames_lost = 0
+        self.bytes_skipped = 0
+        self.resyncs = 0
+        self.gaps = []   # (seq before the gap, frames missing), most recent last
+
+    def feed(self, data):
+        buf = np.frombuffer(self.pending + data, dtype=np.uint8)
+        size = self.frame_size
+        blocks = []
+        pos = 0
+        while len(buf) - pos >= size:
+            count = (len(buf) - pos) // size
+            frames = buf[pos:pos + count * size].reshape(count, size)
+            valid = (frames[:, 0] == SYNC) & (crc8(frames[:, 1:-1]) == frames[:, -1])
+            bad = np.flatnonzero(~valid)
+            good = count if len(bad) == 0 else bad[0]
+            if good:
+                blocks.append(frames[:good])
+                pos += good * size
+            if good == count:
+                break
+            # Resync: skip to the next sync byte after the broken frame start
+            nxt = np.flatnonzero(buf[pos + 1:] == SYNC)
+            skip = nxt[0] + 1 if len(nxt) else len(buf) - pos
+            self.bytes_skipped += int(skip)
+            self.resyncs += 1
+            pos += skip
+        self.pending = buf[pos:].tobytes()
+
+        if not blocks:
+            return np.empty((0, self.num_channels), dtype=self.dtype)
+        frames = np.vstack(blocks)
+        self._track_sequence(frames[:, 1])
+        self.frames_ok += len(frames)
+        return self._unpack(frames[:, 2:-1])
+
+    def _track_sequence(self, seq):
+        seq = seq.astype(np.int16)
+        prev = np.concatenate(([seq[0] - 1 if self.last_seq is None else self.last_seq], seq[:-1]))
+        missing = (seq - prev - 1) % 256
+        for idx in np.flatnonzero(missing):
+            self.gaps.append((int(prev[idx]), int(missing[idx])))
+        del self.gaps[:-100]
+        self.frames_lost += int(missing.sum())
+        self.last_seq = int(seq[-1])
+
+    def _unpack(self, payload):
+        wide = np.zeros((len(payload), payload.shape[1] + 1), dtype=np.uint16)
+        wide[:, :-1] = payload
+        out = np.empty((len(payload), self.num_channels), dtype=self.dtype)
+        for i in range(self.num_channels):
+            byte, shift = divmod(i * ADC_BITS, 8)
+            out[:, i] = ((wide[:, byte] | (wide[:, byte + 1] << 8)) >> shift) & 0x3FF
+        return out
+
+    def empty_block(self):
+        return np.empty((0, self.num_channels), dtype=self.dtype)
+
+    def stats(self):
+        return {
+            'frames_ok': self.frames_ok,
+            'frames_lost': self.frames_lost,
+            'bytes_skipped': self.bytes_skipped,
+            'resyncs': self.resyncs,
+        }
@@ -0,0 +1,191 @@
+from collections import namedtuple
+
+import numpy as np
+
+# Streaming single / double / long-hold burst recognizer, one state machine
+# per channel, with the same process_block(block, now) interface as
+# BurstDetector.
+#
+# A burst starts on the first sample above threshold and ends once the
+# signal has stayed below it for more than merge_gap (shorter dips are part
+# of the burst). Bursts shorter than min_burst are ignored. Then:
+#
+#   hold    fires hold_time into a burst that is still going
+#   double  fires when a second burst is confirmed (min_burst long) within
+#           double_window of the first one's start
+#   single  fires as soon as neither of the others can still happen: at
+#           confirmation if the channel has no double or hold action, at
+#           the burst's end if it only has a hold, otherwise when the double
+#           window runs out
+#
+# So every decision is taken on the sample where the pattern stops being
+# ambiguous, not at the end of a fixed window. All timing is counted in
+# samples, which makes the result independent of how reads are batched.
+# The work is done only at threshold crossings and timer deadlines; a
+# quiet block costs one comparison.
+
+PATTERNS = ('single', 'double', 'hold')
+PatternEvent = namedtuple('PatternEvent', ['channel', 'action', 'time', 'pattern'])
+
+
+class _ChannelState:
+    __slots__ = ('active', 'in_burst', 'burst_start', 'last_rise', 'last_above', 'confirmed', 'consumed',
+                 'pending_start', 'changed')
+
+    def __init__(self):
+        self.active = False          # the current sample is above threshold
+        self.in_burst = False        # inside a burst (dips up to merge_gap included)
+        self.burst_start = 0
+        self.last_rise = 0
+        self.last_above = 0
+        self.confirmed = False       # burst lasted min_burst
+        self.consumed = False        # burst already produced its event (double or hold)
+        self.pending_start = None    # start of a finished burst waiting for a second one
+        self.changed = 0             # sample of the latest edge or timer
+
+
+class PatternRecognizer:
+    def __init__(self, thresholds, actions, sampling_rate=1000, min_burst=0.05, merge_gap=0.15,
+                 double_window=1.0, hold_time=1.0):
+        # actions: {pattern: action} for every channel, or a list of those per
+        # channel; a pattern that is missing (or None) is not recognized there.
+        # Times in seconds.
+        self.num_channels = len(thresholds)
+        self.thresholds = np.asarray(thresholds, dtype=float)
+        if isinstance(actions, dict):
+            actions = [actions] * self.num_channels
+        for channel_actions in actions:
+            unknown = set(channel_actions) - set(PATTERNS)
+            if unknown:
+                raise ValueError(f"unknown patterns {sorted(unknown)}, expected some of {PATTERNS}")
+        self.actions = [dict(a) for a in actions]
+        self.sampling_rate = sampling_rate
+        self.min_burst = max(1, int(round(min_burst * sampling_rate)))
+        self.merge_gap = int(round(merge_gap * sampling_rate))
+        self.double_window = int(round(double_window * sampling_rate))
+        self.hold_time = max(self.min_burst, int(round(hold_time * sampling_rate)))
+        self.states = [_ChannelState() for _ in range(self.num_channels)]
+        self.samples = 0
+
+    def reset(self):
+        self.states = [_ChannelState() for _ in range(self.num_channels)]
+        self.samples = 0
+
+    def _has(self, channel, pattern):
+        return self.actions[channel].get(pattern) is not None
+
+    def _next_timer(self, channel):
+        # (deadline sample, kind) of the earliest pending timer, or None
+        s = self.states[channel]
+        timers = []
+        if s.in_burst:
+            # Length and hold only count while above threshold; a dip resumes them
+            if s.active and not s.confirmed:
+                timers.append((max(s.burst_start + self.min_burst - 1, s.last_rise), 'confirm'))
+            elif s.active and not s.consumed and self._has(channel, 'hold'):
+                timers.append((max(s.burst_start + self.hold_time - 1, s.last_rise), 'hold'))
+            if not s.active:
+                timers.append((s.last_above + self.merge_gap + 1, 'end'))
+        elif s.pending_start is not None:
+            timers.append((s.pending_start + self.double_window, 'window'))
+        return min(timers) if timers else None
+
+    def _run_timers(self, channel, until, fired):
+        # Fires every timer due before sample `until`. A timer whose deadline
+        # passed while another state held it back (the double window during a
+        # long or noisy burst) fires when that state ended, never earlier.
+        s = self.states[channel]
+        while True:
+            timer = self._next_timer(channel)
+            if timer is None or timer[0] >= until:
+                return
+            deadline, kind = timer
+            deadline = max(deadline, s.changed)
+            s.changed = deadline
+            if kind == 'confirm':
+                s.confirmed = True
+                if s.pending_start is not None and s.burst_start - s.pending_start <= self.double_window:
+                    s.pending_start = None
+                    s.consumed = True
+                    self._fire(channel, 'double', deadline, fired)
+                else:
+                    if s.pending_start is not None:
+                        self._fire(channel, 'single', deadline, fired)
+                        s.pending_start = None
+                    if not self._has(channel, 'double') and not self._has(channel, 'hold'):
+                        s.consumed = True
+                        self._fire(channel, 'single', deadline, fired)
+            elif kind == 'hold':
+                s.consumed = True
+                self._fire(channel, 'hold', deadline, fired)
+            elif kind == 'end':
+                s.in_burst = False
+                if s.confirmed and not s.consumed:
+                    if self._has(channel, 'double'):
+                        s.pending_start = s.burst_start
+                    else:
+                        self._fire(channel, 'single', deadline, fired)
+            else:   # window
+                s.pending_start = None
+                self._fire(channel, 'single', deadline, fired)
+
+    def _fire(self, channel, pattern, sample, fired):
+        action = self.actions[channel].get(pattern)
+        if action is not None or pattern == 'single':
+            fired.append((sample, channel, pattern, action))
+
+    def _edge(self, channel, sample, rising):
+        s = self.states[channel]
+        s.active = rising
+        s.changed = sample
+        if not rising:
+            s.last_above = sample - 1
+            return
+        s.last_rise = sample
+        if not s.in_burst:
+            s.in_burst = True
+            s.burst_start = sample
+            s.confirmed = False
+            s.consumed = False
+
+    def _busy(self, channel):
+        s = self.states[channel]
+        return s.active or s.in_burst or s.pending_start is not None
+
+    def process_block(self, block, now):
+        # block: (samples, channels). Returns [(row, [PatternEvent])] for the
+        # rows where a decision was taken, like BurstDetector.process_block.
+        n = len(block)
+        start = self.samples
+        self.samples = start + n
+        if n == 0:
+            return []
+        above = block > self.thresholds
+        changed = above.any(axis=0) | np.array([self._busy(c) for c in range(self.num_channels)])
+        if not changed.any():
+            return []
+
+        fired = []
+        for channel in np.flatnonzero(changed).tolist():
+            column = above[:, channel]
+            previous = self.states[channel].active
+            edges = np.flatnonzero(np.diff(column.astype(np.int8), prepend=np.int8(previous)))
+            for k in edges.tolist():
+                self._run_timers(channel, start + k, fired)
+                self._edge(channel, start + k, bool(column[k]))
+            self._run_timers(channel, start + n, fired)
+
+        if not fired:
+            return []
+        fired.sort(key=lambda item: item[0])
+        result = []
+        for sample, channel, pattern, action in fired:
+            if action is None:
+                continue
+            event = PatternEvent(channel, action, now, pattern)
+            row = sample - start
+            if result and result[-1][0] == row:
+                result[-1][1].append(event)
+            else:
+                result.append((row, [event]))
+        return result
@@ -0,0 +1,355 @@
+import argparse
+import os
+import queue
+import selectors
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import serial
+
+from .filters import NotchFilterBank
+from .framing import BinaryFrameDecoder
+from .ring_buffer import RingBuffer
+from .serial_io import LineBlockParser
+from .timebase import SampleClock
+from .tracing import LatencyTracer
+
+# Several boards from one process and one thread. Every port is opened
+# non-blocking and registered with a selectors event loop. A read wakes the
+# loop for exactly the boards that have bytes, takes whatever is buffered and
+# runs that board's own parser -> notch -> (envelope) -> detector. Servo
+# commands are written to the non-blocking fd at once; if the TX buffer is
+# full, the rest waits for EVENT_WRITE instead of stalling the other boards.
+#
+# A Board carries its own channel labels, filter state, detector, history
+# and counters, so two arms and a leg board can run side by side with
+# different layouts and thresholds. No board is hard-coded: pass as many as
+# the rig has. Each board also has its own SampleClock, since every board
+# samples on its own crystal; its drift against the host is in stats().
+#
+# Linux/macOS (selectors on serial fds does not work on Windows).
+
+
+class Board:
+    def __init__(self, name, port, detector, channel_labels, baudrate=115200, protocol='ascii',
+                 sampling_rate=1000, history_seconds=3, envelope=None, send_commands=True, max_pending=8):
+        self.name = name
+        self.port = port
+        self.baudrate = baudrate
+        self.channel_labels = list(channel_labels)
+        self.num_channels = len(self.channel_labels)
+        if detector.num_channels != self.num_channels:
+            raise ValueError(f"board {name}: detector has {detector.num_channels} channels, "
+                             f"layout has {self.num_channels}")
+        self.detector = detector
+        self.envelope = envelope
+        self.send_commands = send_commands
+        if protocol == 'ascii':
+            self.parser = LineBlockParser(self.num_channels)
+        elif protocol == 'binary':
+            self.parser = BinaryFrameDecoder(self.num_channels)
+        else:
+            raise ValueError(f"unknown serial protocol {protocol!r} (use 'ascii' or 'binary')")
+
+        self.notch = NotchFilterBank(self.num_channels, sampling_rate)
+        self.history = RingBuffer(self.num_channels, int(sampling_rate * history_seconds))
+        self.history_lock = threading.Lock()
+        self.clock = SampleClock(sampling_rate)
+
+        self.ser = None
+        self.fd = None
+        # Command bytes not written yet and when their triggering bytes arrived;
+        # with max_pending waiting the oldest is dropped (latest wins)
+        self.pending = bytearray()
+        self.pending_arrived = deque()
+        self.max_pending = max_pending
+        self.latency = LatencyTracer(stages=('total',))
+
+        self.bytes_read = 0
+        self.reads = 0
+        self.samples = 0
+        self.bursts = 0
+        self.commands_written = 0
+        self.commands_dropped = 0
+        self.rate = 0.0           # samples/s over the last rate interval
+        self.error = None
+
+    def open(self):
+        self.ser = serial.Serial(self.port, self.baudrate, timeout=0, write_timeout=0)
+        self.fd = self.ser.fileno()
+        os.set_blocking(self.fd, False)
+        self.ser.reset_input_buffer()
+
+    def close(self):
+        if self.ser is not None and self.ser.is_open:
+            self.ser.close()
+        self.fd = None
+
+    def feed(self, data):
+        # Raw bytes -> filtered block (samples, channels), also kept for the plots
+        self.bytes_read += len(data)
+        self.reads += 1
+        block = self.parser.feed(data)
+        if not len(block):
+            return block
+        filtered = self.notch.process(block)
+        with self.history_lock:
+            self.history.extend(filtered)
+        self.samples += len(filtered)
+        return filtered
+
+    def detect(self, filtered, now):
+        detect_block = filtered if self.envelope is None else self.envelope.process(filtered)
+        return self.detector.process_block(detect_block, now)
+
+    def post(self, action, arrived_ns):
+        if len(self.pending) >= self.max_pending:
+            del self.pending[0]
+            self.pending_arrived.popleft()
+            self.commands_dropped += 1
+        self.pending += action.encode()
+        self.pending_arrived.append(arrived_ns)
+
+    def flush(self):
+        # Writes what the TX buffer takes; returns True once nothing is left
+        if self.pending:
+            try:
+                written = os.write(self.fd, self.pending)
+            except BlockingIOError:
+                written = 0
+            done = time.perf_counter_ns()
+            del self.pending[:written]
+            for _ in range(written):
+                self.latency.record('total', done - self.pending_arrived.popleft())
+            self.commands_written += written
+        return not self.pending
+
+    def snapshot(self):
+        # Copy of the plot history, (channels, samples) oldest -> newest
+        with self.history_lock:
+            return np.array(self.history.view())
+
+    def stats(self):
+        return {
+            'port': self.port,
+            'samples': self.samples,
+            'rate': round(self.rate, 1),
+            'bytes_read': self.bytes_read,
+            'reads': self.reads,
+            'bursts': self.bursts,
+            'commands_written': self.commands_written,
+            'commands_dropped': self.commands_dropped,
+            'pending': len(self.pending),
+            'parser': self.parser.stats(),
+            'latency_us': self.latency.summary().get('total', {}),
+            'clock': self.clock.stats(),
+            'error': self.error,
+        }
+
+
+class MultiBoardEngine:
+    def __init__(self, boards, rate_interval=1.0, poll_timeout=0.05):
+        names = [board.name for board in boards]
+        if len(set(names)) != len(names):
+            raise ValueError(f"board names must be unique: {names}")
+        self.boards = {board.name: board for board in boards}
+        self.rate_interval = rate_interval
+        self.poll_timeout = poll_timeout
+        self.selector = None
+
+        # Queue API for pollers, callbacks run on the loop thread
+        self.bursts = queue.Queue(maxsize=1000)
+        self.bursts_dropped = 0
+        self.sample_listeners = []
+        self.burst_listeners = []
+
+        self.running = False
+        self.thread = None
+        self.wakeups = 0
+        self.cpu_seconds = 0.0     # loop thread CPU time, set when it exits
+        self.wall_seconds = 0.0
+
+    def add_sample_listener(self, callback):
+        # callback(board_name, filtered_block)
+        self.sample_listeners.append(callback)
+
+    def add_burst_listener(self, callback):
+        # callback(board_name, BurstEvent)
+        self.burst_listeners.append(callback)
+
+    def open(self):
+        self.selector = selectors.DefaultSelector()
+        for board in self.boards.values():
+            board.open()
+            self.selector.register(board.fd, selectors.EVENT_READ, board)
+            print(f"✅ {board.name}: connected to {board.port} at {board.baudrate} baud")
+
+    def start(self):
+        if self.selector is None:
+            self.open()
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name='emg-multiboard', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=1.0)
+        for board in self.boards.values():
+            board.close()
+        if self.selector is not None:
+            self.selector.close()
+        print("🔌 Serial ports closed.")
+        for name, stats in self.stats()['boards'].items():
+            print(f"📊 {name}: {stats}")
+
+    def run(self):
+        cpu_start = time.thread_time()
+        wall_start = time.perf_counter()
+        next_rate = time.monotonic() + self.rate_interval
+        counted = {name: 0 for name in self.boards}
+        while self.running and self.selector.get_map():
+            for key, mask in self.selector.select(self.poll_timeout):
+                board = key.data
+                if mask & selectors.EVENT_READ:
+                    self._read(board)
+                if mask & selectors.EVENT_WRITE and board.fd is not None and self._flush(board):
+                    self.selector.modify(board.fd, selectors.EVENT_READ, board)
+            self.wakeups += 1
+
+            now = time.monotonic()
+            if now >= next_rate:
+                elapsed = now - next_rate + self.rate_interval
+                for name, board in self.boards.items():
+                    board.rate = (board.samples - counted[name]) / elapsed
+                    counted[name] = board.samples
+                next_rate = now + self.rate_interval
+        self.cpu_seconds = time.thread_time() - cpu_start
+        self.wall_seconds = time.perf_counter() - wall_start
+        self.running = False
+
+    def _read(self, board):
+        arrived = time.perf_counter_ns()
+        try:
+            data = os.read(board.fd, 65536)
+            received = time.time()    # the clock's arrival time, before parsing and filtering
+        except BlockingIOError:
+            return
+        except OSError as e:
+            self._drop_board(board, str(e))
+            return
+        if not data:
+            self._drop_board(board, 'port closed')
+            return
+        filtered = board.feed(data)
+        if not len(filtered):
+            return
+        for callback in self.sample_listeners:
+            callback(board.name, filtered)
+
+        board.clock.update(len(filtered), received)
+        for _, events in board.detect(filtered, board.clock.latest()):
+            for event in events:
+                self.dispatch(board, event, arrived)
+
+    def dispatch(self, board, event, arrived_ns):
+        board.bursts += 1
+        if board.send_commands and event.action and board.fd is not None:
+            board.post(event.action, arrived_ns)
+            if self._flush(board) is False:
+                self.selector.modify(board.fd, selectors.EVENT_READ | selectors.EVENT_WRITE, board)
+        try:
+            self.bursts.put_nowait((board.name, event))
+        except queue.Full:
+            self.bursts_dropped += 1
+        for callback in self.burst_listeners:
+            callback(board.name, event)
+
+    def _flush(self, board):
+        # board.flush(), or None once a write error has dropped the board
+        try:
+            return board.flush()
+        except OSError as e:
+            self._drop_board(board, str(e))
+            return None
+
+    def _drop_board(self, board, reason):
+        # One unplugged board must not take the others down
+        if board.fd is None:
+            return
+        print(f"⚠️ {board.name}: {reason}, no longer read")
+        board.error = reason
+        self.selector.unregister(board.fd)
+        board.close()
+
+    def snapshot(self, name):
+        return self.boards[name].snapshot()
+
+    def drain_bursts(self):
+        # [(board_name, BurstEvent)]
+        events = []
+        while True:
+            try:
+                events.append(self.bursts.get_nowait())
+            except queue.Empty:
+                return events
+
+    @property
+    def samples_processed(self):
+        return sum(board.samples for board in self.boards.values())
+
+    def stats(self):
+        return {
+            'boards': {name: board.stats() for name, board in self.boards.items()},
+            'wakeups': self.wakeups,
+            'cpu_seconds': round(self.cpu_seconds, 3),
+            'wall_seconds': round(self.wall_seconds, 3),
+            'bursts_dropped': self.bursts_dropped,
+        }
+
+
+if __name__ == '__main__':
+    from .detection import BurstDetector, SuppressionGraph
+    from .virtual_board import VirtualBoard
+
+    parser = argparse.ArgumentParser(description="Acquire from several boards in one process")
+    parser.add_argument('--board', action='append', default=[], metavar='NAME=PORT',
+                        help="a board to read, repeat for more")
+    parser.add_argument('--virtual', type=int, default=0, metavar='N',
+                        help="add N pty boards replaying the simulated recording")
+    parser.add_argument('--baudrate', type=int, default=115200)
+    parser.add_argument('--protocol', choices=['ascii', 'binary'], default='ascii')
+    parser.add_argument('--threshold', type=float, default=560)
+    args = parser.parse_args()
+
+    labels = ["A0 - Left Wrist", "A1 - Right Wrist", "A2 - Left Elbow", "A3 - Right Elbow",
+              "A4 - Left Leg", "A5 - Right Leg"]
+    actions = ['L', 'R', 'F', 'B', 'G', 'O']
+    repo = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+    virtual = [VirtualBoard(os.path.join(repo, 'test', 'simulated_30s_6channel_emg.csv'), loop=True,
+                            protocol=args.protocol).start() for _ in range(args.virtual)]
+    ports = [spec.split('=', 1) for spec in args.board]
+    ports += [(f"virtual{i}", board.port) for i, board in enumerate(virtual)]
+    if not ports:
+        parser.error("give at least one --board NAME=PORT or --virtual N")
+
+    engine = MultiBoardEngine([
+        Board(name, port, BurstDetector([args.threshold] * len(labels), actions,
+                                        priority=SuppressionGraph.from_labels(labels)),
+              labels, baudrate=args.baudrate, protocol=args.protocol)
+        for name, port in ports])
+    engine.add_burst_listener(lambda name, event: print(f"⚡ {name}: {labels[event.channel]} -> {event.action}"))
+    engine.start()
+    try:
+        while engine.running:
+            time.sleep(5)
+            rates = ', '.join(f"{name} {board.rate:.0f}" for name, board in engine.boards.items())
+            print(f"📈 samples/s: {rates}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        engine.stop()
+        for board in virtual:
+            board.stop()
@@ -0,0 +1,295 @@
+import multiprocessing as mp
+import queue
+import threading
+import time
+
+import numpy as np
+
+from .filters import NotchFilterBank
+from .ring_buffer import RingBuffer
+from .shared_ring import SharedRingBuffer
+from .timebase import SampleClock
+
+# AcquisitionEngine split over three processes, so neither the GIL nor a slow
+# window can hold up a servo command:
+#
+#   acquisition  owns the port: SerialBlockReader -> raw ring, and the
+#                CommandDispatcher that writes the commands it is sent
+#   dsp          raw ring -> notch (+ envelope) -> BurstDetector; filtered
+#                samples -> display ring, actions -> command queue,
+#                bursts -> burst queue
+#   gui (this)   display ring -> history for the plots, drain_bursts()
+#
+# Samples move through SharedRingBuffers (emg/shared_ring.py): the raw ring
+# is lossless ('block': acquisition waits for the DSP, then drops and counts),
+# the display ring is 'overwrite' (a stalled window just misses samples).
+# Commands go over a pipe that the acquisition process blocks on, so one
+# reaches its CommandDispatcher without any polling delay (a command is a
+# few bytes; the pipe buffer holds thousands). Bursts for the window go
+# through a queue and are dropped and counted when it is full.
+#
+# MultiprocessEngine has the same interface as AcquisitionEngine for the
+# viewers (open/start/stop, history + history_lock, drain_bursts, snapshot,
+# samples_processed). Recording, calibration and tracing by stage are only
+# available in the single-process engine.
+
+
+def _acquisition_main(port, baudrate, num_channels, protocol, raw_spec, commands, go, stop, status,
+                      command_interval):
+    import serial
+    from .dispatch import CommandDispatcher
+    from .serial_io import SerialBlockReader
+    from .tracing import LatencyTracer
+
+    raw = SharedRingBuffer.attach(raw_spec)
+    try:
+        ser = serial.Serial(port, baudrate, timeout=0.05, write_timeout=0.1)
+    except (serial.SerialException, OSError) as e:
+        status.put(('error', str(e)))
+        raw.close()
+        return
+    status.put(('ready', None))
+
+    # The reader's tracer only supplies block_start: when a block's bytes arrived
+    tracer = LatencyTracer()
+    reader = SerialBlockReader(ser, num_channels, protocol=protocol, tracer=tracer)
+    dispatcher = CommandDispatcher(ser, min_interval=command_interval,
+                                   tracer=LatencyTracer(stages=('queued', 'write', 'total'))).start()
+
+    def forward_commands():
+        # Wakes as soon as the DSP writes to the pipe; b'' means stop
+        while True:
+            message = commands.recv_bytes()
+            if not message:
+                return
+            action, arrived = message.split(b' ')
+            dispatcher.post(action.decode(), int(arrived))
+
+    forwarder = threading.Thread(target=forward_commands, name='emg-command-forward', daemon=True)
+    forwarder.start()
+
+    # Stream only once the DSP process is up; what queued meanwhile is stale
+    while not go.wait(0.05):
+        if stop.is_set():
+            break
+    ser.reset_input_buffer()
+    while not stop.is_set() and ser.is_open:
+        try:
+            block = reader.read_block()
+        except (serial.SerialException, OSError) as e:
+            print(f"⚠️ Read failed: {e}")
+            break
+        if len(block):
+            raw.write(block, tracer.block_start)
+    raw.close_writer()
+
+    forwarder.join(timeout=1.0)
+    dispatcher.stop()
+    ser.close()
+    status.put(('stats', {'serial': reader.stats(), 'commands': dispatcher.stats(), 'raw': raw.stats()}))
+    raw.close()
+
+
+def _dsp_main(num_channels, detector, sampling_rate, envelope, raw_spec, display_spec, commands, bursts, stop,
+              status, send_commands):
+    raw = SharedRingBuffer.attach(raw_spec)
+    display = SharedRingBuffer.attach(display_spec)
+    notch = NotchFilterBank(num_channels, sampling_rate)
+    # Arrival stamps are perf_counter_ns (one clock for every process); the
+    # SampleClock turns them into wall time for the events
+    clock = SampleClock(sampling_rate)
+    wall_offset = time.time() - time.perf_counter()
+    bursts_dropped = samples = 0
+    status.put(('ready', None))
+
+    while not stop.is_set():
+        item = raw.wait_read(0.05)
+        if item is None:
+            if raw.closed:
+                break
+            continue
+        _, block, arrived = item
+        filtered = notch.process(block)
+        display.write(filtered)
+        samples += len(filtered)
+        detect_block = filtered if envelope is None else envelope.process(filtered)
+
+        clock.update(len(block), arrived[-1] / 1e9 + wall_offset)
+        for k, events in detector.process_block(detect_block, clock.latest()):
+            for event in events:
+                if send_commands and event.action:
+                    commands.send_bytes(f"{event.action} {arrived[k]}".encode())
+                try:
+                    bursts.put_nowait(event)
+                except queue.Full:
+                    bursts_dropped += 1
+    display.close_writer()
+    commands.send_bytes(b'')
+
+    status.put(('stats', {'samples': samples, 'bursts_dropped': bursts_dropped, 'clock': clock.stats(),
+                          'display': display.stats()}))
+    raw.close()
+    display.close()
+
+
+class MultiprocessEngine:
+    def __init__(self, port, baudrate, num_channels, detector, sampling_rate=1000,
+                 history_seconds=3, protocol='ascii', send_commands=True, envelope=None,
+                 command_interval=0.0, raw_seconds=1.0, display_seconds=1.0,
+                 raw_policy='block', display_policy='overwrite'):
+        # detector and envelope are pickled into the DSP process
+        self.port = port
+        self.baudrate = baudrate
+        self.num_channels = num_channels
+        self.detector = detector
+        self.sampling_rate = sampling_rate
+        self.protocol = protocol
+        self.send_commands = send_commands
+        self.envelope = envelope
+        self.command_interval = command_interval
+
+        self.raw = SharedRingBuffer(num_channels, int(sampling_rate * raw_seconds), raw_policy)
+        self.display = SharedRingBuffer(num_channels, int(sampling_rate * display_seconds), display_policy)
+        self.history = RingBuffer(num_channels, int(sampling_rate * history_seconds))
+        self.history_lock = threading.Lock()
+
+        # Same queue/listener API as AcquisitionEngine; callbacks run on the
+        # display thread of this process
+        self.bursts = queue.Queue(maxsize=1000)
+        self.sample_listeners = []
+        self.burst_listeners = []
+        self.bursts_dropped = 0
+
+        # spawn: the same on Linux and macOS, and no Qt state is forked
+        self.context = mp.get_context('spawn')
+        self.go_event = self.context.Event()
+        self.stop_event = self.context.Event()
+        self.command_receiver, self.command_sender = self.context.Pipe(duplex=False)
+        self.burst_queue = self.context.Queue(maxsize=1000)
+        self.acquisition_status = self.context.Queue()
+        self.dsp_status = self.context.Queue()
+        self.acquisition = None
+        self.dsp = None
+        self.child_stats = {}
+        self.final_stats = None    # ring counters, kept once the rings are closed
+
+        self.running = False
+        self.thread = None
+
+    @property
+    def samples_processed(self):
+        if self.final_stats is not None:
+            return self.final_stats['display']['write_seq']
+        return int(self.display.header[0])
+
+    def add_sample_listener(self, callback):
+        self.sample_listeners.append(callback)
+
+    def add_burst_listener(self, callback):
+        self.burst_listeners.append(callback)
+
+    def open(self, timeout=5.0):
+        # Starts the acquisition process; raises if it cannot open the port
+        self.acquisition = self.context.Process(
+            target=_acquisition_main, name='emg-acquisition', daemon=True,
+            args=(self.port, self.baudrate, self.num_channels, self.protocol, self.raw.spec(),
+                  self.command_receiver, self.go_event, self.stop_event, self.acquisition_status,
+                  self.command_interval))
+        self.acquisition.start()
+        kind, detail = self._wait_status(self.acquisition_status, timeout)
+        if kind != 'ready':
+            self.acquisition.join(timeout=1.0)
+            raise RuntimeError(f"acquisition process failed to open {self.port}: {detail}")
+        print(f"✅ Connected to {self.port} at {self.baudrate} baud (acquisition pid {self.acquisition.pid})")
+
+    def start(self, timeout=5.0):
+        if self.acquisition is None:
+            self.open(timeout)
+        self.dsp = self.context.Process(
+            target=_dsp_main, name='emg-dsp', daemon=True,
+            args=(self.num_channels, self.detector, self.sampling_rate, self.envelope, self.raw.spec(),
+                  self.display.spec(), self.command_sender, self.burst_queue, self.stop_event,
+                  self.dsp_status, self.send_commands))
+        self.dsp.start()
+        kind, detail = self._wait_status(self.dsp_status, timeout)
+        if kind != 'ready':
+            self.stop()
+            raise RuntimeError(f"DSP process failed to start: {detail}")
+        self.go_event.set()
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name='emg-display', daemon=True)
+        self.thread.start()
+
+    def _wait_status(self, status, timeout):
+        try:
+            return status.get(timeout=timeout)
+        except queue.Empty:
+            return 'timeout', f"no answer within {timeout} s"
+
+    def run(self):
+        # Display thread: display ring -> history, burst queue -> bursts/listeners
+        while self.running:
+            item = self.display.wait_read(0.02)
+            if item is not None:
+                block = item[1]
+                with self.history_lock:
+                    self.history.extend(block)
+                for callback in self.sample_listeners:
+                    callback(block)
+            while True:
+                try:
+                    event = self.burst_queue.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    self.bursts.put_nowait(event)
+                except queue.Full:
+                    self.bursts_dropped += 1
+                for callback in self.burst_listeners:
+                    callback(event)
+            if item is None and self.display.closed:
+                break
+
+    def stop(self):
+        self.stop_event.set()
+        self.running = False
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=1.0)
+        for name, process, status in (('acquisition', self.acquisition, self.acquisition_status),
+                                      ('dsp', self.dsp, self.dsp_status)):
+            if process is None:
+                continue
+            kind, detail = self._wait_status(status, 2.0)
+            if kind == 'stats':
+                self.child_stats[name] = detail
+            process.join(timeout=2.0)
+            if process.is_alive():
+                process.terminate()
+        print("🔌 Serial port closed.")
+        stats = self.stats()
+        if 'acquisition' in stats:
+            print(f"📊 Serial stats: {stats['acquisition']['serial']}")
+            print(f"📤 Command stats: {stats['acquisition']['commands']}")
+        print(f"🔀 Rings: raw {stats['raw']}, display {stats['display']}")
+        if 'dsp' in stats:
+            print(f"⏱️ Clock: {stats['dsp']['clock']}")
+        self.final_stats = {'raw': stats['raw'], 'display': stats['display']}
+        self.raw.close()
+        self.display.close()
+
+    def stats(self):
+        rings = self.final_stats or {'raw': self.raw.stats(), 'display': self.display.stats()}
+        return {**self.child_stats, **rings, 'bursts_dropped': self.bursts_dropped}
+
+    def snapshot(self):
+        # Copy of the plot history, (channels, samples) oldest -> newest
+        with self.history_lock:
+            return np.array(self.history.view())
+
+    def drain_bursts(self):
+        events = []
+        while True:
+            try:
+                events.append(self.bursts.get_nowait())
+            except queue.Empty:
+                return events
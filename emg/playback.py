@@ -0,0 +1,187 @@
+import argparse
+import json
+import os
+from collections import OrderedDict
+from itertools import islice
+
+import numpy as np
+from scipy.signal import lfilter
+
+from .filters import NotchFilterBank
+from .recorder import open_session
+
+# Random-access playback of long recordings for the offline viewers.
+#
+# convert_csv() turns a CSV into a .npy (float32, samples x channels) plus a
+# .json sidecar once; PlaybackSource then memory-maps it, so opening a
+# multi-hour file costs the same as a 30 s one. Session recordings (.emgrec)
+# are opened the same way.
+#
+# The notch output is produced in fixed chunks and cached. Each chunk is
+# filtered from the state left by the previous one, so playback is one
+# continuous lfilter pass with no transient at chunk boundaries. After a
+# seek to a chunk whose predecessor was never filtered, the state is rebuilt
+# by running the filter over the preceding warm-up samples; the notch
+# forgets its start within that window, so the result matches a full pass
+# to far below ADC resolution.
+
+MIN_SPEED = 1.0
+MAX_SPEED = 50.0
+
+
+def converted_paths(csv_path):
+    base = os.path.splitext(csv_path)[0]
+    return base + '.npy', base + '.json'
+
+
+def convert_csv(csv_path, out_path=None, sampling_rate=None, rows_per_read=100_000):
+    # One pass over the CSV in slices, so memory does not grow with the file.
+    # A leading 'time' column is dropped and used to infer the sampling rate.
+    npy_path, meta_path = converted_paths(out_path or csv_path)
+    with open(csv_path, 'rb') as f:
+        f.readline()
+        num_rows = sum(1 for line in f if line.strip())
+    with open(csv_path) as f:
+        columns = [c.strip() for c in f.readline().split(',')]
+        has_time = columns[0].lower() == 'time'
+        first = np.loadtxt(islice(f, 2), delimiter=',', ndmin=2)
+    if has_time and sampling_rate is None and len(first) > 1:
+        sampling_rate = float(1 / (first[1, 0] - first[0, 0]))
+
+    channels = columns[1:] if has_time else columns
+    out = np.lib.format.open_memmap(npy_path, mode='w+', dtype=np.float32, shape=(num_rows, len(channels)))
+    written = 0
+    with open(csv_path) as f:
+        f.readline()
+        while written < num_rows:
+            block = np.loadtxt(islice(f, rows_per_read), delimiter=',', ndmin=2)
+            out[written:written + len(block)] = block[:, 1:] if has_time else block
+            written += len(block)
+    out.flush()
+    del out
+
+    with open(meta_path, 'w') as f:
+        json.dump({'source': os.path.basename(csv_path), 'channels': channels,
+                   'sampling_rate': sampling_rate or 1000, 'num_samples': written}, f, indent=2)
+    return npy_path
+
+
+def ensure_converted(path):
+    # Path to play: CSVs are converted on first use (again if the CSV is newer)
+    if not path.endswith('.csv'):
+        return path
+    npy_path, meta_path = converted_paths(path)
+    if not (os.path.exists(npy_path) and os.path.exists(meta_path)
+            and os.path.getmtime(npy_path) >= os.path.getmtime(path)):
+        convert_csv(path)
+    return npy_path
+
+
+class PlaybackSource:
+    def __init__(self, path, sampling_rate=None, chunk_seconds=1.0, notch_freq=60.0, quality_factor=10.0,
+                 cache_chunks=64, speed=1.0):
+        path = ensure_converted(path)
+        if path.endswith('.emgrec'):
+            header, self.samples, _ = open_session(path)
+            self.channels = header.get('channel_labels') or [f"A{i}" for i in range(header['num_channels'])]
+            rate = header['sampling_rate']
+        else:
+            self.samples = np.load(path, mmap_mode='r')
+            with open(converted_paths(path)[1]) as f:
+                meta = json.load(f)
+            self.channels = meta['channels']
+            rate = meta['sampling_rate']
+        self.sampling_rate = sampling_rate or rate
+        self.num_samples, self.num_channels = self.samples.shape
+
+        self.bank = NotchFilterBank(self.num_channels, self.sampling_rate, notch_freq, quality_factor)
+        self.chunk = max(1, int(chunk_seconds * self.sampling_rate))
+        self.warmup = self._warmup_samples()
+        self.cache = OrderedDict()     # chunk index -> filtered (chunk, channels)
+        self.cache_chunks = cache_chunks
+        self.end_state = {}            # chunk index -> filter state after that chunk
+
+        self.position = 0.0            # samples played, fractional between ticks
+        self.speed = 1.0
+        self.set_speed(speed)
+
+    def _warmup_samples(self):
+        # Samples for the filter's memory to fall below 1e-9 (slowest pole)
+        radius = np.max(np.abs(np.roots(self.bank.a)))
+        return int(np.ceil(np.log(1e-9) / np.log(radius))) if radius > 0 else 1
+
+    @property
+    def duration(self):
+        return self.num_samples / self.sampling_rate
+
+    def raw(self, start, stop):
+        return self.samples[max(0, start):max(0, stop)]
+
+    def _chunk_state(self, k):
+        # Filter state at the start of chunk k
+        if k == 0:
+            return np.outer(self.bank._zi_step, np.asarray(self.samples[0], dtype=float))
+        if k - 1 in self.end_state:
+            return self.end_state[k - 1]
+        start = k * self.chunk
+        lead = np.asarray(self.samples[max(0, start - self.warmup):start], dtype=float)
+        zi = np.outer(self.bank._zi_step, lead[0])
+        _, zi = lfilter(self.bank.b, self.bank.a, lead, axis=0, zi=zi)
+        return zi
+
+    def _filtered_chunk(self, k):
+        if k in self.cache:
+            self.cache.move_to_end(k)
+            return self.cache[k]
+        block = np.asarray(self.samples[k * self.chunk:(k + 1) * self.chunk], dtype=float)
+        filtered, self.end_state[k] = lfilter(self.bank.b, self.bank.a, block, axis=0, zi=self._chunk_state(k))
+        self.cache[k] = filtered
+        if len(self.cache) > self.cache_chunks:
+            # End states are kept (a few floats per chunk) so a replay stays exact
+            self.cache.popitem(last=False)
+        return filtered
+
+    def filtered(self, start, stop):
+        # Notch-filtered samples [start, stop) as (samples, channels)
+        start, stop = max(0, start), min(self.num_samples, stop)
+        if stop <= start:
+            return np.empty((0, self.num_channels))
+        first, last = start // self.chunk, (stop - 1) // self.chunk
+        parts = [self._filtered_chunk(k) for k in range(first, last + 1)]
+        block = parts[0] if len(parts) == 1 else np.concatenate(parts)
+        offset = start - first * self.chunk
+        return block[offset:offset + stop - start]
+
+    def seek(self, index):
+        self.position = float(min(max(0, index), self.num_samples))
+
+    def set_speed(self, speed):
+        self.speed = min(MAX_SPEED, max(MIN_SPEED, speed))
+
+    def tick(self, elapsed_seconds):
+        # Advance by elapsed wall time at the current speed; returns the new position
+        self.seek(self.position + elapsed_seconds * self.speed * self.sampling_rate)
+        return int(self.position)
+
+    def window(self, num_points):
+        # The num_points filtered samples ending at the play position, as
+        # (channels, num_points); zeros before the start of the recording
+        end = int(self.position)
+        out = np.zeros((self.num_channels, num_points))
+        data = self.filtered(end - num_points, end)
+        if len(data):
+            out[:, num_points - len(data):] = data.T
+        return out
+
+    @property
+    def finished(self):
+        return self.position >= self.num_samples
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Convert CSV recordings to memory-mappable .npy for playback")
+    parser.add_argument('csv_paths', nargs='+')
+    parser.add_argument('--fs', type=float, default=None, help="sampling rate if the CSV has no time column")
+    args = parser.parse_args()
+    for csv_path in args.csv_paths:
+        print(f"✅ {csv_path} -> {convert_csv(csv_path, sampling_rate=args.fs)}")
@@ -0,0 +1,104 @@
+import time
+
+import numpy as np
+
+# Level-of-detail drawing for the scrolling plots. A 3 s window is 3000
+# points per curve but the plot is only ~800 px wide, so each curve is cut
+# into one bucket per pixel column and drawn as that bucket's min and max:
+# spikes stay visible and pyqtgraph gets 2 x width points instead of 3000.
+#
+# The decimation itself is Qt-free; LivePlotRenderer drives pyqtgraph curves
+# (anything with setData) from a RingBuffer view.
+
+
+def minmax_decimate(view, buckets, out=None):
+    # view: (channels, samples) oldest -> newest. Returns (channels, 2 * buckets)
+    # with each bucket's min and max side by side, written into out if given.
+    # When samples is not a multiple of buckets the oldest remainder is left out.
+    num_channels, n = view.shape
+    per_bucket = n // buckets
+    used = view[:, n - per_bucket * buckets:].reshape(num_channels, buckets, per_bucket)
+    if out is None:
+        out = np.empty((num_channels, 2 * buckets), dtype=view.dtype)
+    pairs = out.reshape(num_channels, buckets, 2)
+    lows, highs = pairs[:, :, 0], pairs[:, :, 1]
+    if per_bucket > 16:
+        np.min(used, axis=2, out=lows)
+        np.max(used, axis=2, out=highs)
+    else:
+        # A reduction over a short last axis is slow in NumPy; a few
+        # elementwise passes over the strided columns are ~20x faster
+        lows[...] = used[:, :, 0]
+        highs[...] = used[:, :, 0]
+        for k in range(1, per_bucket):
+            np.minimum(lows, used[:, :, k], out=lows)
+            np.maximum(highs, used[:, :, k], out=highs)
+    return out
+
+
+class LivePlotRenderer:
+    def __init__(self, curves, sampling_rate, duration, width=1000, max_fps=30):
+        # curves: one pyqtgraph PlotDataItem per channel. width: pixel columns
+        # used when the curve cannot report its view box width.
+        self.curves = list(curves)
+        self.num_channels = len(self.curves)
+        self.num_points = int(sampling_rate * duration)
+        self.duration = duration
+        self.width = width
+        self.min_frame_interval = 1.0 / max_fps if max_fps else 0.0
+
+        self.buckets = None
+        self.x = None
+        self.y = None
+        self.last_frame = 0.0
+        self.last_written = np.full(self.num_channels, -1, dtype=np.int64)
+        self.frames = 0
+        self.frames_skipped = 0
+        for curve in self.curves:
+            # The decimated arrays are always finite; skip pyqtgraph's check
+            if hasattr(curve, 'setSkipFiniteCheck'):
+                curve.setSkipFiniteCheck(True)
+
+    def _pixel_width(self):
+        view_box = self.curves[0].getViewBox() if hasattr(self.curves[0], 'getViewBox') else None
+        width = int(view_box.width()) if view_box is not None else 0
+        return width if width > 0 else self.width
+
+    def _allocate(self, buckets):
+        # Arrays are reused frame to frame and only rebuilt when the plot is resized
+        self.buckets = buckets
+        per_bucket = self.num_points // buckets
+        first = self.num_points - per_bucket * buckets
+        centers = (first + (np.arange(buckets) + 0.5) * per_bucket) * self.duration / self.num_points
+        self.x = np.repeat(centers, 2)
+        self.y = np.empty((self.num_channels, 2 * buckets))
+        self.last_written[:] = -1
+
+    def render(self, view, written, force=False):
+        # view: (channels, num_points) history, e.g. RingBuffer.view().
+        # written: samples written so far, one count or one per channel; a
+        # channel is redrawn only when its count moved. Returns True if drawn.
+        now = time.perf_counter()
+        if not force and now - self.last_frame < self.min_frame_interval:
+            self.frames_skipped += 1
+            return False
+
+        written = np.broadcast_to(np.asarray(written, dtype=np.int64), (self.num_channels,))
+        dirty = np.flatnonzero(written != self.last_written)
+        buckets = max(1, min(self._pixel_width(), self.num_points // 2))
+        if buckets != self.buckets:
+            self._allocate(buckets)
+            dirty = np.arange(self.num_channels)
+        if len(dirty) == 0:
+            return False
+
+        if len(dirty) == self.num_channels:
+            minmax_decimate(view, buckets, out=self.y)
+        else:
+            self.y[dirty] = minmax_decimate(view[dirty], buckets)
+        for i in dirty:
+            self.curves[i].setData(self.x, self.y[i])
+        self.last_written[dirty] = written[dirty]
+        self.last_frame = now
+        self.frames += 1
+        return True
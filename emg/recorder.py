@@ -0,0 +1,192 @@
+import csv
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# Append-only session recording.
+#
+#   session.emgrec         header + raw ADC samples as little-endian int16 rows
+#   session.emgrec.events  CSV index: sample,kind,channel,action,time
+#
+# The header is 8 magic bytes, a uint32 length and a JSON object (channel
+# labels, fs, thresholds, ...), padded so the samples start on a 4 KiB
+# boundary and can be np.memmap'ed directly. The sample count is not stored:
+# it follows from the file size, so a capture cut short by a crash is still
+# readable up to the last complete row.
+#
+# write() and add_event() only append to a deque; the recorder's thread wakes
+# every poll_interval, converts to int16 and does all file I/O, so the
+# acquisition thread never waits on the disk or wakes another thread per read.
+
+MAGIC = b'EMGREC1\0'
+DATA_ALIGN = 4096
+SAMPLE_DTYPE = np.dtype('<i2')
+EVENT_FIELDS = ['sample', 'kind', 'channel', 'action', 'time']
+
+
+def _data_offset(header_length):
+    return -(-(len(MAGIC) + 4 + header_length) // DATA_ALIGN) * DATA_ALIGN
+
+
+def _header_bytes(header):
+    body = json.dumps(header).encode()
+    raw = MAGIC + len(body).to_bytes(4, 'little') + body
+    return raw + b'\0' * (_data_offset(len(body)) - len(raw))
+
+
+def read_header(path):
+    # The JSON header, plus 'data_offset' where the samples start
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not an EMG session recording")
+        length = int.from_bytes(f.read(4), 'little')
+        header = json.loads(f.read(length))
+    header['data_offset'] = _data_offset(length)
+    return header
+
+
+def open_session(path):
+    # Returns (header, samples, events). samples is a read-only (n, channels)
+    # int16 memmap; events is a list of dicts from the .events index.
+    header = read_header(path)
+    row_bytes = SAMPLE_DTYPE.itemsize * header['num_channels']
+    num_samples = (os.path.getsize(path) - header['data_offset']) // row_bytes
+    if num_samples > 0:
+        samples = np.memmap(path, dtype=SAMPLE_DTYPE, mode='r', offset=header['data_offset'],
+                            shape=(num_samples, header['num_channels']))
+    else:
+        samples = np.empty((0, header['num_channels']), dtype=SAMPLE_DTYPE)
+    events = []
+    if os.path.exists(path + '.events'):
+        with open(path + '.events', newline='') as f:
+            for row in csv.DictReader(f):
+                events.append({
+                    'sample': int(row['sample']),
+                    'kind': row['kind'],
+                    'channel': int(row['channel']) if row['channel'] else None,
+                    'action': row['action'],
+                    'time': float(row['time']),
+                })
+    return header, samples, events
+
+
+class SessionRecorder:
+    def __init__(self, path, num_channels, sampling_rate=1000, channel_labels=None,
+                 thresholds=None, chunk_samples=1000, flush_interval=0.5, poll_interval=0.05, **extra):
+        # Samples reach the disk in chunks of chunk_samples rows, and at least
+        # every flush_interval seconds. extra keyword arguments are stored in
+        # the header as they are.
+        self.path = path
+        self.num_channels = num_channels
+        self.chunk_samples = chunk_samples
+        self.flush_interval = flush_interval
+        self.poll_interval = poll_interval
+        self.header = {
+            'version': 1,
+            'num_channels': num_channels,
+            'sampling_rate': sampling_rate,
+            'dtype': 'int16',
+            'channel_labels': list(channel_labels) if channel_labels else None,
+            'thresholds': list(thresholds) if thresholds is not None else None,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            **extra,
+        }
+
+        self.pending = deque()    # ('samples', block) / ('event', row); deque appends are thread-safe
+        self.samples_received = 0     # acquisition thread: sample offset of the next row
+        self.samples_written = 0
+        self.events_written = 0
+        self.max_backlog = 0
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.data_file = open(self.path, 'wb')
+        self.data_file.write(_header_bytes(self.header))
+        self.events_file = open(self.path + '.events', 'w', newline='')
+        self.events = csv.writer(self.events_file)
+        self.events.writerow(EVENT_FIELDS)
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name='emg-recorder', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        self.thread.join()
+        self.data_file.close()
+        self.events_file.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def write(self, block):
+        # block: raw (samples, channels) ADC values, before any filtering.
+        # Returns the sample offset of its first row in the recording.
+        first = self.samples_received
+        if len(block):
+            self.samples_received += len(block)
+            self.pending.append(('samples', block))
+        return first
+
+    def add_event(self, kind, sample, channel=None, action=''):
+        # kind: 'burst', 'command', ...; sample: offset from write()
+        self.pending.append(('event', (sample, kind, '' if channel is None else channel, action, time.time())))
+
+    def run(self):
+        chunk = np.empty((self.chunk_samples, self.num_channels), dtype=SAMPLE_DTYPE)
+        filled = 0
+        last_flush = time.monotonic()
+        while True:
+            stopping = not self.running
+            self.max_backlog = max(self.max_backlog, len(self.pending))
+            while self.pending:
+                kind, payload = self.pending.popleft()
+                if kind == 'event':
+                    self.events.writerow(payload)
+                    self.events_written += 1
+                    continue
+                block = np.clip(np.rint(payload), -32768, 32767)
+                pos = 0
+                while pos < len(block):
+                    take = min(self.chunk_samples - filled, len(block) - pos)
+                    chunk[filled:filled + take] = block[pos:pos + take]
+                    filled += take
+                    pos += take
+                    if filled == self.chunk_samples:
+                        self._write_chunk(chunk, filled)
+                        filled = 0
+                        last_flush = time.monotonic()
+            if stopping:
+                break
+            if time.monotonic() - last_flush >= self.flush_interval:
+                self._write_chunk(chunk, filled)
+                filled = 0
+                last_flush = time.monotonic()
+            time.sleep(self.poll_interval)
+        self._write_chunk(chunk, filled)
+
+    def _write_chunk(self, chunk, filled):
+        if filled:
+            self.data_file.write(chunk[:filled].tobytes())
+            self.samples_written += filled
+        self.data_file.flush()
+        self.events_file.flush()
+
+    def stats(self):
+        return {
+            'path': self.path,
+            'samples_received': self.samples_received,
+            'samples_written': self.samples_written,
+            'events_written': self.events_written,
+            'max_backlog': self.max_backlog,
+        }
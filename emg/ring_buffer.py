@@ -0,0 +1,57 @@
+import numpy as np
+
+
+class RingBuffer:
+    # Fixed-size multi-channel history for the scrolling plots.
+    # Every sample is written twice, at `head` and `head + capacity`, so the
+    # newest `capacity` samples are always one contiguous slice: view() costs
+    # nothing and append() is O(channels) instead of an np.roll per channel.
+
+    def __init__(self, num_channels, capacity, dtype=np.float64):
+        self.num_channels = num_channels
+        self.capacity = capacity
+        self.buffer = np.zeros((num_channels, 2 * capacity), dtype=dtype)
+        self.head = 0            # index of the oldest sample in the window
+        self.total_written = 0
+
+    def append(self, sample):
+        # sample: one value per channel
+        self.buffer[:, self.head] = sample
+        self.buffer[:, self.head + self.capacity] = sample
+        self.head = (self.head + 1) % self.capacity
+        self.total_written += 1
+
+    def extend(self, block):
+        # block: (samples, channels), newest last
+        block = np.asarray(block)
+        n = len(block)
+        if n == 0:
+            return
+        if n >= self.capacity:
+            block = block[-self.capacity:]
+            self.head = 0
+            self.buffer[:, :self.capacity] = block.T
+            self.buffer[:, self.capacity:] = block.T
+            self.total_written += n
+            return
+        # At most two contiguous runs per copy of the window
+        first = min(n, self.capacity - self.head)
+        for offset in (0, self.capacity):
+            start = self.head + offset
+            self.buffer[:, start:start + first] = block[:first].T
+        rest = n - first
+        if rest:
+            self.buffer[:, :rest] = block[first:].T
+            self.buffer[:, self.capacity:self.capacity + rest] = block[first:].T
+        self.head = (self.head + n) % self.capacity
+        self.total_written += n
+
+    def view(self):
+        # (channels, capacity), oldest -> newest. This is a live view into the
+        # buffer: copy it if it has to survive the next append/extend.
+        return self.buffer[:, self.head:self.head + self.capacity]
+
+    def latest(self, n=1):
+        # Most recent n samples as (channels, n)
+        end = self.head + self.capacity
+        return self.buffer[:, end - n:end]
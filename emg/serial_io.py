@@ -0,0 +1,138 @@
+import warnings
+
+import numpy as np
+
+from .framing import BinaryFrameDecoder
+
+
+class LineBlockParser:
+    # Turns raw bytes from the board ("v0,v1,...\r\n" per sample) into a
+    # (samples x channels) NumPy block. A partial line at the end of a read is
+    # kept and completed by the next feed().
+
+    def __init__(self, num_channels, dtype=np.float32):
+        self.num_channels = num_channels
+        self.dtype = dtype
+        self.pending = b''
+        self.lines_ok = 0
+        self.lines_short = 0       # wrong number of fields (e.g. a line cut by a reset)
+        self.lines_malformed = 0   # right field count but not numbers
+
+    def feed(self, data):
+        buf = self.pending + data
+        cut = buf.rfind(b'\n')
+        if cut < 0:
+            self.pending = buf
+            return self.empty_block()
+        self.pending = buf[cut + 1:]
+
+        body = buf[:cut].replace(b'\r', b'')
+        # Count commas per line on the raw bytes instead of splitting in Python
+        raw = np.frombuffer(body, dtype=np.uint8)
+        line_ends = np.append(np.flatnonzero(raw == 10), len(raw))
+        line_starts = np.append(0, line_ends[:-1] + 1)
+        commas = np.bincount(np.searchsorted(line_ends, np.flatnonzero(raw == 44)),
+                             minlength=len(line_ends))
+        good = commas == self.num_channels - 1
+        blank = line_ends == line_starts
+        # blank lines are just line-ending noise, not dropped samples
+        self.lines_short += int(np.count_nonzero(~good & ~blank))
+        count = int(np.count_nonzero(good))
+        if count == 0:
+            return self.empty_block()
+
+        # Fast path: parse every complete line in a single C call
+        if count == len(good):
+            text = body.replace(b'\n', b',')
+        else:
+            text = b','.join(body[a:b] for a, b in zip(line_starts[good], line_ends[good]))
+        values = self._parse(text)
+        if values is not None and values.size == count * self.num_channels:
+            self.lines_ok += count
+            return values.reshape(-1, self.num_channels).astype(self.dtype, copy=False)
+
+        # Something in the batch is corrupted; find it line by line
+        rows = []
+        for a, b in zip(line_starts[good], line_ends[good]):
+            row = self._parse(body[a:b])
+            if row is None or row.size != self.num_channels:
+                self.lines_malformed += 1
+            else:
+                rows.append(row)
+        self.lines_ok += len(rows)
+        if not rows:
+            return self.empty_block()
+        return np.vstack(rows).astype(self.dtype, copy=False)
+
+    def _parse(self, text):
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', DeprecationWarning)
+            try:
+                return np.fromstring(text, dtype=np.float64, sep=',')
+            except (ValueError, DeprecationWarning):
+                return None
+
+    def empty_block(self):
+        return np.empty((0, self.num_channels), dtype=self.dtype)
+
+    def stats(self):
+        return {
+            'lines_ok': self.lines_ok,
+            'lines_short': self.lines_short,
+            'lines_malformed': self.lines_malformed,
+        }
+
+
+class SerialBlockReader:
+    # Drains everything waiting on a pyserial port in one read and returns the
+    # parsed samples as a block instead of one readline() per sample.
+    # protocol must match the firmware: 'ascii' lines or 'binary' frames.
+
+    def __init__(self, ser, num_channels, dtype=np.float32, protocol='ascii', tracer=None):
+        self.ser = ser
+        if protocol == 'ascii':
+            self.parser = LineBlockParser(num_channels, dtype)
+        elif protocol == 'binary':
+            self.parser = BinaryFrameDecoder(num_channels, dtype)
+        else:
+            raise ValueError(f"unknown serial protocol {protocol!r} (use 'ascii' or 'binary')")
+        self.bytes_read = 0
+        self.tracer = tracer   # LatencyTracer or None; start() is stamped when bytes arrive
+
+    def read_block(self, wait=True):
+        # wait=True blocks for up to the port timeout when nothing is buffered
+        # (reader threads); wait=False returns an empty block at once (GUI timers).
+        tracer = self.tracer
+        waiting = self.ser.in_waiting
+        if waiting:
+            if tracer:
+                tracer.start()
+            data = self.ser.read(waiting)
+            if tracer:
+                tracer.mark('read')
+        elif wait:
+            # Idle wait for the next byte is not latency; the clock starts when
+            # it arrives, and 'read' covers taking the rest of what is buffered
+            data = self.ser.read(1)
+            if data:
+                if tracer:
+                    tracer.start()
+                waiting = self.ser.in_waiting
+                if waiting:
+                    data += self.ser.read(waiting)
+                if tracer:
+                    tracer.mark('read')
+        else:
+            data = b''
+        if not data:
+            return self.parser.empty_block()
+        self.bytes_read += len(data)
+        block = self.parser.feed(data)
+        if tracer:
+            tracer.mark('parse')
+        return block
+
+    def stats(self):
+        stats = self.parser.stats()
+        stats['bytes_read'] = self.bytes_read
+        return stats
@@ -0,0 +1,214 @@
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Single-producer / single-consumer sample ring in multiprocessing shared
+# memory, for handing blocks between processes without pickling.
+#
+# One SharedMemory segment holds
+#   header  int64 counters (HEADER_FIELDS)
+#   stamps  (capacity, 2) int64: each row's sequence number and a timestamp
+#   data    (capacity, channels) samples, row-major so a block is contiguous
+#
+# write_seq and read_seq count samples since the start; the writer publishes
+# rows by advancing write_seq after they are stored, the reader frees them by
+# advancing read_seq. Every row also carries its own sequence number, so a
+# reader that copied a slot while the writer was overwriting it (overwrite
+# policy) sees the mismatch and drops that row instead of returning a mix
+# of two samples.
+#
+# Ordering: the writer stores a row's stamp, then its data, then write_seq;
+# the reader loads write_seq, copies data, then stamps, then loads write_seq
+# again. numpy issues these as plain stores and loads with no fences, so
+# this relies on the CPU keeping them in program order, which x86 (TSO)
+# does. On weakly ordered CPUs (ARM) a torn row can still pass the check;
+# the second write_seq load drops rows a published write overtook, not
+# those of a write still in flight.
+#
+# What the writer does when the reader is behind (policy):
+#   'overwrite' - write anyway, the reader skips ahead and counts an overrun
+#                 (display feeds: stale samples are worthless)
+#   'drop'      - discard the new block and count it (the writer never waits)
+#   'block'     - wait up to block_timeout for room, then drop and count
+#                 (lossless hand-off as long as the reader keeps up on average)
+# A block larger than the whole ring keeps its newest rows under 'overwrite'
+# (the rest count as overruns); 'drop' and 'block' write it in ring-sized
+# pieces, each taken or dropped on its own.
+
+HEADER_FIELDS = ('write_seq', 'read_seq', 'dropped', 'overruns', 'torn', 'blocked_ns', 'closed', 'reserved')
+POLICIES = ('overwrite', 'drop', 'block')
+_HEADER_BYTES = 8 * len(HEADER_FIELDS)
+_SEQ, _READ, _DROPPED, _OVERRUNS, _TORN, _BLOCKED, _CLOSED = range(7)
+
+
+def _attach(name):
+    # Only the creating process should unlink. Python < 3.13 has no track=False,
+    # but multiprocessing children share the parent's resource tracker, which
+    # then sees the same segment registered twice and unlinks it once.
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+class SharedRingBuffer:
+    def __init__(self, num_channels, capacity, policy='overwrite', dtype=np.float32, name=None,
+                 block_timeout=0.1, poll_interval=0.0002):
+        # name=None creates a new segment; otherwise attaches to an existing
+        # one (use attach(spec) from the other process).
+        if policy not in POLICIES:
+            raise ValueError(f"unknown policy {policy!r}, expected one of {POLICIES}")
+        self.num_channels = num_channels
+        self.capacity = capacity
+        self.policy = policy
+        self.dtype = np.dtype(dtype)
+        self.block_timeout = block_timeout
+        self.poll_interval = poll_interval
+
+        stamp_bytes = capacity * 2 * 8
+        size = _HEADER_BYTES + stamp_bytes + capacity * num_channels * self.dtype.itemsize
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(create=True, size=size) if self.owner else _attach(name)
+        self.name = self.shm.name
+        self.header = np.ndarray((len(HEADER_FIELDS),), dtype=np.int64, buffer=self.shm.buf)
+        self.stamps = np.ndarray((capacity, 2), dtype=np.int64, buffer=self.shm.buf, offset=_HEADER_BYTES)
+        self.data = np.ndarray((capacity, num_channels), dtype=self.dtype, buffer=self.shm.buf,
+                               offset=_HEADER_BYTES + stamp_bytes)
+        if self.owner:
+            self.header[:] = 0
+            self.stamps[:, 0] = -1
+
+    def spec(self):
+        # Picklable description for attach() in another process
+        return {'name': self.name, 'num_channels': self.num_channels, 'capacity': self.capacity,
+                'policy': self.policy, 'dtype': self.dtype.str, 'block_timeout': self.block_timeout}
+
+    @classmethod
+    def attach(cls, spec):
+        return cls(spec['num_channels'], spec['capacity'], spec['policy'], spec['dtype'], name=spec['name'],
+                   block_timeout=spec['block_timeout'])
+
+    # -- producer --
+
+    def write(self, block, stamp=0):
+        # block: (samples, channels); stamp: e.g. perf_counter_ns when its bytes
+        # arrived, stored with every row. Returns the rows written (0 if dropped).
+        n = len(block)
+        if n == 0:
+            return 0
+        header = self.header
+        if n > self.capacity:
+            if self.policy != 'overwrite':
+                return sum(self.write(block[k:k + self.capacity], stamp) for k in range(0, n, self.capacity))
+            header[_OVERRUNS] += n - self.capacity
+            block = block[-self.capacity:]
+            n = self.capacity
+
+        seq = int(header[_SEQ])
+        if self.policy != 'overwrite' and seq + n - header[_READ] > self.capacity:
+            if self.policy == 'block' and self._wait_for_room(seq, n):
+                pass
+            else:
+                header[_DROPPED] += n
+                return 0
+
+        start = seq % self.capacity
+        first = min(n, self.capacity - start)
+        self.stamps[start:start + first, 0] = np.arange(seq, seq + first)
+        self.stamps[start:start + first, 1] = stamp
+        self.data[start:start + first] = block[:first]
+        if first < n:
+            self.stamps[:n - first, 0] = np.arange(seq + first, seq + n)
+            self.stamps[:n - first, 1] = stamp
+            self.data[:n - first] = block[first:]
+        header[_SEQ] = seq + n      # publish
+        return n
+
+    def _wait_for_room(self, seq, n):
+        start = time.perf_counter_ns()
+        deadline = start + self.block_timeout * 1e9
+        while seq + n - self.header[_READ] > self.capacity:
+            if self.header[_CLOSED] or time.perf_counter_ns() > deadline:
+                self.header[_BLOCKED] += time.perf_counter_ns() - start
+                return False
+            time.sleep(self.poll_interval)
+        self.header[_BLOCKED] += time.perf_counter_ns() - start
+        return True
+
+    def close_writer(self):
+        # Tells the reader (and a blocked writer) that no more data is coming
+        self.header[_CLOSED] = 1
+
+    # -- consumer --
+
+    def read(self, max_samples=None):
+        # Returns (first_seq, data, stamps) for the rows not read yet, oldest
+        # first, or None when there are none. data is a copy.
+        header = self.header
+        seq = int(header[_SEQ])
+        pos = int(header[_READ])
+        if seq == pos:
+            return None
+        if seq - pos > self.capacity:
+            # Lapped by the writer (overwrite policy): skip to the oldest row still there
+            header[_OVERRUNS] += seq - pos - self.capacity
+            pos = seq - self.capacity
+        n = seq - pos if max_samples is None else min(seq - pos, max_samples)
+
+        start = pos % self.capacity
+        first = min(n, self.capacity - start)
+        if first == n:
+            data = self.data[start:start + n].copy()
+            stamps = self.stamps[start:start + n].copy()
+        else:
+            data = np.concatenate((self.data[start:], self.data[:n - first]))
+            stamps = np.concatenate((self.stamps[start:], self.stamps[:n - first]))
+
+        # A row is good if it still carries its own sequence number and no
+        # write published since (write_seq read again) can have reached it.
+        # The writer overwrites oldest first, so bad rows lead: drop them,
+        # then stop at the first bad row after that and leave the rest for
+        # the next read
+        expected = np.arange(pos, pos + n)
+        valid = (stamps[:, 0] == expected) & (expected >= int(header[_SEQ]) - self.capacity)
+        if not valid.all():
+            good = np.flatnonzero(valid)
+            drop = int(good[0]) if len(good) else n
+            bad = np.flatnonzero(~valid[drop:])
+            keep = int(bad[0]) if len(bad) else n - drop
+            header[_TORN] += drop
+            data, stamps = data[drop:drop + keep], stamps[drop:drop + keep]
+            pos, n = pos + drop, keep
+        header[_READ] = pos + n
+        if n == 0:
+            return None
+        return pos, data, stamps[:, 1]
+
+    def wait_read(self, timeout, max_samples=None):
+        # read(), polling every poll_interval for up to timeout seconds
+        deadline = time.perf_counter() + timeout
+        while True:
+            item = self.read(max_samples)
+            if item is not None or time.perf_counter() >= deadline:
+                return item
+            time.sleep(self.poll_interval)
+
+    @property
+    def closed(self):
+        return bool(self.header[_CLOSED])
+
+    def pending(self):
+        return int(self.header[_SEQ] - self.header[_READ])
+
+    def stats(self):
+        stats = {field: int(self.header[i]) for i, field in enumerate(HEADER_FIELDS[:_CLOSED])}
+        stats['policy'] = self.policy
+        return stats
+
+    def close(self):
+        # Every process closes its mapping; the creating one also unlinks it
+        self.header = self.stamps = self.data = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
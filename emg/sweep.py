@@ -0,0 +1,244 @@
+import argparse
+import csv
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.signal import lfilter
+
+from .detection import SuppressionGraph
+from .filters import NotchFilterBank
+from .virtual_board import load_recording
+
+# Offline replay of the live decision logic (notch -> threshold -> cooldown ->
+# priority suppression) over whole recordings, for tuning thresholds without
+# the board. Time is the sample index, so a 30 s file takes milliseconds per
+# parameter set instead of 30 s, and results do not depend on USB timing.
+# The live detector runs on the same sample clock, so a tuned setting makes
+# the same decisions on the board.
+
+
+def notch_recording(samples, sampling_rate=1000):
+    # Same filter and steady-state start as the live NotchFilterBank
+    bank = NotchFilterBank(samples.shape[1], sampling_rate)
+    bank.reset(samples[0])
+    filtered, _ = lfilter(bank.b, bank.a, samples, axis=0, zi=bank.zi)
+    return filtered
+
+
+def _dependency_order(num_channels, dominants):
+    # Dominant channels must be resolved before the channels they suppress
+    order, done = [], set()
+
+    def visit(channel, path):
+        if channel in done:
+            return
+        if channel in path:
+            raise ValueError(f"priority rules form a cycle through channel {channel}")
+        for dominant in dominants.get(channel, ()):
+            visit(dominant, path | {channel})
+        done.add(channel)
+        order.append(channel)
+
+    for channel in range(num_channels):
+        visit(channel, set())
+    return order
+
+
+def detect_events(filtered, thresholds, cooldown_time, priority_window, priority=None,
+                  same_sample_priority=False, sampling_rate=1000):
+    # Event sample indices per channel, matching BurstDetector (which counts
+    # its windows in samples too) run over the same recording.
+    #
+    # Only the candidates (samples above threshold) are visited, and cooldown
+    # and suppression windows are skipped with searchsorted, so the cost is per
+    # event rather than per sample. Only the dominant's most recent event can
+    # be within the window, which is why the 2 s history pruning drops out.
+    # Cooldown and window edges are compared in whole samples. With
+    # same_sample_priority a dominant that is merely triggered on the sample
+    # (over threshold and out of cooldown, but itself suppressed) also
+    # suppresses it, as in BurstDetector.
+    #
+    # priority: a SuppressionGraph or its rules dict, a channel mapping to one
+    # dominant or a list of them; a channel is suppressed by any of its
+    # dominants' events.
+    num_channels = filtered.shape[1]
+    if not isinstance(priority, SuppressionGraph):
+        priority = SuppressionGraph(num_channels, priority)
+    dominants = priority.rules
+    cooldown = cooldown_time * sampling_rate
+    window = priority_window * sampling_rate
+    events = [None] * num_channels
+
+    for i in _dependency_order(num_channels, dominants):
+        candidates = np.flatnonzero(filtered[:, i] > thresholds[i])
+        # Does a dominant event on this very sample count? In the single-pass
+        # loop only if the dominant channel is handled first.
+        checks = [(d, events[d], 'right' if (same_sample_priority or d < i) else 'left')
+                  for d in dominants.get(i, ())]
+
+        fired = []
+        last = None
+        pos = 0
+        while pos < len(candidates):
+            c = candidates[pos]
+            if last is not None and c - last <= cooldown:
+                pos = np.searchsorted(candidates, last + cooldown, side='right')
+                continue
+            # Skip past the latest window end among the dominants covering c
+            until = None
+            triggered = False
+            for d, dominant_events, same_side in checks:
+                k = np.searchsorted(dominant_events, c, side=same_side) - 1
+                if k >= 0 and c - dominant_events[k] <= window:
+                    until = max(until or 0, dominant_events[k] + window)
+                elif same_sample_priority and filtered[c, d] > thresholds[d]:
+                    # A suppressed dominant leaves no event but still blocks this sample
+                    k = np.searchsorted(dominant_events, c, side='right') - 1
+                    triggered = triggered or k < 0 or c - dominant_events[k] > cooldown
+            if until is not None:
+                pos = np.searchsorted(candidates, until, side='right')
+                continue
+            if triggered:
+                pos += 1
+                continue
+            fired.append(c)
+            last = c
+            pos += 1
+        events[i] = np.array(fired, dtype=np.int64)
+    return events
+
+
+def load_labels(csv_path):
+    # Labeled bursts as rows of: channel,start,end (seconds)
+    labels = []
+    with open(csv_path) as f:
+        for row in csv.DictReader(f):
+            labels.append((int(row['channel']), float(row['start']), float(row['end'])))
+    return labels
+
+
+def score_channel(event_times, bursts, tolerance=0.1):
+    # A burst is hit if any event lands inside it (+- tolerance); events
+    # outside every labeled burst are false positives.
+    if not bursts:
+        return 0, len(event_times), 0
+    starts = np.array([b[0] for b in bursts]) - tolerance
+    ends = np.array([b[1] for b in bursts]) + tolerance
+    idx = np.searchsorted(starts, event_times, side='right') - 1
+    inside = (idx >= 0) & (event_times <= ends[np.maximum(idx, 0)])
+    hit = np.unique(idx[inside])
+    return len(hit), int(np.count_nonzero(~inside)), len(bursts) - len(hit)
+
+
+def evaluate(filtered, params, labels=None, sampling_rate=1000, priority=None, same_sample_priority=False):
+    thresholds, cooldown_time, priority_window = params
+    events = detect_events(filtered, thresholds, cooldown_time, priority_window, priority,
+                           same_sample_priority, sampling_rate)
+    minutes = len(filtered) / sampling_rate / 60
+    rows = []
+    for i, channel_events in enumerate(events):
+        row = {
+            'channel': i,
+            'threshold': thresholds[i],
+            'cooldown_time': cooldown_time,
+            'priority_window': priority_window,
+            'triggers': len(channel_events),
+        }
+        if labels is not None:
+            bursts = sorted((s, e) for ch, s, e in labels if ch == i)
+            tp, fp, fn = score_channel(channel_events / sampling_rate, bursts)
+            row.update({
+                'hits': tp,
+                'false_positives': fp,
+                'missed': fn,
+                'tpr': tp / (tp + fn) if tp + fn else float('nan'),
+                'fp_per_min': fp / minutes,
+            })
+        rows.append(row)
+    return rows
+
+
+# Worker state for the process pool: the filtered recording is sent once per
+# worker instead of once per parameter set
+_worker = {}
+
+
+def _init_worker(filtered, labels, sampling_rate, priority, same_sample_priority):
+    _worker.update(filtered=filtered, labels=labels, sampling_rate=sampling_rate,
+                   priority=priority, same_sample_priority=same_sample_priority)
+
+
+def _evaluate_chunk(chunk):
+    rows = []
+    for params in chunk:
+        rows.extend(evaluate(_worker['filtered'], params, _worker['labels'], _worker['sampling_rate'],
+                             _worker['priority'], _worker['same_sample_priority']))
+    return rows
+
+
+def parameter_grid(threshold_options, cooldown_times, priority_windows):
+    # threshold_options: one list of candidate thresholds per channel
+    for thresholds in itertools.product(*threshold_options):
+        for cooldown_time in cooldown_times:
+            for priority_window in priority_windows:
+                yield list(thresholds), cooldown_time, priority_window
+
+
+def sweep(filtered, grid, labels=None, sampling_rate=1000, priority=None,
+          same_sample_priority=False, workers=None, chunk_size=64):
+    grid = list(grid)
+    chunks = [grid[k:k + chunk_size] for k in range(0, len(grid), chunk_size)]
+    init_args = (filtered, labels, sampling_rate, priority, same_sample_priority)
+    if workers == 1:
+        _init_worker(*init_args)
+        return [row for chunk in chunks for row in _evaluate_chunk(chunk)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args) as pool:
+        return [row for rows in pool.map(_evaluate_chunk, chunks) for row in rows]
+
+
+def write_rows(rows, csv_path):
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def _float_list(text):
+    return [float(v) for v in text.split(',')]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Sweep detector parameters over a recording")
+    parser.add_argument('csv_path')
+    parser.add_argument('--thresholds', type=_float_list, action='append', required=True,
+                        help="candidate thresholds for one channel, repeat once per channel (e.g. 600,650,700)")
+    parser.add_argument('--cooldown', type=_float_list, default=[0.8])
+    parser.add_argument('--priority-window', type=_float_list, default=[1.0])
+    parser.add_argument('--priority', default='0:2,1:3',
+                        help="suppressed:dominant pairs, repeat a channel for several dominants (0:2,0:4)")
+    parser.add_argument('--labels', help="CSV of labeled bursts: channel,start,end")
+    parser.add_argument('--fs', type=float, default=1000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--out', default='sweep_results.csv')
+    args = parser.parse_args()
+
+    samples = load_recording(args.csv_path)
+    if len(args.thresholds) != samples.shape[1]:
+        parser.error(f"{samples.shape[1]} channels in the file but {len(args.thresholds)} --thresholds given")
+    priority = {}
+    for pair in filter(None, args.priority.split(',')):
+        suppressed, dominant = map(int, pair.split(':'))
+        priority.setdefault(suppressed, []).append(dominant)
+    labels = load_labels(args.labels) if args.labels else None
+
+    start = time.perf_counter()
+    filtered = notch_recording(samples, args.fs)
+    grid = list(parameter_grid(args.thresholds, args.cooldown, args.priority_window))
+    rows = sweep(filtered, grid, labels, args.fs, priority, workers=args.workers)
+    elapsed = time.perf_counter() - start
+    write_rows(rows, args.out)
+    print(f"✅ {len(grid)} parameter sets in {elapsed:.2f}s "
+          f"({elapsed / len(grid) * 1000:.2f} ms each) -> {os.path.abspath(args.out)}")
@@ -0,0 +1,95 @@
+from collections import deque
+
+import numpy as np
+
+# Host time for every sample, from the sample index instead of time.time()
+# at parse. The board samples on its own crystal; USB delivers the samples
+# late and in bursts, never early. So per bucket of samples, the one that
+# arrived earliest relative to the nominal rate is the best view of the
+# device clock. A line fitted through those points over the last `window`
+# seconds, then lowered onto the earliest of them, gives
+#
+#   host_time(index) = offset + index / rate
+#
+# rate is the device's sample rate in host seconds. drift_ppm compares it
+# with the nominal rate (crystal error plus host clock error). lateness is
+# how long after its fitted time each read arrived (the jitter taken out).
+#
+#   clock = SampleClock(1000)
+#   clock.update(len(block), time.time())      # per read, last sample's arrival
+#   now = clock.latest()
+
+
+class SampleClock:
+    def __init__(self, sampling_rate=1000, window=30.0, bucket=0.5, lateness_history=1000):
+        self.sampling_rate = sampling_rate            # nominal
+        self.window = window
+        self.lateness_history = lateness_history
+        self.bucket_seconds = bucket
+        self.bucket = max(1, int(bucket * sampling_rate))
+        self.points = deque(maxlen=max(2, int(window / bucket)))   # (index, arrival) lower-envelope points
+        self.lateness = deque(maxlen=lateness_history)
+        self.samples = 0
+        self.rate = float(sampling_rate)
+        self.offset = None
+        self.fits = 0
+        self._bucket_end = self.bucket
+        self._best = None                              # (residual, index, arrival) in the open bucket
+
+    def reset(self):
+        self.__init__(self.sampling_rate, self.window, self.bucket_seconds, self.lateness_history)
+
+    def update(self, count, arrival):
+        # count new samples, the last of them read at host time `arrival`
+        if count <= 0:
+            return
+        self.samples += count
+        index = self.samples - 1
+        residual = arrival - index / self.sampling_rate
+        if self._best is None or residual < self._best[0]:
+            self._best = (residual, index, arrival)
+        if self.offset is None:
+            self.offset = arrival - index / self.rate
+        if index + 1 >= self._bucket_end:
+            self.points.append(self._best[1:])
+            self._best = None
+            self._bucket_end = index + 1 + self.bucket
+            self._fit()
+        self.lateness.append(arrival - self.host_time(index))
+
+    def _fit(self):
+        index, arrival = np.array(self.points).T
+        if len(index) >= 4 and index[-1] > index[0]:
+            slope = np.polyfit(index - index[0], arrival - arrival[0], 1)[0]
+            if slope > 0:
+                self.rate = float(1.0 / slope)
+        self.offset = float(np.min(arrival - index / self.rate))
+        self.fits += 1
+
+    def host_time(self, index):
+        # Fitted host time of sample `index` (scalar or array)
+        return self.offset + np.asarray(index) / self.rate
+
+    def latest(self):
+        # Fitted host time of the newest sample
+        return self.host_time(self.samples - 1)
+
+    def index_at(self, host_time):
+        # Sample index taken at `host_time` (fractional)
+        return (host_time - self.offset) * self.rate
+
+    @property
+    def drift_ppm(self):
+        # Device rate against nominal in host time, parts per million
+        return (self.rate / self.sampling_rate - 1.0) * 1e6
+
+    def stats(self):
+        lateness = np.array(self.lateness) * 1000 if self.lateness else np.zeros(1)
+        return {
+            'samples': self.samples,
+            'rate': round(float(self.rate), 3),
+            'drift_ppm': round(float(self.drift_ppm), 1),
+            'lateness_ms_p50': round(float(np.percentile(lateness, 50)), 2),
+            'lateness_ms_p99': round(float(np.percentile(lateness, 99)), 2),
+            'fits': self.fits,
+        }
@@ -0,0 +1,110 @@
+import threading
+import time
+from bisect import bisect_right
+
+# Per-stage latency histograms for the acquisition hot path.
+#
+# The instrumented code keeps `tracer = None` when tracing is off and guards
+# every stamp with `if tracer:`, so a disabled build pays one None check per
+# stage and never calls perf_counter_ns. When on, each stamp is one
+# perf_counter_ns, a bisect and an integer increment into a preallocated
+# bucket list; nothing grows with the number of samples.
+#
+#   tracer.start()          block arrived (bytes came off the port)
+#   tracer.mark('parse')    time since the previous stamp goes to 'parse'
+#   tracer.mark_total()     time since start() goes to 'total'
+#
+# 'queued', 'write' and 'total' are recorded by CommandDispatcher on its own
+# thread when it shares the reader's tracer.
+
+STAGES = ('read', 'parse', 'filter', 'detect', 'emit', 'queued', 'write', 'total')
+
+
+class LatencyTracer:
+    def __init__(self, stages=STAGES, min_ns=100, max_ns=10_000_000_000, bins_per_decade=20):
+        # Log-spaced buckets: 20 per decade is ~12% resolution from 100 ns to 10 s
+        self.stages = tuple(stages)
+        decades = 0
+        while min_ns * 10 ** decades < max_ns:
+            decades += 1
+        self.edges = [int(min_ns * 10 ** (k / bins_per_decade)) for k in range(decades * bins_per_decade + 1)]
+        self.counts = {stage: [0] * (len(self.edges) + 1) for stage in self.stages}
+        self.max_ns = dict.fromkeys(self.stages, 0)
+        self.block_start = 0
+        self.last = 0
+        self._reporter = None
+        self._stop_reporting = threading.Event()
+
+    def start(self):
+        self.block_start = self.last = time.perf_counter_ns()
+
+    def mark(self, stage):
+        now = time.perf_counter_ns()
+        self.record(stage, now - self.last)
+        self.last = now
+
+    def mark_total(self, stage='total'):
+        self.record(stage, time.perf_counter_ns() - self.block_start)
+
+    def record(self, stage, elapsed_ns):
+        self.counts[stage][bisect_right(self.edges, elapsed_ns)] += 1
+        if elapsed_ns > self.max_ns[stage]:
+            self.max_ns[stage] = elapsed_ns
+
+    def reset(self):
+        for stage in self.stages:
+            self.counts[stage] = [0] * (len(self.edges) + 1)
+            self.max_ns[stage] = 0
+
+    def percentile(self, stage, q):
+        # Upper edge of the bucket holding the q-th percentile (capped at the
+        # largest value seen), in ns; None if the stage has no data
+        counts = self.counts[stage]
+        total = sum(counts)
+        if total == 0:
+            return None
+        target = q / 100 * total
+        seen = 0
+        for index, count in enumerate(counts):
+            seen += count
+            if seen >= target and count:
+                edge = self.edges[index] if index < len(self.edges) else self.max_ns[stage]
+                return min(edge, self.max_ns[stage])
+        return self.max_ns[stage]
+
+    def summary(self):
+        # {stage: {count, p50_us, p95_us, p99_us, max_us}} for stages that saw data
+        result = {}
+        for stage in self.stages:
+            count = sum(self.counts[stage])
+            if count == 0:
+                continue
+            result[stage] = {'count': count}
+            for q in (50, 95, 99):
+                result[stage][f'p{q}_us'] = self.percentile(stage, q) / 1000
+            result[stage]['max_us'] = self.max_ns[stage] / 1000
+        return result
+
+    def format_summary(self):
+        lines = [f"{'stage':<8} {'count':>9} {'p50 us':>10} {'p95 us':>10} {'p99 us':>10} {'max us':>10}"]
+        for stage, s in self.summary().items():
+            lines.append(f"{stage:<8} {s['count']:>9} {s['p50_us']:>10.1f} {s['p95_us']:>10.1f} "
+                         f"{s['p99_us']:>10.1f} {s['max_us']:>10.1f}")
+        return '\n'.join(lines)
+
+    def start_reporting(self, interval=5.0, output=print):
+        # Print the summary every `interval` seconds from a background thread
+        self._stop_reporting.clear()
+
+        def report():
+            while not self._stop_reporting.wait(interval):
+                output(f"⏱️ Latency\n{self.format_summary()}")
+
+        self._reporter = threading.Thread(target=report, name='latency-report', daemon=True)
+        self._reporter.start()
+
+    def stop_reporting(self):
+        self._stop_reporting.set()
+        if self._reporter is not None:
+            self._reporter.join(timeout=1.0)
+            self._reporter = None
@@ -0,0 +1,217 @@
+import argparse
+import os
+import select
+import threading
+import time
+import tty
+
+import numpy as np
+
+from .firmware import FirmwareEmulator
+from .framing import encode_frames
+from .recorder import open_session
+
+# Stand-in for the Arduino on a pseudo-terminal (Linux/macOS). It streams a
+# recording in the firmware's wire format and logs every command byte the host
+# writes back, so the viewers, SerialReaderThread and AcquisitionEngine can be
+# pointed at board.port instead of /dev/cu.usbserial-2120.
+#
+#   with VirtualBoard('test/simulated_30s_6channel_emg.csv', speed=10) as board:
+#       engine = AcquisitionEngine(board.port, 115200, 6, detector)
+
+COMMAND_BYTES = b'LRFBGOZ'
+
+
+def load_recording(csv_path):
+    # Numeric columns of a recording; a leading 'time' column is dropped.
+    # Session recordings (.emgrec) are read through emg.recorder.
+    if csv_path.endswith('.emgrec'):
+        return np.asarray(open_session(csv_path)[1], dtype=float)
+    with open(csv_path) as f:
+        header = f.readline().strip().split(',')
+    data = np.loadtxt(csv_path, delimiter=',', skiprows=1, ndmin=2)
+    if header and header[0].strip().lower() == 'time':
+        data = data[:, 1:]
+    return data
+
+
+class VirtualBoard:
+    def __init__(self, source, sampling_rate=1000, speed=1.0, protocol='ascii',
+                 loop=False, scale=1.0, offset=0.0, chunk_seconds=0.01, boot_delay=0.1, firmware=None):
+        # source: CSV path or (samples, channels) array of ADC values.
+        # speed: 1.0 real time, 10.0 ten times faster, None as fast as the host reads.
+        # firmware: optional FirmwareEmulator that receives the command bytes and
+        # decides which rows go out (the old sketch sends none during delay(500)).
+        samples = load_recording(source) if isinstance(source, str) else np.asarray(source, dtype=float)
+        self.samples = np.clip(np.rint(samples * scale + offset), 0, 1023).astype(np.int64)
+        self.num_samples, self.num_channels = self.samples.shape
+        self.sampling_rate = sampling_rate
+        self.speed = speed
+        self.protocol = protocol
+        self.loop = loop
+        self.chunk = max(1, int(sampling_rate * chunk_seconds))
+        # pyserial flushes the input buffer right after open(), like the real
+        # board resetting, so wait a moment after the host connects
+        self.boot_delay = boot_delay
+
+        self.commands = []        # (host time, sample index when received, command char)
+        self.other_bytes = 0      # newlines and anything that is not a command
+        self.samples_sent = 0
+        self.samples_skipped = 0  # rows the emulated firmware did not send
+        self.command_listeners = []
+        self.firmware = firmware
+        self.firmware_lock = threading.Lock()
+
+        self.master_fd = None
+        self.poller = None
+        self.port = None
+        self.finished = False
+        self.running = False
+        self.threads = []
+
+    def add_command_listener(self, callback):
+        # callback(command_char, sample_index), called on the board's reader thread
+        self.command_listeners.append(callback)
+
+    def start(self):
+        self.master_fd, slave_fd = os.openpty()
+        tty.setraw(slave_fd)    # no echo, no newline translation
+        self.port = os.ttyname(slave_fd)
+        # Only the host keeps the slave side open, so POLLHUP on the master
+        # tells us whether anyone is connected
+        os.close(slave_fd)
+        self.poller = select.poll()
+        self.poller.register(self.master_fd, select.POLLIN)
+        self.running = True
+        self.threads = [
+            threading.Thread(target=self._stream, name='virtual-board-tx', daemon=True),
+            threading.Thread(target=self._listen, name='virtual-board-rx', daemon=True),
+        ]
+        for thread in self.threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        for thread in self.threads:
+            thread.join(timeout=1.0)
+        if self.master_fd is not None:
+            os.close(self.master_fd)
+            self.master_fd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def encode(self, block, first_index):
+        if self.protocol == 'binary':
+            return encode_frames(block, first_seq=first_index)
+        return b''.join((','.join(map(str, row)) + '\r\n').encode() for row in block.tolist())
+
+    def host_connected(self):
+        return not any(event & select.POLLHUP for _, event in self.poller.poll(0))
+
+    def _stream(self):
+        index = 0
+        while self.running:
+            if not self.host_connected():
+                time.sleep(0.01)
+                continue
+            time.sleep(self.boot_delay)
+            start = time.perf_counter()
+            position_at_start = self.samples_sent + self.samples_skipped
+
+            # Stream until the host disconnects; resume from the same spot if it reconnects
+            while self.running and self.host_connected():
+                if index >= self.num_samples:
+                    if not self.loop:
+                        self.finished = True
+                        return
+                    index = 0
+                block = self.samples[index:index + self.chunk]
+                next_index = index + len(block)
+                if self.firmware is not None:
+                    with self.firmware_lock:
+                        sent = [self.firmware.step() for _ in range(len(block))]
+                    self.samples_skipped += len(block) - sum(sent)
+                    block = block[sent]
+                if len(block) and not self._write_all(self.encode(block, self.samples_sent)):
+                    break
+                index = next_index
+                self.samples_sent += len(block)
+
+                if self.speed:
+                    position = self.samples_sent + self.samples_skipped
+                    due = start + (position - position_at_start) / (self.sampling_rate * self.speed)
+                    delay = due - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+
+    def _write_all(self, data):
+        view = memoryview(data)
+        while view and self.running:
+            # Wait for room in the pty so stop() is never stuck behind a full buffer
+            _, writable, _ = select.select([], [self.master_fd], [], 0.1)
+            if not writable:
+                continue
+            try:
+                written = os.write(self.master_fd, view)
+            except OSError:
+                return False
+            view = view[written:]
+        return not view
+
+    def _listen(self):
+        while self.running:
+            readable, _, _ = select.select([self.master_fd], [], [], 0.1)
+            if not readable:
+                continue
+            try:
+                data = os.read(self.master_fd, 256)
+            except OSError:
+                # EIO while no host has the port open
+                time.sleep(0.01)
+                continue
+            now = time.time()
+            if self.firmware is not None:
+                with self.firmware_lock:
+                    self.firmware.receive(data)
+            for byte in data:
+                if byte in COMMAND_BYTES:
+                    command = chr(byte)
+                    self.commands.append((now, self.samples_sent, command))
+                    for callback in self.command_listeners:
+                        callback(command, self.samples_sent)
+                else:
+                    self.other_bytes += 1
+
+    def command_string(self):
+        return ''.join(command for _, _, command in self.commands)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Replay a recording on a virtual serial port")
+    parser.add_argument('csv_path')
+    parser.add_argument('--speed', type=float, default=1.0, help="rate multiplier, 0 = as fast as possible")
+    parser.add_argument('--protocol', choices=['ascii', 'binary'], default='ascii')
+    parser.add_argument('--loop', action='store_true')
+    parser.add_argument('--firmware', choices=['none', 'blocking', 'millis'], default='none',
+                        help="emulate the sketch's servo timing: old delay(500) or the millis() loop")
+    args = parser.parse_args()
+
+    firmware = None if args.firmware == 'none' else FirmwareEmulator(blocking=args.firmware == 'blocking')
+    board = VirtualBoard(args.csv_path, speed=args.speed or None, protocol=args.protocol, loop=args.loop,
+                         firmware=firmware)
+    board.add_command_listener(lambda command, index: print(f"📥 Command {command} at sample {index}"))
+    with board:
+        print(f"✅ Virtual board on {board.port} ({board.num_channels} channels, speed {args.speed or 'max'})")
+        try:
+            while not board.finished:
+                time.sleep(0.5)
+        except KeyboardInterrupt:
+            pass
+    print(f"🔌 Sent {board.samples_sent} samples, received commands: {board.command_string()}")
+    if firmware is not None:
+        print(f"🤖 Firmware: {firmware.stats()}")
@@ -1,36 +1,51 @@
+import os
 import sys
-import numpy as np
 import serial
 import time
 from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget, QGridLayout
 import pyqtgraph as pg
 from pyqtgraph.Qt import QtCore
-from scipy.signal import iirnotch, lfilter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from emg.detection import BurstDetector, SuppressionGraph
+from emg.filters import NotchFilterBank
+from emg.plotting import LivePlotRenderer
+from emg.ring_buffer import RingBuffer
+from emg.serial_io import SerialBlockReader
+from emg.timebase import SampleClock
 
 class SerialSignalViewer(QMainWindow):
     def __init__(self, port='/dev/cu.usbserial-2120', baudrate=115200,
-                 sampling_rate=1000, duration=3):
+                 sampling_rate=1000, duration=3, protocol='ascii'):
         super().__init__()
 
         self.sampling_rate = sampling_rate
         self.duration = duration
         self.num_points = int(sampling_rate * duration)
-        self.time_base = np.linspace(0, duration, self.num_points)
 
         self.num_channels = 6
         self.channel_labels = [
             "A0 - Left Wrist", "A1 - Right Wrist", "A2 - Left Elbow",
             "A3 - Right Elbow", "A4 - Left Leg", "A5 - Right Leg"
         ]
-        self.data = [np.zeros(self.num_points) for _ in range(self.num_channels)]
+        self.data = RingBuffer(self.num_channels, self.num_points)
 
         self.thresholds = [85, 180, 100, 180, 400, 180]
         self.cooldown_time = 0.8
         self.priority_window = 1.0  # ±1s elbow suppression
-        self.last_spike_time = [0] * self.num_channels
-        self.spike_history = [[] for _ in range(self.num_channels)]  # keep timestamps
-
-        self.b_notch, self.a_notch = iirnotch(60.0, 10.0, fs=sampling_rate)
+        # Wrist bursts are dropped while the same-side elbow is active; rules
+        # are by body site, so they follow the labels above
+        self.detector = BurstDetector(
+            self.thresholds, [None] * self.num_channels,
+            cooldown_time=self.cooldown_time,
+            priority_window=self.priority_window,
+            priority=SuppressionGraph.from_labels(self.channel_labels),
+            same_sample_priority=False,
+        )
+
+        self.notch = NotchFilterBank(self.num_channels, sampling_rate)
+        # Host time per sample, fitted from the sample count; bursts are stamped with it
+        self.clock = SampleClock(sampling_rate)
 
         try:
             self.ser = serial.Serial(port, baudrate, timeout=1)
@@ -38,6 +53,7 @@ class SerialSignalViewer(QMainWindow):
         except Exception as e:
             print(f"❌ Failed to open serial port: {e}")
             sys.exit()
+        self.reader = SerialBlockReader(self.ser, self.num_channels, protocol=protocol)
 
         self.init_ui()
 
@@ -63,52 +79,32 @@ class SerialSignalViewer(QMainWindow):
             row, col = i // 2, i % 2
             layout.addWidget(pw, row, col)
 
-    def has_spike_nearby(self, history, now, window):
-        """Check if any spike in history is within ±window seconds of now."""
-        return any(abs(now - t) <= window for t in history)
+        # Min/max per pixel column, at most 30 fps, only when new samples arrived
+        self.renderer = LivePlotRenderer(self.plots, self.sampling_rate, self.duration, max_fps=30)
 
     def update_plot(self):
-        try:
-            line = self.ser.readline().decode().strip()
-            if not line:
-                return
-            values = line.split(',')
-            if len(values) != self.num_channels:
-                return
-            values = [float(v) for v in values]
-        except:
+        block = self.reader.read_block(wait=False)
+        if len(block) == 0:
             return
 
-        now = time.time()
+        self.clock.update(len(block), time.time())
+        filtered_block = self.notch.process(block)
+        self.data.extend(filtered_block)
 
-        for i in range(self.num_channels):
-            # Filter and update plot
-            self.data[i] = np.roll(self.data[i], -1)
-            filtered = lfilter(self.b_notch, self.a_notch, [self.data[i][-2], values[i]])
-            self.data[i][-1] = filtered[-1]
-            self.plots[i].setData(self.time_base, self.data[i])
-
-            # Burst detection
-            if filtered[-1] > self.thresholds[i]:
-                dt = now - self.last_spike_time[i]
-                if dt > self.cooldown_time:
-
-                    # Check suppression
-                    if i == 0 and self.has_spike_nearby(self.spike_history[2], now, self.priority_window):
-                        continue  # A2 dominates A0
-                    if i == 1 and self.has_spike_nearby(self.spike_history[3], now, self.priority_window):
-                        continue  # A3 dominates A1
-
-                    print(f"⚡ Burst detected on channel A{i} ({self.channel_labels[i]})")
-                    self.last_spike_time[i] = now
-                    self.spike_history[i].append(now)
-
-                    # Clean up old history
-                    self.spike_history[i] = [t for t in self.spike_history[i] if now - t <= 2.0]
+        for _, events in self.detector.process_block(filtered_block, self.clock.latest()):
+            self.handle_bursts(events)
+
+        self.renderer.render(self.data.view(), self.data.total_written)
+
+    def handle_bursts(self, events):
+        for event in events:
+            i = event.channel
+            print(f"⚡ Burst detected on channel A{i} ({self.channel_labels[i]})")
 
     def closeEvent(self, event):
         self.ser.close()
         print("🔌 Serial port closed.")
+        print(f"📊 Serial stats: {self.reader.stats()}")
         event.accept()
 
 if __name__ == '__main__':
@@ -117,7 +113,8 @@ if __name__ == '__main__':
         port='/dev/cu.usbserial-2120',
         baudrate=115200,
         sampling_rate=1000,
-        duration=3
+        duration=3,
+        protocol='ascii'  # 'binary' if the sketch is built with BINARY_FRAMES 1
     )
     viewer.setWindowTitle("EMG Viewer with ±1s Elbow Priority")
     viewer.resize(1800, 700)
@@ -1,3 +1,4 @@
+import os
 import sys
 import serial
 import numpy as np
@@ -6,7 +7,9 @@ from PyQt5.QtWidgets import (
 )
 import pyqtgraph as pg
 from pyqtgraph.Qt import QtCore
-from scipy.signal import iirnotch, lfilter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from emg.filters import NotchFilterBank
 
 class SerialSignalPlotter(QMainWindow):
     def __init__(self, port='/dev/cu.usbserial-120', baudrate=115200,
@@ -25,7 +28,7 @@ class SerialSignalPlotter(QMainWindow):
         # 60Hz Notch Filter
         self.notch_freq = 60.0
         self.quality_factor = 10.0
-        self.b_notch, self.a_notch = iirnotch(w0=self.notch_freq, Q=self.quality_factor, fs=self.sampling_rate)
+        self.notch = NotchFilterBank(1, self.sampling_rate, self.notch_freq, self.quality_factor)
 
         # 打开串口
         try:
@@ -79,7 +82,7 @@ class SerialSignalPlotter(QMainWindow):
                 continue
 
         # Apply 60Hz notch filter
-        filtered_values = lfilter(self.b_notch, self.a_notch, values)
+        filtered_values = self.notch.process(np.array(values)[:, None])[:, 0]
         self.curve.setData(self.time_base, filtered_values)
 
     def start_timer(self):
@@ -1,29 +1,33 @@
+import os
 import sys
-import numpy as np
 import serial
-from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QGridLayout
+from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget, QGridLayout
 import pyqtgraph as pg
 from pyqtgraph.Qt import QtCore
-from scipy.signal import iirnotch, lfilter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from emg.filters import NotchFilterBank
+from emg.plotting import LivePlotRenderer
+from emg.ring_buffer import RingBuffer
+from emg.serial_io import SerialBlockReader
 
 class SerialSignalViewer(QMainWindow):
     def __init__(self, port='/dev/cu.usbserial-120', baudrate=115200,
-                 sampling_rate=1000, duration=3):
+                 sampling_rate=1000, duration=3, protocol='ascii'):
         super().__init__()
 
         self.sampling_rate = sampling_rate
         self.duration = duration
         self.num_points = int(sampling_rate * duration)
-        self.time_base = np.linspace(0, duration, self.num_points)
 
         self.num_channels = 6
         self.channel_labels = [
             "A0 - Left Wrist", "A1 - Right Wrist", "A2 - Left Elbow",
             "A3 - Right Elbow", "A4 - Left Leg", "A5 - Right Leg"
         ]
-        self.data = [np.zeros(self.num_points) for _ in range(self.num_channels)]
+        self.data = RingBuffer(self.num_channels, self.num_points)
 
-        self.b_notch, self.a_notch = iirnotch(60.0, 10.0, fs=sampling_rate)
+        self.notch = NotchFilterBank(self.num_channels, sampling_rate)
 
         try:
             self.ser = serial.Serial(port, baudrate, timeout=1)
@@ -31,6 +35,7 @@ class SerialSignalViewer(QMainWindow):
         except Exception as e:
             print(f"❌ Failed to open serial port: {e}")
             sys.exit()
+        self.reader = SerialBlockReader(self.ser, self.num_channels, protocol=protocol)
 
         self.init_ui()
 
@@ -56,28 +61,23 @@ class SerialSignalViewer(QMainWindow):
             row, col = i // 2, i % 2
             layout.addWidget(pw, row, col)
 
+        # Min/max per pixel column, at most 30 fps, only when new samples arrived
+        self.renderer = LivePlotRenderer(self.plots, self.sampling_rate, self.duration, max_fps=30)
+
     def update_plot(self):
-        try:
-            line = self.ser.readline().decode().strip()
-            if not line:
-                return
-            values = line.split(',')
-            if len(values) != self.num_channels:
-                return
-            values = [float(v) for v in values]
-        except:
+        block = self.reader.read_block(wait=False)
+        if len(block) == 0:
             return
 
         # 更新每个通道的滚动窗口
-        for i in range(self.num_channels):
-            self.data[i] = np.roll(self.data[i], -1)
-            filtered = lfilter(self.b_notch, self.a_notch, [self.data[i][-2], values[i]])
-            self.data[i][-1] = filtered[-1]
-            self.plots[i].setData(self.time_base, self.data[i])
+        self.data.extend(self.notch.process(block))
+
+        self.renderer.render(self.data.view(), self.data.total_written)
 
     def closeEvent(self, event):
         self.ser.close()
         print("🔌 Serial port closed.")
+        print(f"📊 Serial stats: {self.reader.stats()}")
         event.accept()
 
 if __name__ == '__main__':
@@ -86,7 +86,8 @@ if __name__ == '__main__':
         port='/dev/cu.usbserial-2120',  # ⬅️ 修改为你的串口号
         baudrate=115200,
         sampling_rate=1000,
-        duration=3
+        duration=3,
+        protocol='ascii'  # 'binary' if the sketch is built with BINARY_FRAMES 1
     )
     viewer.setWindowTitle("Real-Time 6-Channel EMG Viewer (Serial)")
     viewer.resize(1800, 900)
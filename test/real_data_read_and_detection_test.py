@@ -1,3 +1,4 @@
+import os
 import sys
 import numpy as np
 import pandas as pd
@@ -8,6 +9,9 @@ import pyqtgraph as pg
 from pyqtgraph.Qt import QtCore
 from scipy.signal import iirnotch, lfilter, hilbert, butter, filtfilt
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from emg.bursts import BurstSegmenter, detect_bursts
+
 class CSVSignalPlotter(QMainWindow):
     def __init__(self, csv_path, refresh_interval=3000, duration=3):
         super().__init__()
@@ -28,6 +32,10 @@ class CSVSignalPlotter(QMainWindow):
         self.b_notch, self.a_notch = iirnotch(60.0, 30.0, self.sampling_rate)
         self.b_lp, self.a_lp = butter(2, 5 / (0.5 * self.sampling_rate), btype='low')
 
+        # 跨窗口的 burst 不会在 3s 边界被切开
+        self.segmenter = BurstSegmenter(1, self.threshold, self.sampling_rate,
+                                        self.min_burst_duration, self.min_silence_duration)
+
         self.current_index = 0
         self.init_ui()
 
@@ -61,43 +69,14 @@ class CSVSignalPlotter(QMainWindow):
         return filtfilt(self.b_lp, self.a_lp, envelope)
 
     def detect_bursts(self, envelope, t_window):
-        is_active = envelope > self.threshold
-        bursts = []
-        start = None
-        silence_counter = 0
-        fs = self.sampling_rate
-
-        for i, active in enumerate(is_active):
-            if active:
-                if start is None:
-                    start = i
-                silence_counter = 0
-            elif start is not None:
-                silence_counter += 1
-                if silence_counter > self.min_silence_duration * fs:
-                    end = i - silence_counter
-                    duration = (end - start) / fs
-                    if duration >= self.min_burst_duration:
-                        t_start = t_window[start]
-                        t_end = t_window[end]
-                        bursts.append((t_start, t_end))
-                    start = None
-                    silence_counter = 0
-
-        if start is not None:
-            end = len(envelope)
-            duration = (end - start) / fs
-            if duration >= self.min_burst_duration:
-                t_start = t_window[start]
-                t_end = t_window[end - 1]
-                bursts.append((t_start, t_end))
-
-        return bursts
+        return detect_bursts(envelope, self.threshold, self.sampling_rate,
+                             self.min_burst_duration, self.min_silence_duration, t_window)
 
     def update_plot(self):
         end_index = self.current_index + self.num_points
         if end_index > len(self.signal_array):
             self.timer.stop()
+            self.print_bursts(*self.segmenter.flush())
             print("✅ Playback finished")
             return
 
@@ -112,13 +91,15 @@ class CSVSignalPlotter(QMainWindow):
         envelope = self.smooth_envelope(envelope)
 
         # burst 检测
-        bursts = self.detect_bursts(envelope, t)
-        for b_start, b_end in bursts:
-            print(f"⚡ Burst from {b_start:.3f}s to {b_end:.3f}s")
+        self.print_bursts(*self.segmenter.process(envelope))
 
         self.curve.setData(t - t[0], filtered)
         self.current_index += self.num_points
 
+    def print_bursts(self, channels, starts, ends):
+        for b_start, b_end in zip(self.time_array[starts], self.time_array[ends]):
+            print(f"⚡ Burst from {b_start:.3f}s to {b_end:.3f}s")
+
     def start_timer(self):
         if not self.timer.isActive():
             self.timer.start(self.refresh_interval)
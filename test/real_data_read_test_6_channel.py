@@ -1,25 +1,25 @@
+import os
 import sys
-import pandas as pd
-import numpy as np
+import time
 import pyqtgraph as pg
 from pyqtgraph.Qt import QtCore, QtWidgets
-from scipy.signal import iirnotch, lfilter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from emg.playback import PlaybackSource
+from emg.plotting import LivePlotRenderer
 
 class CSVSignalViewer(QtWidgets.QMainWindow):
-    def __init__(self, csv_path, sampling_rate=1000, duration=3):
+    # Keys: Space pause, +/- speed (1x-50x), Left/Right seek 5 s, Home restart
+    def __init__(self, csv_path, sampling_rate=None, duration=3, speed=1.0):
         super().__init__()
-        self.sampling_rate = sampling_rate
+        # The CSV is converted to .npy once and memory-mapped from then on
+        self.source = PlaybackSource(csv_path, sampling_rate=sampling_rate, speed=speed)
+        self.sampling_rate = self.source.sampling_rate
         self.duration = duration
-        self.num_points = sampling_rate * duration
-        self.time_base = np.linspace(0, duration, self.num_points)
-
-        self.data = pd.read_csv(csv_path).values.T
-        self.num_channels = self.data.shape[0]
-        self.total_samples = self.data.shape[1]
-        self.current_index = 0
-
-        # Notch filter
-        self.b_notch, self.a_notch = iirnotch(60.0, 10.0, fs=sampling_rate)
+        self.num_points = int(self.sampling_rate * duration)
+        self.num_channels = self.source.num_channels
+        self.paused = False
+        self.last_tick = time.perf_counter()
 
         self.init_ui()
 
@@ -37,7 +37,7 @@ class CSVSignalViewer(QtWidgets.QMainWindow):
         self.plot_widgets = []
         for i in range(self.num_channels):
             pw = pg.PlotWidget()
-            pw.setTitle(self.channel_labels[i] if hasattr(self, 'channel_labels') else f"A{i}")
+            pw.setTitle(self.source.channels[i])
             pw.setYRange(0, 1023)
             pw.setXRange(0, self.duration)
             curve = pw.plot(pen='g')
@@ -46,25 +46,49 @@ class CSVSignalViewer(QtWidgets.QMainWindow):
             row = i // 2
             col = i % 2
             grid_layout.addWidget(pw, row, col)
+        self.renderer = LivePlotRenderer(self.plots, self.sampling_rate, self.duration)
 
-    def update_plot(self):
-        end_index = self.current_index + self.num_points
-        if end_index > self.total_samples:
-            self.timer.stop()
-            print("✅ Playback finished")
+    def keyPressEvent(self, event):
+        key = event.key()
+        if key == QtCore.Qt.Key_Space:
+            self.paused = not self.paused
+        elif key in (QtCore.Qt.Key_Plus, QtCore.Qt.Key_Equal):
+            self.source.set_speed(self.source.speed * 2)
+        elif key == QtCore.Qt.Key_Minus:
+            self.source.set_speed(self.source.speed / 2)
+        elif key == QtCore.Qt.Key_Right:
+            self.source.seek(self.source.position + 5 * self.sampling_rate)
+        elif key == QtCore.Qt.Key_Left:
+            self.source.seek(self.source.position - 5 * self.sampling_rate)
+        elif key == QtCore.Qt.Key_Home:
+            self.source.seek(0)
+        else:
+            super().keyPressEvent(event)
             return
+        self.update_title()
+        self.update_plot(force=True)
 
-        for i in range(self.num_channels):
-            raw = self.data[i][self.current_index:end_index]
-            filtered = lfilter(self.b_notch, self.a_notch, raw)
-            self.plots[i].setData(self.time_base, filtered)
+    def update_title(self):
+        state = "paused" if self.paused else f"{self.source.speed:g}x"
+        self.setWindowTitle(f"Offline {self.num_channels}-Channel EMG Viewer - "
+                            f"{self.source.position / self.sampling_rate:.1f} / {self.source.duration:.1f} s ({state})")
+
+    def update_plot(self, force=False):
+        now = time.perf_counter()
+        if not self.paused:
+            self.source.tick(now - self.last_tick)
+        self.last_tick = now
 
-        self.current_index += self.num_points
+        position = int(self.source.position)
+        self.renderer.render(self.source.window(self.num_points), position, force=force)
+        if self.source.finished and not self.paused:
+            self.paused = True
+            print("✅ Playback finished")
+        self.update_title()
 
 if __name__ == "__main__":
     app = QtWidgets.QApplication(sys.argv)
-    viewer = CSVSignalViewer("simulated_30s_6channel_emg_v2.csv")
-    viewer.setWindowTitle("Offline 6-Channel EMG Viewer")
+    viewer = CSVSignalViewer(sys.argv[1] if len(sys.argv) > 1 else "simulated_30s_6channel_emg_v2.csv")
     viewer.resize(1800, 900)
     viewer.show()
     sys.exit(app.exec_())